@@ -19,18 +19,34 @@ from models import (
     Message,
 )
 from schemas import ma
+from serializers import user_serializer
+from cache import response_cache
+from json_provider import init_json
+from instrumentation import sql_instrumentation
+from metrics import metrics
+from pubsub import broker
 
 # Route resources
 from routes.habit_routes import HabitListResource, HabitResource
 from routes.user_routes import UserListResource, UserResource
 from routes.user_habit_routes import UserHabitsResource, AssignHabitResource, RemoveHabitResource
-from routes.message_routes import MessageListResource
-from routes.challenge_routes import ChallengeListResource, ChallengeResource
-from routes.habit_entry_routes import HabitEntryListResource, HabitEntryResource
+from routes.message_routes import MessageListResource, MessageThreadListResource, MessageThreadResource
+from routes.challenge_routes import ChallengeListResource, ChallengeDiscoverResource, ChallengeResource
+from routes.habit_entry_routes import HabitEntryListResource, HabitEntryBulkResource, HabitEntryResource
+from routes.habit_streak_routes import UserStreaksResource
+from routes.analytics_routes import HabitAnalyticsResource
+from routes.habit_calendar_routes import HabitCalendarResource
+from routes.search_routes import SearchResource
+from routes.feed_routes import FeedResource
+from routes.stream_routes import StreamResource
+from routes.job_routes import JobResource, UserExportListResource, UserExportResource
+from routes.batch_routes import BatchResource
+from routes.conversation_routes import UserConversationsResource, ConversationReadResource
 from routes.challenge_entry_routes import ChallengeEntryRoutes
 from routes.challenge_participant_routes import ChallengeParticipantRoutes, ParticipationStatus
-from routes.challenge_routes import ChallengeParticipantsResource, ChallengeEntriesResource
+from routes.challenge_routes import ChallengeParticipantsResource, ChallengeEntriesResource, ChallengeLeaderboardResource
 from routes.auth import register_auth_routes
+from commands import register_commands
 
 load_dotenv()
 
@@ -48,14 +64,18 @@ def create_app():
 
     app.config["SQLALCHEMY_DATABASE_URI"] = os.environ.get("SQLALCHEMY_DATABASE_URI", "sqlite:///app.db")
     app.config["JWT_SECRET_KEY"] = os.environ.get("JWT_SECRET_KEY", "dev-secret")
-    app.json.compact = False
 
     jwt = JWTManager(app)
     db.init_app(app)
     ma.init_app(app)
     migrate = Migrate(app, db)
     api = Api(app)
+    init_json(app, api)
     bcrypt.init_app(app)
+    response_cache.init_app(app)
+    sql_instrumentation.init_app(app)
+    metrics.init_app(app)
+    broker.init_app(app)
 
     # Register all resources
     api.add_resource(HabitListResource, '/habits', '/habits/')
@@ -66,10 +86,26 @@ def create_app():
     api.add_resource(AssignHabitResource, '/user-habits/assign')
     api.add_resource(RemoveHabitResource, '/user-habits/remove')
     api.add_resource(MessageListResource, '/messages')
+    api.add_resource(MessageThreadListResource, '/messages/threads')
+    api.add_resource(MessageThreadResource, '/messages/threads/<int:root_id>')
+    api.add_resource(UserConversationsResource, '/users/<int:user_id>/conversations')
+    api.add_resource(ConversationReadResource, '/users/<int:user_id>/conversations/<int:peer_id>/read')
     api.add_resource(ChallengeListResource, '/challenges', '/challenges/')
+    api.add_resource(ChallengeDiscoverResource, '/challenges/discover')
     api.add_resource(ChallengeResource, '/challenges/<int:id>')
     api.add_resource(HabitEntryListResource, '/habit-entries', '/habit-entries/')
+    api.add_resource(HabitEntryBulkResource, '/habit-entries/bulk')
     api.add_resource(HabitEntryResource, '/habit-entries/<int:entry_id>')
+    api.add_resource(UserStreaksResource, '/users/<int:user_id>/streaks')
+    api.add_resource(HabitAnalyticsResource, '/analytics/habits')
+    api.add_resource(HabitCalendarResource, '/users/<int:user_id>/habits/<int:habit_id>/calendar')
+    api.add_resource(SearchResource, '/search')
+    api.add_resource(FeedResource, '/feed')
+    api.add_resource(StreamResource, '/stream')
+    api.add_resource(JobResource, '/jobs/<int:job_id>')
+    api.add_resource(UserExportListResource, '/users/<int:user_id>/exports')
+    api.add_resource(UserExportResource, '/users/<int:user_id>/exports/<int:job_id>')
+    api.add_resource(BatchResource, '/batch')
     api.add_resource(ChallengeEntryRoutes, '/challenge-entries')
     api.add_resource(ChallengeParticipantRoutes, '/challenge-participants')
     api.add_resource(ParticipationStatus, '/challenges/<int:challenge_id>/participation-status')
@@ -77,15 +113,29 @@ def create_app():
     # ✅ NEW: Added endpoints for frontend ChallengeParticipantsPage & ChallengeEntriesPage
     api.add_resource(ChallengeParticipantsResource, '/challenges/<int:id>/participants')
     api.add_resource(ChallengeEntriesResource, '/challenges/<int:id>/entries')
+    api.add_resource(ChallengeLeaderboardResource, '/challenges/<int:id>/leaderboard')
 
     # Auth routes
     register_auth_routes(app)
 
+    # Flask CLI commands
+    register_commands(app)
+
     # Index route
     @app.route("/")
     def index():
         return {"message": "Welcome to the API!"}, 200
 
+    # Response cache counters
+    @app.route("/cache/stats")
+    def cache_stats():
+        return response_cache.stats(), 200
+
+    # Live stream connections and per-topic subscriber counts
+    @app.route("/stream/stats")
+    def stream_stats():
+        return broker.stats(), 200
+
     # Update user avatar route
     @app.route('/users/<int:user_id>', methods=['PATCH'])
     def update_user(user_id):
@@ -96,7 +146,8 @@ def create_app():
         if 'avatar_url' in data:
             user.avatar_url = data['avatar_url']
         db.session.commit()
-        return jsonify({"success": True, "user": user.to_dict()})
+        response_cache.invalidate(f"user:{user_id}")
+        return jsonify({"success": True, "user": user_serializer.dump(user, user_serializer.requested())})
 
     return app
 
@@ -0,0 +1,256 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import Session
+
+from config import db
+from models import User, Habit, HabitEntry, Challenge, ChallengeParticipant
+import participations
+import search
+from schemas import HabitEntrySchema
+from serializers import habit_entry_serializer
+from json_provider import CompactJSONProvider
+
+
+def _timed(fn, repeat):
+    """Best-of-`repeat` wall time in milliseconds, plus the last result."""
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = (time.perf_counter() - started) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def bench_serializers(app, rows=10000, repeat=3):
+    """Compare marshmallow schema dumps with precompiled row dumpers on `rows` habit entries.
+
+    Runs against a private in-memory SQLite database so it never touches app data.
+    """
+    engine = create_engine("sqlite://")
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{"username": "bench", "email": "bench@example.com", "password_hash": "x"}])
+        conn.execute(Habit.__table__.insert(), [{"name": "Bench", "user_id": 1}])
+        start = date(2000, 1, 1)
+        conn.execute(HabitEntry.__table__.insert(), [
+            {"user_id": 1, "habit_id": 1, "progress": "completed", "notes": "bench", "date": start + timedelta(days=i)}
+            for i in range(rows)
+        ])
+
+    schema = HabitEntrySchema(many=True)
+    fields = habit_entry_serializer.default
+    results = {}
+    with app.app_context(), Session(engine) as session:
+        def schema_dump():
+            session.expunge_all()
+            return schema.dump(session.query(HabitEntry).order_by(HabitEntry.id).all())
+
+        def row_dump():
+            query = habit_entry_serializer.columns(session.query(HabitEntry).order_by(HabitEntry.id), fields)
+            return habit_entry_serializer.dump_rows(query.all(), fields)
+
+        results["schema dump (ORM + marshmallow)"], schema_rows = _timed(schema_dump, repeat)
+        results["row dump (columns + precompiled)"], plain_rows = _timed(row_dump, repeat)
+        # The schema also emits columns outside the serializer's default set
+        assert [{f: r[f] for f in fields} for r in schema_rows] == plain_rows, "serializers disagree"
+
+        provider = CompactJSONProvider(app)
+        results["json encode (pretty)"], pretty_body = _timed(lambda: json.dumps(plain_rows, indent=2), repeat)
+        results["json encode (compact)"], compact_body = _timed(lambda: provider.dumps(plain_rows), repeat)
+
+    engine.dispose()
+    sizes = {"pretty": len(pretty_body), "compact": len(compact_body)}
+    return results, sizes
+
+
+def _percentile(samples, fraction):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def bench_joins(users=300, threads=64):
+    """Fire simultaneous challenge joins from `threads` workers and check the invariants.
+
+    Every user tries to join two popular challenges and repeats one join, all
+    released at once; half the users already sit one slot under the limit.
+    Runs against a private SQLite file so the workers really contend for locks.
+    """
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = create_engine(f"sqlite:///{path}", connect_args={"timeout": 30}, pool_size=threads)
+
+    @event.listens_for(engine, "connect")
+    def _wal(dbapi_connection, connection_record):
+        dbapi_connection.execute("PRAGMA journal_mode=WAL")
+
+    db.metadata.create_all(engine)
+    limit = participations.MAX_ACTIVE_CHALLENGES
+    starts = date.today() + timedelta(days=1)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {"username": f"bench{i}", "email": f"bench{i}@example.com", "password_hash": "x",
+             "active_challenge_count": (limit - 1) if i % 2 else 0}
+            for i in range(1, users + 1)
+        ])
+        fillers = list(range(3, 3 + limit - 1))
+        conn.execute(Challenge.__table__.insert(), [
+            {"name": name, "description": "bench", "created_by": 1, "start_date": starts, "end_date": starts + timedelta(days=30)}
+            for name in ["Popular A", "Popular B"] + [f"Filler {n}" for n in fillers]
+        ])
+        # Users preset to limit - 1 hold one place in each filler challenge
+        holders = [i for i in range(1, users + 1) if i % 2]
+        conn.execute(ChallengeParticipant.__table__.insert(), [
+            {"user_id": user_id, "challenge_id": challenge_id, "join_rank": rank}
+            for challenge_id in fillers for rank, user_id in enumerate(holders, start=1)
+        ])
+        conn.execute(Challenge.__table__.update().where(Challenge.id.in_(fillers)).values(join_seq=len(holders)))
+
+    attempts = [(user_id, challenge_id) for user_id in range(1, users + 1) for challenge_id in (1, 2, 1)]
+    outcomes, latencies = Counter(), []
+    lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+
+    def worker(chunk):
+        barrier.wait()
+        for user_id, challenge_id in chunk:
+            with Session(engine) as session:
+                started = time.perf_counter()
+                try:
+                    participations.join(user_id, challenge_id, session=session)
+                    outcome = "joined"
+                except participations.JoinError as e:
+                    outcome = e.message
+                elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                outcomes[outcome] += 1
+                latencies.append(elapsed)
+
+    workers = [threading.Thread(target=worker, args=(attempts[i::threads],)) for i in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    participants = ChallengeParticipant.__table__
+    with engine.connect() as conn:
+        per_user = dict(conn.execute(
+            select(participants.c.user_id, func.count()).group_by(participants.c.user_id)
+        ).all())
+        counters = dict(conn.execute(select(User.id, User.active_challenge_count)).all())
+        ranks = {
+            challenge_id: sorted(rank for rank, in conn.execute(
+                select(participants.c.join_rank).where(participants.c.challenge_id == challenge_id)
+            ))
+            for challenge_id in (1, 2)
+        }
+        sequences = dict(conn.execute(select(Challenge.id, Challenge.join_seq)).all())
+    engine.dispose()
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    checks = {
+        f"no user over {limit} challenges": max(per_user.values(), default=0) <= limit,
+        "counters match participations": all(counters[u] == per_user.get(u, 0) for u in counters),
+        "ranks unique and gapless": all(r == list(range(1, len(r) + 1)) for r in ranks.values()),
+        "join_seq matches last rank": all(sequences[c] == len(r) for c, r in ranks.items()),
+    }
+    stats = {
+        "attempts": len(attempts),
+        "threads": threads,
+        "wall_s": wall,
+        "joins_per_s": len(attempts) / wall if wall else 0.0,
+        "p50_ms": _percentile(latencies, 0.50),
+        "p95_ms": _percentile(latencies, 0.95),
+        "p99_ms": _percentile(latencies, 0.99),
+    }
+    return stats, dict(outcomes), checks
+
+
+SEARCH_WORDS = (
+    "run walk swim read write journal meditate stretch yoga cycle lift climb hike cook sleep water "
+    "morning evening daily weekly streak habit challenge league team sprint marathon focus practice "
+    "guitar piano language spanish french code study garden clean budget save mindful gratitude"
+).split()
+_SYLLABLES = "ba be bi bo ka ke ki ko la le li lo ma me mi mo na ne ni no ra re ri ro sa se si so ta te ti to".split()
+
+
+def _zipf_vocabulary(rng, size):
+    """Real words first, then generated ones, weighted 1/rank like natural text."""
+    words = list(SEARCH_WORDS)
+    seen = set(words)
+    while len(words) < size:
+        word = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    weights, total = [], 0.0
+    for rank in range(1, size + 1):
+        total += 1.0 / rank
+        weights.append(total)
+    return words, weights
+
+
+def bench_search(docs=200000, queries=200, seed=42, vocabulary=20000):
+    """Index `docs` generated habits and challenges, then time ranked /search queries.
+
+    Text and queries draw from a Zipf-distributed vocabulary so term frequencies
+    look like real text. Rows go in through the normal tables so the sync
+    triggers do the indexing.
+    """
+    rng = random.Random(seed)
+    words, weights = _zipf_vocabulary(rng, vocabulary)
+    engine = create_engine("sqlite://")
+    db.metadata.create_all(engine)
+
+    def sentence(length):
+        return " ".join(rng.choices(words, cum_weights=weights, k=length))
+
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [{"username": "bench", "email": "bench@example.com", "password_hash": "x"}])
+        batch = 10000
+        for offset in range(0, docs, batch):
+            rows = range(offset, min(offset + batch, docs))
+            conn.execute(Habit.__table__.insert(), [
+                {"name": sentence(3), "description": sentence(12), "user_id": 1} for i in rows if i % 2 == 0
+            ])
+            conn.execute(Challenge.__table__.insert(), [
+                {"name": sentence(3), "description": sentence(20), "created_by": 1,
+                 "start_date": date(2024, 1, 1), "end_date": date(2024, 2, 1)}
+                for i in rows if i % 2
+            ])
+        conn.exec_driver_sql("INSERT INTO search_index(search_index) VALUES ('optimize')")
+    index_s = time.perf_counter() - started
+
+    terms = [sentence(rng.randint(1, 3)) for _ in range(queries)]
+    terms += [word[:3] for word in rng.sample(SEARCH_WORDS, 10)]  # type-ahead prefixes
+    latencies = []
+    truncated = 0
+    with Session(engine) as session:
+        for term in terms:
+            began = time.perf_counter()
+            truncated += search.search(term, ["habit", "challenge"], limit=20, session=session)[2]
+            latencies.append((time.perf_counter() - began) * 1000)
+    engine.dispose()
+
+    return {
+        "docs": docs,
+        "queries": len(terms),
+        "truncated": truncated,
+        "index_s": index_s,
+        "p50_ms": _percentile(latencies, 0.50),
+        "p95_ms": _percentile(latencies, 0.95),
+        "max_ms": max(latencies),
+    }
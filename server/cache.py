@@ -0,0 +1,259 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import g, request
+
+from streaming import wants_stream
+
+DEFAULT_TTL = 60
+DEFAULT_MAX_ENTRIES = 1024
+
+
+class MemoryBackend:
+    """In-process LRU with per-entry TTL; each gunicorn worker has its own copy."""
+
+    name = "memory"
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (expires_at, value, tags)
+        self._tags = {}  # tag -> set of keys
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return (value, expired) where value is None on a miss."""
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None, False
+            if item[0] <= time.monotonic():
+                self._drop(key)
+                return None, True
+            self._entries.move_to_end(key)
+            return item[1], False
+
+    def set(self, key, value, ttl, tags):
+        """Store a value; returns how many entries were evicted to make room."""
+        evicted = 0
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+                evicted += 1
+        return evicted
+
+    def invalidate(self, tags):
+        with self._lock:
+            keys = set().union(*(self._tags.pop(tag, set()) for tag in tags))
+            for key in keys:
+                self._drop(key)
+            return len(keys)
+
+    def size(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _drop(self, key):
+        item = self._entries.pop(key, None)
+        if item is not None:
+            for tag in item[2]:
+                keys = self._tags.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._tags[tag]
+
+
+class SQLiteBackend:
+    """File-backed cache shared by every worker process on the host.
+
+    Stands in for a network cache such as Redis: same get/set/invalidate
+    contract, with entries evicted oldest-first once max_entries is reached.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, stored_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_cache_entries_stored_at ON cache_entries (stored_at);
+                CREATE TABLE IF NOT EXISTS cache_tags (tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key));
+                CREATE INDEX IF NOT EXISTS ix_cache_tags_key ON cache_tags (key);
+            """)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._connect().execute(
+            "SELECT value, expires_at FROM cache_entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None, False
+        if row[1] <= time.time():
+            self._delete_keys([key])
+            return None, True
+        return json.loads(row[0]), False
+
+    def set(self, key, value, ttl, tags):
+        conn = self._connect()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, value, expires_at, stored_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + ttl, now),
+            )
+            conn.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+            conn.executemany("INSERT INTO cache_tags (tag, key) VALUES (?, ?)", [(tag, key) for tag in tags])
+            overflow = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0] - self.max_entries
+            evicted = []
+            if overflow > 0:
+                evicted = [k for (k,) in conn.execute(
+                    "SELECT key FROM cache_entries ORDER BY stored_at LIMIT ?", (overflow,)
+                )]
+                self._delete_keys(evicted, conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return len(evicted)
+
+    def invalidate(self, tags):
+        conn = self._connect()
+        marks = ",".join("?" * len(tags))
+        keys = [k for (k,) in conn.execute(f"SELECT DISTINCT key FROM cache_tags WHERE tag IN ({marks})", list(tags))]
+        self._delete_keys(keys)
+        return len(keys)
+
+    def size(self):
+        return self._connect().execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+
+    def clear(self):
+        self._connect().executescript("DELETE FROM cache_entries; DELETE FROM cache_tags;")
+
+    def _delete_keys(self, keys, conn=None):
+        if not keys:
+            return
+        conn = conn or self._connect()
+        params = [(k,) for k in keys]
+        conn.executemany("DELETE FROM cache_entries WHERE key = ?", params)
+        conn.executemany("DELETE FROM cache_tags WHERE key = ?", params)
+
+
+class ResponseCache:
+    """Tag-invalidated cache for flask_restful GET results."""
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = DEFAULT_TTL
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("RESPONSE_CACHE_BACKEND", os.environ.get("RESPONSE_CACHE_BACKEND", "memory"))
+        app.config.setdefault("RESPONSE_CACHE_TTL", int(os.environ.get("RESPONSE_CACHE_TTL", DEFAULT_TTL)))
+        app.config.setdefault("RESPONSE_CACHE_MAX_ENTRIES", int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)))
+        app.config.setdefault("RESPONSE_CACHE_PATH", os.environ.get("RESPONSE_CACHE_PATH"))
+
+        self.ttl = app.config["RESPONSE_CACHE_TTL"]
+        max_entries = app.config["RESPONSE_CACHE_MAX_ENTRIES"]
+        backend = app.config["RESPONSE_CACHE_BACKEND"]
+        if backend == "memory":
+            self.backend = MemoryBackend(max_entries)
+        elif backend == "sqlite":
+            path = app.config["RESPONSE_CACHE_PATH"] or os.path.join(app.instance_path, "response_cache.db")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.backend = SQLiteBackend(path, max_entries)
+        elif backend == "none":
+            self.backend = None
+        else:
+            raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND: {backend}")
+
+    def _count(self, counter, amount=1):
+        if amount:
+            with self._lock:
+                self._counters[counter] += amount
+
+    def get(self, key):
+        value, expired = self.backend.get(key)
+        self._count("evictions", int(expired))
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def set(self, key, value, tags, ttl=None):
+        self._count("evictions", self.backend.set(key, value, ttl or self.ttl, tags))
+
+    def invalidate(self, *tags):
+        """Drop every cached response carrying any of `tags`."""
+        if self.backend is not None:
+            self._count("invalidations", self.backend.invalidate(tags))
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+        stats["backend"] = self.backend.name if self.backend else "none"
+        stats["size"] = self.backend.size() if self.backend else 0
+        return stats
+
+    def cached(self, *tags, ttl=None):
+        """Cache a resource's successful GET result under its full path.
+
+        Tags are format strings filled from the view's URL arguments, e.g.
+        "challenge:{id}", so writes can invalidate exactly what they touch.
+        Under etags.conditional the key also carries the data version, so a
+        worker that missed another's invalidation still can't serve a body
+        older than the ETag it is sent with.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.backend is None or wants_stream():
+                    return view(*args, **kwargs)
+
+                key = "response:" + request.full_path
+                if version := g.get("data_version"):
+                    key += "@" + version
+                hit = self.get(key)
+                if hit is not None:
+                    return tuple(hit)
+
+                result = view(*args, **kwargs)
+                if isinstance(result, tuple) and len(result) == 2 and result[1] == 200:
+                    self.set(key, list(result), [tag.format(**kwargs) for tag in tags], ttl)
+                return result
+            return wrapper
+        return decorator
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,197 @@
+import calendar
+from datetime import datetime
+
+from sqlalchemy import tuple_
+
+from config import db
+from models import HabitCalendar, HabitEntry
+from upsert import dialect_insert
+
+# Two bits per day of the year, day 1 in the low bits of byte 0
+STATES = ("none", "skipped", "partial", "completed")
+STATE_CODES = {"skipped": 1, "partial": 2, "completed": 3}
+CALENDAR_BYTES = (366 * 2 + 7) // 8  # 92
+
+calendars = HabitCalendar.__table__
+
+
+def days_in_year(year):
+    return 366 if calendar.isleap(year) else 365
+
+
+def day_index(day):
+    return day.timetuple().tm_yday - 1
+
+
+def empty():
+    return bytes(CALENDAR_BYTES)
+
+
+def set_day(bits, day, progress):
+    """Write the state for `day` (a date) into the bytearray `bits`; unknown progress clears it."""
+    index = day_index(day)
+    shift = (index % 4) * 2
+    bits[index // 4] = (bits[index // 4] & ~(0b11 << shift)) | (STATE_CODES.get(progress, 0) << shift)
+
+
+def get_day(bits, day):
+    index = day_index(day)
+    return STATES[(bits[index // 4] >> ((index % 4) * 2)) & 0b11]
+
+
+# --- bit operations over a whole year ---
+
+def _planes(bits):
+    """Split the packed year into (low, high) bit planes, one flag per day at even bit positions."""
+    packed = int.from_bytes(bits, "little")
+    even = int("01" * (CALENDAR_BYTES * 4), 2)
+    return packed & even, (packed >> 1) & even
+
+
+def state_mask(bits, state):
+    """Integer with bit 2*i set when day i+1 of the year is in `state`."""
+    low, high = _planes(bits)
+    if state == "completed":
+        return low & high
+    if state == "partial":
+        return high & ~low
+    if state == "skipped":
+        return low & ~high
+    raise ValueError(f"Unknown state: {state}")
+
+
+def range_mask(start_index, end_index):
+    """Mask selecting days start_index..end_index (0-based, inclusive)."""
+    return (1 << (2 * (end_index + 1))) - (1 << (2 * start_index))
+
+
+def count(mask):
+    return bin(mask).count("1")
+
+
+def longest_run(mask):
+    """Longest run of consecutive days set in a state mask."""
+    run = 0
+    while mask:
+        mask &= mask >> 2
+        run += 1
+    return run
+
+
+def run_ending_at(mask, index):
+    """Length of the run of set days that ends on day `index` (0-based)."""
+    run = 0
+    while index >= 0 and mask >> (2 * index) & 1:
+        run += 1
+        index -= 1
+    return run
+
+
+def range_counts(bits, start_index, end_index):
+    """Per-state counts for days start_index..end_index (0-based, inclusive)."""
+    window = range_mask(start_index, end_index)
+    return {state: count(state_mask(bits, state) & window) for state in ("completed", "partial", "skipped")}
+
+
+def summarize(bits, today_index=None):
+    """Per-state counts and completed runs, computed on the packed bits.
+
+    `today_index` is today's 0-based day of the year when the calendar is for the
+    current year; the current streak may end today or yesterday.
+    """
+    completed = state_mask(bits, "completed")
+    current = 0
+    if today_index is not None:
+        current = run_ending_at(completed, today_index) or run_ending_at(completed, today_index - 1)
+    return {
+        "counts": range_counts(bits, 0, CALENDAR_BYTES * 4 - 1),
+        "current_streak": current,
+        "longest_streak": longest_run(completed),
+    }
+
+
+# --- maintenance ---
+
+def record(changes):
+    """Apply (user_id, habit_id, date, progress) changes in order; progress None clears the day.
+
+    Loads the affected calendars once, edits them in memory and writes each back
+    with a single upsert, all in the caller's transaction.
+    """
+    keys = {(user_id, habit_id, day.year) for user_id, habit_id, day, _ in changes if day is not None}
+    if not keys:
+        return
+
+    current = {
+        (user_id, habit_id, year): bytearray(bits)
+        for user_id, habit_id, year, bits in
+        db.session.query(HabitCalendar.user_id, HabitCalendar.habit_id, HabitCalendar.year, HabitCalendar.bits)
+        .filter(tuple_(HabitCalendar.user_id, HabitCalendar.habit_id, HabitCalendar.year).in_(list(keys)))
+        .with_for_update()
+    }
+    for user_id, habit_id, day, progress in changes:
+        if day is not None:
+            bits = current.setdefault((user_id, habit_id, day.year), bytearray(CALENDAR_BYTES))
+            set_day(bits, day, progress)
+
+    now = datetime.utcnow()
+    stmt = dialect_insert(calendars)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["user_id", "habit_id", "year"],
+        set_={"bits": stmt.excluded.bits, "updated_at": stmt.excluded.updated_at},
+    )
+    db.session.execute(stmt, [
+        {"user_id": user_id, "habit_id": habit_id, "year": year, "bits": bytes(bits), "updated_at": now}
+        for (user_id, habit_id, year), bits in current.items()
+    ])
+
+
+def entry_saved(entry, previous=None):
+    """Update the calendar after a create (previous=None) or update of `entry`.
+
+    `previous` is the (date, progress) pair the entry had before an update.
+    """
+    changes = []
+    if previous is not None and previous[0] != entry.date:
+        changes.append((entry.user_id, entry.habit_id, previous[0], None))
+    changes.append((entry.user_id, entry.habit_id, entry.date, entry.progress))
+    record(changes)
+
+
+def entry_deleted(entry):
+    record([(entry.user_id, entry.habit_id, entry.date, None)])
+
+
+def get_calendar(user_id, habit_id, year):
+    bits = (
+        db.session.query(HabitCalendar.bits)
+        .filter_by(user_id=user_id, habit_id=habit_id, year=year)
+        .scalar()
+    )
+    return bytes(bits) if bits is not None else empty()
+
+
+def rebuild_all(batch_size=1000):
+    """Drop and repack every calendar from habit_entries in a single ordered pass."""
+    db.session.execute(calendars.delete())
+
+    rows = (
+        db.session.query(HabitEntry.user_id, HabitEntry.habit_id, HabitEntry.date, HabitEntry.progress)
+        .filter(HabitEntry.date.is_not(None))
+        .order_by(HabitEntry.user_id, HabitEntry.habit_id, HabitEntry.date)
+        .yield_per(batch_size)
+    )
+
+    packed = {}
+    for user_id, habit_id, day, progress in rows:
+        bits = packed.setdefault((user_id, habit_id, day.year), bytearray(CALENDAR_BYTES))
+        set_day(bits, day, progress)
+
+    now = datetime.utcnow()
+    if packed:
+        db.session.execute(calendars.insert(), [
+            {"user_id": user_id, "habit_id": habit_id, "year": year, "bits": bytes(bits), "updated_at": now}
+            for (user_id, habit_id, year), bits in packed.items()
+        ])
+    db.session.commit()
+    return len(packed)
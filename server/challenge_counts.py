@@ -0,0 +1,69 @@
+from sqlalchemy import func, or_, select
+
+from config import db
+from models import Challenge, ChallengeEntry, ChallengeParticipant
+from etags import bump_list
+
+challenges = Challenge.__table__
+
+
+def entry_added(challenge_id):
+    """Count a newly submitted entry against its challenge in the current transaction."""
+    db.session.execute(
+        challenges.update().where(challenges.c.id == challenge_id)
+        .values(entry_count=challenges.c.entry_count + 1)
+    )
+    bump_list("challenges")
+
+
+def user_deleted(user_id):
+    """Take a user's participations and entries off their challenges' counters before the user is deleted.
+
+    Run in the deleting transaction; the cascade then removes the rows themselves.
+    """
+    participants = ChallengeParticipant.__table__
+    entries = ChallengeEntry.__table__
+    db.session.execute(
+        challenges.update()
+        .where(challenges.c.id.in_(select(participants.c.challenge_id).where(participants.c.user_id == user_id)))
+        .values(participant_count=challenges.c.participant_count - 1)
+    )
+    own_entries = (
+        select(func.count(entries.c.id))
+        .where(entries.c.user_id == user_id, entries.c.challenge_id == challenges.c.id)
+        .scalar_subquery()
+    )
+    db.session.execute(
+        challenges.update()
+        .where(challenges.c.id.in_(select(entries.c.challenge_id).where(entries.c.user_id == user_id)))
+        .values(entry_count=challenges.c.entry_count - own_entries)
+    )
+    bump_list("challenges")
+
+
+def reconcile():
+    """Repair drifted participant_count/entry_count values in one UPDATE; returns the rows fixed.
+
+    Participant counts move with joins and leaves (see participations.py) and
+    entry counts with submissions; rows deleted any other way (cascades, seeds,
+    manual fixes) leave the counters behind until this runs.
+    """
+    participants = (
+        select(func.count(ChallengeParticipant.id))
+        .where(ChallengeParticipant.challenge_id == challenges.c.id)
+        .scalar_subquery()
+    )
+    entries = (
+        select(func.count(ChallengeEntry.id))
+        .where(ChallengeEntry.challenge_id == challenges.c.id)
+        .scalar_subquery()
+    )
+    result = db.session.execute(
+        challenges.update()
+        .where(or_(challenges.c.participant_count != participants, challenges.c.entry_count != entries))
+        .values(participant_count=participants, entry_count=entries)
+    )
+    if result.rowcount:
+        bump_list("challenges")
+    db.session.commit()
+    return result.rowcount
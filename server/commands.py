@@ -0,0 +1,247 @@
+import json
+import re
+import sys
+
+import click
+from sqlalchemy import event
+
+from config import db
+import streaks
+import leaderboard
+import conversations
+import rollups
+import calendars
+import participations
+import challenge_counts
+import search
+import feed
+import jobs
+from benchmarks import bench_serializers, bench_joins, bench_search
+
+# Tables that grow with user activity and must never be read with a full scan
+BIG_TABLES = {"habit_entries", "habit_streaks", "habit_daily_rollups", "habit_weekly_rollups", "habit_calendars", "challenges", "challenge_entries", "challenge_participants", "challenge_scores", "feed_items", "messages", "conversations", "jobs"}
+
+# Sample requests covering the filter paths each resource takes
+QUERY_PLAN_REQUESTS = [
+    ("/habit-entries", None),
+    ("/habit-entries?user_id=1", None),
+    ("/habit-entries?habit_id=1", None),
+    ("/habit-entries?user_id=1&habit_id=1&start_date=2024-01-01", None),
+    ("/messages", None),
+    ("/messages/threads", None),
+    ("/messages/threads/1", None),
+    ("/users/1/streaks", None),
+    ("/users/1/habits/1/calendar?year=2024", None),
+    ("/analytics/habits", None),
+    ("/analytics/habits?user_id=1", None),
+    ("/analytics/habits?habit_id=1&granularity=month", None),
+    ("/analytics/habits?user_id=1&granularity=day&start_date=2024-01-03&end_date=2024-02-01", None),
+    ("/users/1/conversations", None),
+    ("/challenges/discover?status=upcoming", None),
+    ("/challenges/discover?status=active", None),
+    ("/challenges/discover?status=ended&cursor=WyIyMDI0LTAxLTAxIiwgNV0", None),
+    ("/challenges/discover?created_by=1", None),
+    ("/challenges/discover?sort=popular", None),
+    ("/challenges/discover?status=upcoming&sort=popular&cursor=WzEyLCA1XQ", None),
+    ("/challenges/1/entries", None),
+    ("/challenges/1/participants", None),
+    ("/challenges/1/leaderboard?user_id=1", None),
+    ("/challenge-entries", 1),
+    ("/challenge-participants", 1),
+    ("/challenges/1/participation-status", 1),
+    ("/feed", 1),
+    ("/feed?cursor=WzEwMDBd", 1),
+    ("/jobs/1", None),
+]
+
+FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)$")
+
+
+def capture_statements(app, requests):
+    """Issue each request through the test client and collect the SELECTs it runs."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    client = app.test_client()
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        for path, session_user_id in requests:
+            if session_user_id is not None:
+                with client.session_transaction() as sess:
+                    sess["user_id"] = session_user_id
+            client.get(path)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+    return statements
+
+
+def find_full_scans(statements, tables=BIG_TABLES):
+    """Return (statement, plan detail) pairs where SQLite plans a full scan of a big table."""
+    offenders = []
+    seen = set()
+    with db.engine.connect() as conn:
+        for statement, parameters in statements:
+            if statement in seen:
+                continue
+            seen.add(statement)
+            plan = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).all()
+            for row in plan:
+                detail = row[-1]
+                match = FULL_SCAN.match(detail)
+                if match and match.group(1) in tables:
+                    offenders.append((statement, detail))
+    return offenders
+
+
+def register_commands(app):
+    @app.cli.command("check-query-plans")
+    def check_query_plans():
+        """Fail if any resource query does a full table scan of a big table."""
+        if db.engine.dialect.name != "sqlite":
+            click.echo("check-query-plans only supports SQLite databases")
+            sys.exit(2)
+
+        # Session-authenticated resources need a signing key to fake a login
+        app.secret_key = app.secret_key or "query-plan-check"
+
+        statements = capture_statements(app, QUERY_PLAN_REQUESTS)
+        offenders = find_full_scans(statements)
+        for statement, detail in offenders:
+            click.echo(f"{detail}\n    {' '.join(statement.split())}\n")
+
+        click.echo(f"Checked {len(statements)} statements, {len(offenders)} full scans")
+        if offenders:
+            sys.exit(1)
+
+    @app.cli.command("rebuild-streaks")
+    def rebuild_streaks():
+        """Recompute the habit_streaks table from all habit entries."""
+        count = streaks.rebuild_all()
+        click.echo(f"Rebuilt {count} habit streaks")
+
+    @app.cli.command("rebuild-rollups")
+    def rebuild_rollups():
+        """Recompute the daily and weekly habit rollup tables from all habit entries."""
+        totals = rollups.rebuild_all()
+        for table, count in totals.items():
+            click.echo(f"Rebuilt {count} {table} rows")
+
+    @app.cli.command("rebuild-calendars")
+    def rebuild_calendars():
+        """Repack the habit_calendars table from all habit entries."""
+        count = calendars.rebuild_all()
+        click.echo(f"Rebuilt {count} habit calendars")
+
+    @app.cli.command("rebuild-participations")
+    def rebuild_participations():
+        """Recompute per-user active challenge counts, join ranks and per-challenge join sequences."""
+        users, challenges = participations.rebuild_all()
+        click.echo(f"Reconciled {users} users and {challenges} challenges")
+
+    @app.cli.command("reconcile-challenge-counts")
+    def reconcile_challenge_counts():
+        """Repair drifted participant_count and entry_count values on challenges."""
+        fixed = challenge_counts.reconcile()
+        click.echo(f"Repaired counters on {fixed} challenges")
+
+    @app.cli.command("rebuild-search")
+    def rebuild_search():
+        """Recreate the FTS5 search index and its triggers, then reindex everything."""
+        if not search.available():
+            click.echo("rebuild-search only supports SQLite databases")
+            sys.exit(2)
+        count = search.rebuild_all()
+        click.echo(f"Indexed {count} documents")
+
+    @app.cli.command("rebuild-feed")
+    def rebuild_feed():
+        """Regenerate every activity feed timeline from challenge joins and entries."""
+        count = feed.rebuild_all()
+        click.echo(f"Rebuilt {count} feed items")
+
+    @app.cli.command("trim-feed")
+    @click.option("--length", default=feed.TIMELINE_LENGTH, show_default=True, help="Items kept per timeline.")
+    def trim_feed(length):
+        """Drop feed items beyond the newest --length of each timeline (run from cron)."""
+        count = feed.trim(length)
+        click.echo(f"Trimmed {count} feed items")
+
+    @app.cli.command("rebuild-leaderboards")
+    def rebuild_leaderboards():
+        """Recompute the challenge_scores table from all challenge entries."""
+        count = leaderboard.rebuild_all()
+        click.echo(f"Rebuilt {count} challenge scores")
+
+    @app.cli.command("rebuild-conversations")
+    def rebuild_conversations():
+        """Recompute the conversations inbox index from all messages."""
+        count = conversations.rebuild_all()
+        click.echo(f"Rebuilt {count} conversation rows")
+
+    @app.cli.command("run-jobs")
+    @click.option("--workers", default=2, show_default=True, help="Worker processes to start.")
+    @click.option("--poll", default=jobs.DEFAULT_POLL_INTERVAL, show_default=True, help="Seconds an idle worker waits between polls.")
+    @click.option("--lease", default=jobs.DEFAULT_LEASE, show_default=True, help="Seconds before an unfinished running job is handed out again.")
+    @click.option("--burst", is_flag=True, help="Exit once no job is due instead of waiting for more.")
+    def run_jobs(workers, poll, lease, burst):
+        """Run queued background jobs in a pool of worker processes until interrupted."""
+        click.echo(f"Starting {workers} job workers ({', '.join(jobs.registered())})")
+        exit_codes = jobs.run_pool(workers, poll, lease, burst)
+        if any(exit_codes):
+            sys.exit(1)
+
+    @app.cli.command("enqueue-job")
+    @click.argument("name", type=click.Choice(jobs.registered()))
+    @click.option("--arg", "args", multiple=True, help="Job argument as key=value; values are parsed as JSON when possible.")
+    @click.option("--delay", default=0, show_default=True, help="Seconds before the job becomes due.")
+    def enqueue_job(name, args, delay):
+        """Queue a background job for `flask run-jobs` workers."""
+        kwargs = {}
+        for arg in args:
+            key, _, value = arg.partition("=")
+            try:
+                kwargs[key] = json.loads(value)
+            except ValueError:
+                kwargs[key] = value
+        record = jobs.enqueue(name, kwargs, delay)
+        db.session.commit()
+        click.echo(f"Queued job {record.id} ({name})")
+
+    @app.cli.command("bench-serializers")
+    @click.option("--rows", default=10000, show_default=True, help="Habit entries to serialize.")
+    @click.option("--repeat", default=3, show_default=True, help="Runs per case; the best is reported.")
+    def bench_serializers_command(rows, repeat):
+        """Time schema dumps against precompiled row serializers and compact JSON."""
+        results, sizes = bench_serializers(app, rows, repeat)
+        for name, elapsed in results.items():
+            click.echo(f"{name:<36} {elapsed:8.1f} ms")
+        click.echo(f"payload: pretty {sizes['pretty']:,} bytes, compact {sizes['compact']:,} bytes")
+
+    @app.cli.command("bench-joins")
+    @click.option("--users", default=300, show_default=True, help="Users joining; each makes three attempts.")
+    @click.option("--threads", default=64, show_default=True, help="Concurrent workers released together.")
+    def bench_joins_command(users, threads):
+        """Hammer the atomic challenge join with simultaneous requests and verify limits and ranks."""
+        stats, outcomes, checks = bench_joins(users, threads)
+        click.echo(f"{stats['attempts']} joins on {stats['threads']} threads in {stats['wall_s']:.2f}s "
+                   f"({stats['joins_per_s']:.0f}/s); p50 {stats['p50_ms']:.1f} ms, "
+                   f"p95 {stats['p95_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms")
+        for outcome, count in sorted(outcomes.items()):
+            click.echo(f"  {outcome:<36} {count}")
+        for check, ok in checks.items():
+            click.echo(f"  [{'ok' if ok else 'FAIL'}] {check}")
+        if not all(checks.values()):
+            sys.exit(1)
+
+    @app.cli.command("bench-search")
+    @click.option("--docs", default=200000, show_default=True, help="Habits and challenges to index.")
+    @click.option("--queries", default=200, show_default=True, help="Random keyword queries to time.")
+    def bench_search_command(docs, queries):
+        """Time ranked full-text queries against a generated FTS5 index."""
+        stats = bench_search(docs, queries)
+        click.echo(f"indexed {stats['docs']:,} docs in {stats['index_s']:.1f}s; {stats['queries']} queries: "
+                   f"p50 {stats['p50_ms']:.2f} ms, p95 {stats['p95_ms']:.2f} ms, max {stats['max_ms']:.2f} ms; "
+                   f"{stats['truncated']} ranked only the newest {search.MAX_RANKED_CANDIDATES:,} matches")
@@ -0,0 +1,112 @@
+from datetime import datetime
+
+from sqlalchemy import select, tuple_
+
+from config import db
+from models import Conversation, Message, User
+from upsert import dialect_insert
+
+conversations = Conversation.__table__
+
+
+def record_message(message):
+    """Fold a newly flushed message into both participants' conversation rows.
+
+    Runs in the caller's transaction; the receiver's unread count goes up by one.
+    """
+    sent_at = message.timestamp or datetime.utcnow()
+    sides = [(message.sender_id, message.receiver_id, 0)]
+    if message.receiver_id != message.sender_id:
+        sides.append((message.receiver_id, message.sender_id, 1))
+
+    for user_id, peer_id, unread in sides:
+        stmt = dialect_insert(conversations).values(
+            user_id=user_id,
+            peer_id=peer_id,
+            last_message_id=message.id,
+            last_message_at=sent_at,
+            message_count=1,
+            unread_count=unread,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "peer_id"],
+            set_={
+                "last_message_id": stmt.excluded.last_message_id,
+                "last_message_at": stmt.excluded.last_message_at,
+                "message_count": conversations.c.message_count + 1,
+                "unread_count": conversations.c.unread_count + unread,
+            },
+        )
+        db.session.execute(stmt)
+
+
+def mark_read(user_id, peer_id):
+    """Reset the unread counter on one side of a conversation; returns False if none exists."""
+    result = db.session.execute(
+        conversations.update()
+        .where(conversations.c.user_id == user_id, conversations.c.peer_id == peer_id)
+        .values(unread_count=0)
+    )
+    return result.rowcount > 0
+
+
+def list_conversations(user_id, limit, cursor=None):
+    """One inbox page, most recent first; `cursor` is the (last_message_at, id) of the previous page's last row."""
+    peers = User.__table__
+    messages = Message.__table__
+    stmt = (
+        select(
+            conversations.c.id, conversations.c.peer_id, peers.c.username, peers.c.avatar_url,
+            conversations.c.last_message_id, messages.c.content.label("last_message"),
+            messages.c.sender_id.label("last_sender_id"), conversations.c.last_message_at,
+            conversations.c.message_count, conversations.c.unread_count,
+        )
+        .join(peers, peers.c.id == conversations.c.peer_id)
+        .outerjoin(messages, messages.c.id == conversations.c.last_message_id)
+        .where(conversations.c.user_id == user_id)
+        .order_by(conversations.c.last_message_at.desc(), conversations.c.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        stmt = stmt.where(tuple_(conversations.c.last_message_at, conversations.c.id) < cursor)
+
+    rows = db.session.execute(stmt).all()
+    page = [
+        {
+            "id": row.id,
+            "peer_id": row.peer_id,
+            "username": row.username,
+            "avatar_url": row.avatar_url,
+            "last_message_id": row.last_message_id,
+            "last_message": row.last_message,
+            "last_sender_id": row.last_sender_id,
+            "last_message_at": row.last_message_at.isoformat(),
+            "message_count": row.message_count,
+            "unread_count": row.unread_count,
+        }
+        for row in rows[:limit]
+    ]
+    return page, len(rows) > limit
+
+
+def rebuild_all():
+    """Recompute every conversation row from messages. Unread counts restart at zero."""
+    Conversation.query.delete()
+    messages = Message.__table__
+    totals = {}
+    rows = db.session.execute(
+        select(messages.c.id, messages.c.sender_id, messages.c.receiver_id, messages.c.timestamp)
+        .order_by(messages.c.timestamp, messages.c.id)
+    )
+    for message_id, sender_id, receiver_id, timestamp in rows:
+        for user_id, peer_id in {(sender_id, receiver_id), (receiver_id, sender_id)}:
+            total = totals.setdefault((user_id, peer_id), {
+                "user_id": user_id, "peer_id": peer_id, "message_count": 0, "unread_count": 0,
+            })
+            total["message_count"] += 1
+            total["last_message_id"] = message_id
+            total["last_message_at"] = timestamp or datetime.utcnow()
+    if totals:
+        db.session.execute(conversations.insert(), list(totals.values()))
+    db.session.commit()
+    return len(totals)
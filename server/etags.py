@@ -0,0 +1,107 @@
+import hashlib
+from functools import wraps
+
+from flask import Response, g, request
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from config import db
+from models import ListVersion
+from upsert import dialect_insert
+
+list_versions = ListVersion.__table__
+_tracked = {}  # list name -> [(model, predicate or None)]
+
+
+def row_version(column, id_column, ident):
+    """Fetch only the version column of one row; None if the row doesn't exist."""
+    return db.session.query(column).filter(id_column == ident).scalar()
+
+
+def aggregate_version(query, model, version_column, aggregate=func.sum):
+    """Summarise a list as (count, aggregate of versions, sum of ids, max id).
+
+    Inserts and deletes move the count or the id sums, and any update bumps a
+    row's version and therefore the version sum, so the tuple changes whenever
+    the list could have. Versioned tables use AUTOINCREMENT, so a new row never
+    takes a deleted row's id and the max id only ever grows on insert.
+    Timestamp versions such as updated_at use func.max.
+    """
+    return tuple(query.with_entities(
+        func.count(model.id), aggregate(version_column), func.sum(model.id), func.max(model.id)
+    ).order_by(None).one())
+
+
+def list_version(name):
+    """The change counter for a list registered with track_list(); one primary key read."""
+    return db.session.query(ListVersion.version).filter(ListVersion.name == name).scalar() or 0
+
+
+def track_list(name, model, predicate=None):
+    """Bump list `name`'s counter whenever a flush inserts, changes or deletes a `model` row.
+
+    `predicate(obj)` narrows which rows belong to the list. The bump joins the
+    flush's transaction, so it commits or rolls back with the change itself.
+    Writes that bypass the ORM must call bump_list() themselves.
+    """
+    _tracked.setdefault(name, []).append((model, predicate))
+
+
+def bump_list(name, connection=None):
+    """Advance list `name`'s counter in the current transaction, creating it on first use."""
+    stmt = dialect_insert(list_versions).values(name=name, version=1)
+    stmt = stmt.on_conflict_do_update(index_elements=["name"], set_={"version": list_versions.c.version + 1})
+    (connection or db.session.connection()).execute(stmt)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_tracked_lists(session, flush_context):
+    if not _tracked:
+        return
+    changed = [*session.new, *session.deleted, *(obj for obj in session.dirty if session.is_modified(obj))]
+    for name, sources in _tracked.items():
+        if any(
+            isinstance(obj, model) and (predicate is None or predicate(obj))
+            for obj in changed for model, predicate in sources
+        ):
+            bump_list(name, session.connection())
+
+
+def make_etag(token):
+    """Strong ETag for one representation: the data version plus the exact request."""
+    raw = f"{token}|{request.full_path}|{request.headers.get('Accept', '')}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def conditional(version_of):
+    """Answer If-None-Match with 304 before the view loads or serializes anything.
+
+    `version_of` receives the view's URL arguments and returns a cheap version
+    token for the data behind the response, or None to skip ETag handling
+    (for example when the row doesn't exist and the view will 404). The tag
+    is left in g.data_version so response_cache.cached, stacked below, keys
+    its entries by it and never serves a body older than the tag.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            token = version_of(**kwargs)
+            if token is None:
+                return view(*args, **kwargs)
+
+            etag = g.data_version = make_etag(token)
+            if etag in request.if_none_match:
+                response = Response(status=304)
+                response.set_etag(etag)
+                return response
+
+            result = view(*args, **kwargs)
+            if isinstance(result, Response):
+                if result.status_code == 200:
+                    result.set_etag(etag)
+                return result
+            if isinstance(result, tuple) and len(result) == 2 and result[1] == 200:
+                return result[0], result[1], {"ETag": f'"{etag}"'}
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,180 @@
+from collections import defaultdict
+from datetime import datetime, time
+
+from sqlalchemy import and_, case, func, literal, select, union_all
+
+from config import db
+from models import Challenge, ChallengeEntry, ChallengeParticipant, FeedItem, User
+
+# Bigger challenges keep one shared timeline that readers merge in at read time
+# instead of copying every item to every participant
+FANOUT_MAX_PARTICIPANTS = 500
+# Newest items kept per timeline; trim() drops the rest
+TIMELINE_LENGTH = 500
+
+items = FeedItem.__table__
+participants = ChallengeParticipant.__table__
+challenges = Challenge.__table__
+entries = ChallengeEntry.__table__
+users = User.__table__
+
+
+def publish(actor_id, challenge_id, verb, ref_id, participant_count, session=None):
+    """Append an activity to the actor's co-participants' timelines, in the caller's transaction.
+
+    Challenges up to FANOUT_MAX_PARTICIPANTS fan out on write with one
+    INSERT ... SELECT over challenge_participants; larger ones get a single
+    shared item (user_id NULL) that timeline() merges in on read. `ref_id` is
+    the entry id for "entry" items and the join rank for "joined" ones.
+    Returns the number of items written.
+    """
+    session = session or db.session
+    now = datetime.utcnow()
+    if participant_count > FANOUT_MAX_PARTICIPANTS:
+        session.execute(items.insert().values(
+            user_id=None, actor_id=actor_id, challenge_id=challenge_id, verb=verb, ref_id=ref_id, created_at=now,
+        ))
+        return 1
+    result = session.execute(items.insert().from_select(
+        ["user_id", "actor_id", "challenge_id", "verb", "ref_id", "created_at"],
+        select(
+            participants.c.user_id, literal(actor_id), literal(challenge_id), literal(verb),
+            literal(ref_id), literal(now, items.c.created_at.type),
+        ).where(participants.c.challenge_id == challenge_id, participants.c.user_id != actor_id),
+    ))
+    return result.rowcount
+
+
+def entry_added(entry, participant_count):
+    """Publish a new challenge entry; `participant_count` is its challenge's, as loaded for the request."""
+    if entry.id is None:
+        db.session.flush()
+    publish(entry.user_id, entry.challenge_id, "entry", entry.id, participant_count)
+
+
+def timeline(user_id, limit, before_id=None):
+    """One page of a reader's feed, newest first; `before_id` is the last item id of the previous page.
+
+    Normally a single (user_id, id) range read. Readers in challenges above
+    FANOUT_MAX_PARTICIPANTS also get those challenges' shared timelines, each
+    read by (challenge_id, id) and merged by id. Returns (items, has_more).
+    """
+    large = db.session.execute(
+        select(participants.c.challenge_id)
+        .join(challenges, challenges.c.id == participants.c.challenge_id)
+        .where(participants.c.user_id == user_id, challenges.c.participant_count > FANOUT_MAX_PARTICIPANTS)
+    ).scalars().all()
+
+    def newest(*conditions):
+        if before_id is not None:
+            conditions += (items.c.id < before_id,)
+        return select(items.c.id).where(*conditions).order_by(items.c.id.desc()).limit(limit + 1)
+
+    page_filter = items.c.user_id == user_id
+    if before_id is not None:
+        page_filter = and_(page_filter, items.c.id < before_id)
+    if large:
+        merged = union_all(*(
+            select(subquery.c.id) for subquery in (
+                newest(items.c.user_id == user_id).subquery(),
+                *(newest(items.c.challenge_id == challenge_id, items.c.user_id.is_(None), items.c.actor_id != user_id)
+                  .subquery() for challenge_id in large),
+            )
+        ))
+        page_filter = items.c.id.in_(merged)
+
+    stmt = (
+        select(
+            items.c.id, items.c.verb, items.c.ref_id, items.c.actor_id, users.c.username, users.c.avatar_url,
+            items.c.challenge_id, challenges.c.name.label("challenge_name"), entries.c.progress,
+            items.c.created_at,
+        )
+        .join(users, users.c.id == items.c.actor_id)
+        .join(challenges, challenges.c.id == items.c.challenge_id)
+        .outerjoin(entries, and_(items.c.verb == "entry", entries.c.id == items.c.ref_id))
+        .where(page_filter)
+        .order_by(items.c.id.desc())
+        .limit(limit + 1)
+    )
+
+    rows = db.session.execute(stmt).all()
+    page = [
+        {
+            "id": row.id,
+            "verb": row.verb,
+            "actor_id": row.actor_id,
+            "username": row.username,
+            "avatar_url": row.avatar_url,
+            "challenge_id": row.challenge_id,
+            "challenge_name": row.challenge_name,
+            "progress": row.progress,
+            "join_rank": row.ref_id if row.verb == "joined" else None,
+            "created_at": row.created_at.isoformat(),
+        }
+        for row in rows[:limit]
+    ]
+    return page, len(rows) > limit
+
+
+def trim(length=TIMELINE_LENGTH):
+    """Drop everything past the newest `length` items of each timeline; returns the rows deleted.
+
+    Writes only ever append, so this runs out of band (flask trim-feed, or the
+    trim-feed background job) rather than on the request path.
+    """
+    position = func.row_number().over(
+        # Personal timelines are keyed by reader, shared ones by challenge
+        partition_by=(items.c.user_id, case((items.c.user_id.is_(None), items.c.challenge_id))),
+        order_by=items.c.id.desc(),
+    ).label("position")
+    ranked = select(items.c.id, position).subquery()
+    result = db.session.execute(
+        items.delete().where(items.c.id.in_(select(ranked.c.id).where(ranked.c.position > length)))
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+def rebuild_all(length=TIMELINE_LENGTH):
+    """Regenerate every timeline from challenge joins and entries with today's memberships.
+
+    Walks activity newest first and stops filling a timeline once it holds
+    `length` items, then inserts oldest first so ids keep chronological order.
+    """
+    members = defaultdict(list)
+    events = []
+    for challenge_id, user_id, participant_id, joined_date, join_rank in db.session.execute(select(
+        participants.c.challenge_id, participants.c.user_id, participants.c.id,
+        participants.c.joined_date, participants.c.join_rank,
+    )):
+        members[challenge_id].append(user_id)
+        events.append((joined_date, 0, participant_id, join_rank or 0, user_id, challenge_id, "joined"))
+    for challenge_id, user_id, entry_id, day in db.session.execute(
+        select(entries.c.challenge_id, entries.c.user_id, entries.c.id, entries.c.date)
+    ):
+        events.append((day, 1, entry_id, entry_id, user_id, challenge_id, "entry"))
+    events.sort(key=lambda event: (event[0] or datetime.min.date(), event[1], event[2]), reverse=True)
+
+    filled = defaultdict(int)
+    rows = []
+    for day, _, _, ref_id, actor_id, challenge_id, verb in events:
+        created_at = datetime.combine(day, time()) if day else datetime.utcnow()
+        readers = members[challenge_id]
+        if len(readers) > FANOUT_MAX_PARTICIPANTS:
+            readers = [None]
+        for reader in readers:
+            key = reader if reader is not None else ("challenge", challenge_id)
+            if reader == actor_id or filled[key] >= length:
+                continue
+            filled[key] += 1
+            rows.append({
+                "user_id": reader, "actor_id": actor_id, "challenge_id": challenge_id,
+                "verb": verb, "ref_id": ref_id, "created_at": created_at,
+            })
+
+    db.session.execute(items.delete())
+    if rows:
+        rows.reverse()
+        db.session.execute(items.insert(), rows)
+    db.session.commit()
+    return len(rows)
@@ -0,0 +1,121 @@
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+
+from config import db
+
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+RECENT_REQUESTS = 50
+
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)|\(\s*%\(\w+\)s(?:\s*,\s*%\(\w+\)s)+\s*\)")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+_WHITESPACE = re.compile(r"\s+")
+_FROM_TABLE = re.compile(r"\bFROM\s+\"?(\w+)", re.IGNORECASE)
+
+
+def fingerprint(statement):
+    """Normalise a statement so repeats with different parameters compare equal."""
+    statement = _IN_LIST.sub("(?)", statement)
+    statement = _LITERAL.sub("?", statement)
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+class SQLInstrumentation:
+    """Counts queries and DB time per Flask request and flags likely N+1 patterns.
+
+    Totals are reported in a Server-Timing header; with SQL_DEBUG enabled the
+    most recent request profiles are also served at /debug/sql.
+    """
+
+    def __init__(self, app=None):
+        self.recent = deque(maxlen=RECENT_REQUESTS)
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("SQL_INSTRUMENTATION", os.environ.get("SQL_INSTRUMENTATION", "1") == "1")
+        app.config.setdefault("SQL_N_PLUS_ONE_THRESHOLD", int(os.environ.get("SQL_N_PLUS_ONE_THRESHOLD", DEFAULT_N_PLUS_ONE_THRESHOLD)))
+        app.config.setdefault("SQL_DEBUG", os.environ.get("SQL_DEBUG", "0") == "1")
+        if not app.config["SQL_INSTRUMENTATION"]:
+            return
+
+        with app.app_context():
+            event.listen(db.engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(db.engine, "after_cursor_execute", self._after_cursor_execute)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+
+        if app.config["SQL_DEBUG"] or app.debug:
+            app.add_url_rule("/debug/sql", "debug_sql", self.debug_view)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start"].pop()
+        if not has_app_context() or "sql_stats" not in g:
+            return
+        stats = g.sql_stats
+        stats["count"] += 1
+        stats["time"] += time.perf_counter() - started
+        stats["fingerprints"][fingerprint(statement)] += 1
+
+    def _start_request(self):
+        g.sql_stats = {"count": 0, "time": 0.0, "fingerprints": Counter(), "started": time.perf_counter()}
+
+    def _finish_request(self, response):
+        stats = g.pop("sql_stats", None)
+        if stats is None:
+            return response
+
+        threshold = current_app.config["SQL_N_PLUS_ONE_THRESHOLD"]
+        suspects = [
+            {"statement": statement, "count": count, "table": _table_of(statement)}
+            for statement, count in stats["fingerprints"].most_common()
+            if count > threshold and statement.upper().startswith("SELECT")
+        ]
+        total_ms = (time.perf_counter() - stats["started"]) * 1000
+        db_ms = stats["time"] * 1000
+
+        timings = [
+            f'db;dur={db_ms:.2f};desc="{stats["count"]} queries"',
+            f"app;dur={total_ms:.2f}",
+        ]
+        for suspect in suspects:
+            timings.append(f'n-plus-one;desc="{suspect["table"]} x{suspect["count"]}"')
+            current_app.logger.warning(
+                "Possible N+1 on %s %s: %d x %s", request.method, request.path, suspect["count"], suspect["statement"]
+            )
+        response.headers.add("Server-Timing", ", ".join(timings))
+
+        with self._lock:
+            self.recent.append({
+                "method": request.method,
+                "path": request.full_path.rstrip("?"),
+                "status": response.status_code,
+                "queries": stats["count"],
+                "db_ms": round(db_ms, 2),
+                "total_ms": round(total_ms, 2),
+                "n_plus_one": suspects,
+                "statements": [{"statement": s, "count": c} for s, c in stats["fingerprints"].most_common()],
+            })
+        return response
+
+    def debug_view(self):
+        with self._lock:
+            return {"requests": list(reversed(self.recent))}, 200
+
+
+def _table_of(statement):
+    match = _FROM_TABLE.search(statement)
+    return match.group(1) if match else "?"
+
+
+sql_instrumentation = SQLInstrumentation()
@@ -0,0 +1,310 @@
+import json
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import or_, select
+
+from config import db
+from models import ChallengeEntry, ChallengeParticipant, Habit, HabitEntry, Job, Message, User
+import calendars
+import challenge_counts
+import conversations
+import feed
+import leaderboard
+import participations
+import rollups
+import search
+import streaks
+
+DEFAULT_POLL_INTERVAL = 1.0
+# A running job whose worker has not finished it within this many seconds is
+# presumed dead with its worker and handed out again
+DEFAULT_LEASE = 3600
+BACKOFF_BASE = 30  # seconds before the first retry; doubles with each attempt
+BACKOFF_MAX = 3600
+EXPORT_RETENTION = 7 * 24 * 3600  # seconds an export file is kept for download
+
+jobs = Job.__table__
+_registry = {}  # name -> (function, max_attempts)
+
+
+class UnknownJob(ValueError):
+    pass
+
+
+def job(name, max_attempts=3):
+    """Register a function as a background job; its keyword arguments come from the job's JSON args."""
+    def decorator(func):
+        _registry[name] = (func, max_attempts)
+        return func
+    return decorator
+
+
+def registered():
+    return sorted(_registry)
+
+
+def enqueue(name, args=None, delay=0, session=None, owner_id=None):
+    """Add a job to the caller's transaction; it becomes claimable once that commits.
+
+    Only `owner_id` can read the job back through GET /jobs/<id>.
+    """
+    if name not in _registry:
+        raise UnknownJob(name)
+    session = session or db.session
+    record = Job(
+        name=name,
+        owner_id=owner_id,
+        args=args or {},
+        max_attempts=_registry[name][1],
+        run_at=datetime.utcnow() + timedelta(seconds=delay),
+    )
+    session.add(record)
+    session.flush()
+    return record
+
+
+def backoff(attempts):
+    """Seconds to wait before retry number `attempts`: exponential, capped, with 10% jitter."""
+    delay = min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX)
+    return delay + random.uniform(0, delay / 10)
+
+
+# --- running ---
+
+def claim(worker_id):
+    """Lock the next due job for `worker_id` with one conditional UPDATE; returns it or None.
+
+    The status check in the UPDATE makes racing workers safe: only one can
+    move a given job from queued to running. Postgres also skips rows another
+    worker is already claiming instead of waiting on them.
+    """
+    now = datetime.utcnow()
+    due = (
+        select(jobs.c.id)
+        .where(jobs.c.status == "queued", jobs.c.run_at <= now)
+        .order_by(jobs.c.run_at, jobs.c.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    claimed = db.session.execute(
+        jobs.update()
+        .where(jobs.c.id == due, jobs.c.status == "queued")
+        .values(status="running", locked_by=worker_id, locked_at=now, attempts=jobs.c.attempts + 1)
+        .returning(jobs.c.id, jobs.c.name, jobs.c.args, jobs.c.attempts, jobs.c.max_attempts)
+    ).first()
+    db.session.commit()
+    return claimed
+
+
+def reclaim_expired(lease=DEFAULT_LEASE):
+    """Requeue running jobs whose lease ran out, or fail them if they are out of attempts."""
+    cutoff = datetime.utcnow() - timedelta(seconds=lease)
+    expired = (jobs.c.status == "running", jobs.c.locked_at < cutoff)
+    # Idle workers call this every poll, so only take the write lock when there is work
+    if db.session.execute(select(jobs.c.id).where(*expired).limit(1)).first() is None:
+        db.session.rollback()
+        return 0, 0
+    failed = db.session.execute(
+        jobs.update().where(*expired, jobs.c.attempts >= jobs.c.max_attempts)
+        .values(status="failed", error="Lease expired: worker stopped responding", finished_at=datetime.utcnow())
+    ).rowcount
+    requeued = db.session.execute(
+        jobs.update().where(*expired).values(status="queued", locked_by=None, locked_at=None)
+    ).rowcount
+    db.session.commit()
+    return requeued, failed
+
+
+def _finish(claimed, worker_id, **values):
+    # Only the worker still holding the job may record its outcome
+    db.session.execute(
+        jobs.update()
+        .where(jobs.c.id == claimed.id, jobs.c.status == "running", jobs.c.locked_by == worker_id)
+        .values(**values)
+    )
+    db.session.commit()
+
+
+def run_one(worker_id):
+    """Claim and run one due job; returns the status it ended in, or None if nothing was due."""
+    claimed = claim(worker_id)
+    if claimed is None:
+        return None
+
+    func, _ = _registry.get(claimed.name, (None, None))
+    try:
+        if func is None:
+            raise UnknownJob(claimed.name)
+        result = func(**claimed.args)
+    except Exception as exc:
+        db.session.rollback()
+        error = traceback.format_exc(limit=5)
+        if claimed.attempts < claimed.max_attempts and not isinstance(exc, UnknownJob):
+            _finish(claimed, worker_id, status="queued", error=error, locked_by=None, locked_at=None,
+                    run_at=datetime.utcnow() + timedelta(seconds=backoff(claimed.attempts)))
+            return "queued"
+        _finish(claimed, worker_id, status="failed", error=error, finished_at=datetime.utcnow())
+        return "failed"
+
+    # Round-trip through JSON so tuples and dates store like they will read back
+    result = json.loads(json.dumps(result, default=str))
+    _finish(claimed, worker_id, status="succeeded", result=result, error=None, finished_at=datetime.utcnow())
+    return "succeeded"
+
+
+def work(worker_id, stop, poll_interval=DEFAULT_POLL_INTERVAL, lease=DEFAULT_LEASE, burst=False):
+    """Run jobs until `stop` is set; with `burst`, return as soon as nothing is due."""
+    while not stop.is_set():
+        if run_one(worker_id) is None:
+            reclaim_expired(lease)
+            if burst:
+                return
+            stop.wait(poll_interval)
+
+
+def _worker_main(poll_interval, lease, burst, stop):
+    # Ctrl-C reaches the whole process group; the parent sets `stop` so a job in progress can finish
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    from app import app
+    with app.app_context():
+        work(f"{socket.gethostname()}:{os.getpid()}", stop, poll_interval, lease, burst)
+
+
+def run_pool(workers, poll_interval=DEFAULT_POLL_INTERVAL, lease=DEFAULT_LEASE, burst=False):
+    """Start `workers` processes and wait for them; SIGINT/SIGTERM let current jobs finish first.
+
+    Workers are spawned rather than forked so none inherits the parent's
+    database connections.
+    """
+    context = multiprocessing.get_context("spawn")
+    stop = context.Event()
+    processes = [
+        context.Process(target=_worker_main, args=(poll_interval, lease, burst, stop), name=f"job-worker-{i}")
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        stop.set()
+        for process in processes:
+            process.join()
+    return [process.exitcode for process in processes]
+
+
+def describe(record):
+    """A job's public status; the stored traceback is reduced to its final line."""
+    return {
+        "id": record.id,
+        "name": record.name,
+        "args": record.args,
+        "status": record.status,
+        "attempts": record.attempts,
+        "max_attempts": record.max_attempts,
+        "run_at": record.run_at.isoformat(),
+        "created_at": record.created_at.isoformat(),
+        "started_at": record.locked_at.isoformat() if record.locked_at else None,
+        "finished_at": record.finished_at.isoformat() if record.finished_at else None,
+        "result": record.result,
+        "error": record.error.strip().splitlines()[-1] if record.error else None,
+    }
+
+
+# --- registered jobs ---
+
+job("rebuild-streaks")(streaks.rebuild_all)
+job("rebuild-rollups")(rollups.rebuild_all)
+job("rebuild-calendars")(calendars.rebuild_all)
+job("rebuild-participations")(participations.rebuild_all)
+job("reconcile-challenge-counts")(challenge_counts.reconcile)
+job("rebuild-leaderboards")(leaderboard.rebuild_all)
+job("rebuild-conversations")(conversations.rebuild_all)
+job("rebuild-feed")(feed.rebuild_all)
+job("trim-feed")(feed.trim)
+
+
+@job("rebuild-search", max_attempts=1)
+def rebuild_search():
+    if not search.available():
+        raise RuntimeError("rebuild-search only supports SQLite databases")
+    return search.rebuild_all()
+
+
+def exports_dir():
+    return os.path.join(current_app.instance_path, "exports")
+
+
+# section -> (model, columns that tie a row to the user)
+EXPORT_SECTIONS = {
+    "habits": (Habit, ("user_id",)),
+    "habit_entries": (HabitEntry, ("user_id",)),
+    "challenge_participations": (ChallengeParticipant, ("user_id",)),
+    "challenge_entries": (ChallengeEntry, ("user_id",)),
+    "messages": (Message, ("sender_id", "receiver_id")),
+}
+
+
+@job("export-user")
+def export_user(user_id, batch_size=1000):
+    """Write a user's profile and activity to instance/exports as one JSON file, streaming each section."""
+    users = User.__table__
+    profile = db.session.execute(
+        select(users.c.id, users.c.username, users.c.email, users.c.avatar_url).where(users.c.id == user_id)
+    ).first()
+    if profile is None:
+        raise LookupError(f"User {user_id} not found")
+
+    os.makedirs(exports_dir(), exist_ok=True)
+    filename = f"user-{user_id}-{datetime.utcnow():%Y%m%d%H%M%S%f}.json"
+    path = os.path.join(exports_dir(), filename)
+    rows = 0
+    with open(path + ".tmp", "w") as out:
+        out.write('{"user": ' + json.dumps(profile._asdict()))
+        for section, (model, owners) in EXPORT_SECTIONS.items():
+            table = model.__table__
+            query = (
+                select(table)
+                .where(or_(*(table.c[column] == user_id for column in owners)))
+                .order_by(table.c.id)
+                .execution_options(yield_per=batch_size)
+            )
+            out.write(f', "{section}": [')
+            for i, row in enumerate(db.session.execute(query)):
+                out.write(("," if i else "") + json.dumps(row._asdict(), default=str))
+                rows += 1
+            out.write("]")
+        out.write("}")
+    os.replace(path + ".tmp", path)
+    purge_exports()
+    return {"file": filename, "rows": rows}
+
+
+@job("purge-exports")
+def purge_exports(retention=EXPORT_RETENTION):
+    """Delete export files (and abandoned partial ones) older than `retention` seconds; returns how many.
+
+    Every export run purges on its way out, so instance/exports stays bounded
+    without a scheduler; queue this job to sweep after the last export too.
+    """
+    if not os.path.isdir(exports_dir()):
+        return 0
+    cutoff = time.time() - retention
+    purged = 0
+    with os.scandir(exports_dir()) as entries:
+        for entry in entries:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                purged += 1
+    return purged
@@ -0,0 +1,41 @@
+import json
+import os
+
+from flask import current_app, make_response
+from flask.json.provider import DefaultJSONProvider
+
+
+class CompactJSONProvider(DefaultJSONProvider):
+    """Production JSON: no indentation, no key sorting, no separator padding."""
+
+    compact = True
+    sort_keys = False
+    ensure_ascii = False
+
+    def dumps(self, obj, **kwargs):
+        kwargs.setdefault("default", self.default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        kwargs.setdefault("separators", (",", ":"))
+        return json.dumps(obj, **kwargs)
+
+
+def output_json(data, code, headers=None):
+    """flask_restful representation that encodes with the app's JSON provider.
+
+    flask_restful otherwise calls json.dumps itself and ignores app.json.
+    """
+    response = make_response(current_app.json.dumps(data) + "\n", code)
+    response.headers.extend(headers or {})
+    response.mimetype = "application/json"
+    return response
+
+
+def init_json(app, api):
+    """Pick the JSON mode from JSON_MODE: 'pretty' (the default) or 'production'."""
+    app.config.setdefault("JSON_MODE", os.environ.get("JSON_MODE", "pretty"))
+    if app.config["JSON_MODE"] == "production":
+        app.json = CompactJSONProvider(app)
+        api.representations["application/json"] = output_json
+    else:
+        app.json.compact = False
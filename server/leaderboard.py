@@ -0,0 +1,103 @@
+from sqlalchemy import func
+
+from config import db
+from models import ChallengeEntry, ChallengeScore, User
+from upsert import dialect_insert
+
+# Points per submitted entry; free-form progress text counts as a partial day
+PROGRESS_POINTS = {"completed": 2, "partial": 1, "skipped": 0}
+DEFAULT_POINTS = 1
+
+
+def points_for(progress):
+    return PROGRESS_POINTS.get((progress or "").strip().lower(), DEFAULT_POINTS)
+
+
+def _greatest(a, b):
+    # SQLite spells the two-argument maximum as max(), which is NULL if either side is;
+    # coalescing each side with the other ignores a NULL the way Postgres greatest() does
+    if db.session.get_bind().dialect.name == "sqlite":
+        return func.max(func.coalesce(a, b), func.coalesce(b, a))
+    return func.greatest(a, b)
+
+
+def record_entry(entry):
+    """Add a new challenge entry to its (challenge, user) score in the current transaction."""
+    points = points_for(entry.progress)
+    table = ChallengeScore.__table__
+    stmt = dialect_insert(table).values(
+        challenge_id=entry.challenge_id,
+        user_id=entry.user_id,
+        score=points,
+        entry_count=1,
+        last_entry_date=entry.date,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["challenge_id", "user_id"],
+        set_={
+            "score": table.c.score + points,
+            "entry_count": table.c.entry_count + 1,
+            "last_entry_date": _greatest(table.c.last_entry_date, stmt.excluded.last_entry_date),
+        },
+    )
+    db.session.execute(stmt)
+
+
+def top_scores(challenge_id, limit):
+    """Top `limit` rows for a challenge with competition ranks (1, 2, 2, 4)."""
+    rows = (
+        db.session.query(ChallengeScore.user_id, User.username, User.avatar_url,
+                         ChallengeScore.score, ChallengeScore.entry_count)
+        .join(User, User.id == ChallengeScore.user_id)
+        .filter(ChallengeScore.challenge_id == challenge_id)
+        .order_by(ChallengeScore.score.desc(), ChallengeScore.user_id)
+        .limit(limit)
+        .all()
+    )
+    results = []
+    for position, row in enumerate(rows, start=1):
+        rank = results[-1]["rank"] if results and results[-1]["score"] == row.score else position
+        results.append({
+            "rank": rank,
+            "user_id": row.user_id,
+            "username": row.username,
+            "avatar_url": row.avatar_url,
+            "score": row.score,
+            "entries": row.entry_count,
+        })
+    return results
+
+
+def rank_for(challenge_id, user_id):
+    """A single user's score and rank, or None if they have no entries yet."""
+    mine = ChallengeScore.query.filter_by(challenge_id=challenge_id, user_id=user_id).first()
+    if mine is None:
+        return None
+    higher = (
+        db.session.query(func.count(ChallengeScore.id))
+        .filter(ChallengeScore.challenge_id == challenge_id, ChallengeScore.score > mine.score)
+        .scalar()
+    )
+    return {"rank": higher + 1, "user_id": user_id, "score": mine.score, "entries": mine.entry_count}
+
+
+def rebuild_all():
+    """Recompute every challenge score from challenge_entries."""
+    ChallengeScore.query.delete()
+    totals = {}
+    rows = db.session.query(
+        ChallengeEntry.challenge_id, ChallengeEntry.user_id, ChallengeEntry.progress, ChallengeEntry.date
+    ).yield_per(1000)
+    for challenge_id, user_id, progress, day in rows:
+        total = totals.setdefault((challenge_id, user_id), {
+            "challenge_id": challenge_id, "user_id": user_id,
+            "score": 0, "entry_count": 0, "last_entry_date": None,
+        })
+        total["score"] += points_for(progress)
+        total["entry_count"] += 1
+        if day and (total["last_entry_date"] is None or day > total["last_entry_date"]):
+            total["last_entry_date"] = day
+    if totals:
+        db.session.execute(ChallengeScore.__table__.insert(), list(totals.values()))
+    db.session.commit()
+    return len(totals)
@@ -0,0 +1,187 @@
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+
+from flask import Response, g, request
+
+# Upper bounds in seconds; +Inf is implied
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DEFAULT_FLUSH_INTERVAL = 1.0
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Metrics:
+    """Per-route latency histograms, status counters and an in-flight gauge.
+
+    Each process keeps its own numbers in memory. When METRICS_DIR is set,
+    every worker also snapshots them to METRICS_DIR/<pid>.json (atomically,
+    at most once per METRICS_FLUSH_INTERVAL) and /metrics sums the snapshots
+    of all workers. Counters of exited workers are kept; their gauges are not.
+    """
+
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        self._histograms = {}  # (route, method) -> [bucket counts..., +Inf count]
+        self._sums = {}  # (route, method) -> total seconds
+        self._requests = {}  # (route, method, status) -> count
+        self._in_flight = 0
+        self._last_flush = 0.0
+        self.directory = None
+        self.flush_interval = DEFAULT_FLUSH_INTERVAL
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("METRICS_DIR", os.environ.get("METRICS_DIR"))
+        app.config.setdefault("METRICS_FLUSH_INTERVAL", float(os.environ.get("METRICS_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)))
+        self.directory = app.config["METRICS_DIR"]
+        self.flush_interval = app.config["METRICS_FLUSH_INTERVAL"]
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            atexit.register(self.flush)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule("/metrics", "metrics", self.metrics_view)
+
+    # --- recording ---
+
+    def _start_request(self):
+        g.metrics_started = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+
+    def _finish_request(self, response):
+        started = g.pop("metrics_started", None)
+        if started is not None:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            self.observe(route, request.method, response.status_code, time.perf_counter() - started)
+        return response
+
+    def _teardown_request(self, exc):
+        # after_request is skipped when a request dies before producing a response
+        if g.pop("metrics_started", None) is not None:
+            with self._lock:
+                self._in_flight -= 1
+
+    def observe(self, route, method, status, seconds):
+        key = (route, method)
+        with self._lock:
+            self._in_flight -= 1
+            buckets = self._histograms.get(key)
+            if buckets is None:
+                buckets = self._histograms[key] = [0] * (len(LATENCY_BUCKETS) + 1)
+            buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + seconds
+            status_key = (route, method, str(status))
+            self._requests[status_key] = self._requests.get(status_key, 0) + 1
+            due = self.directory and time.monotonic() - self._last_flush >= self.flush_interval
+        if due:
+            self.flush()
+
+    # --- multiprocess aggregation ---
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "histograms": [[k[0], k[1], list(v), self._sums[k]] for k, v in self._histograms.items()],
+                "requests": [[k[0], k[1], k[2], v] for k, v in self._requests.items()],
+                "in_flight": self._in_flight,
+            }
+
+    def flush(self):
+        if not self.directory:
+            return
+        snapshot = self.snapshot()
+        path = os.path.join(self.directory, f"{snapshot['pid']}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp, path)
+        self._last_flush = time.monotonic()
+
+    def _collect(self):
+        snapshots = [self.snapshot()]
+        if self.directory:
+            own = os.getpid()
+            for path in glob.glob(os.path.join(self.directory, "*.json")):
+                try:
+                    with open(path) as f:
+                        snapshot = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                if snapshot.get("pid") == own:
+                    continue
+                if not _alive(snapshot["pid"]):
+                    snapshot["in_flight"] = 0
+                snapshots.append(snapshot)
+
+        histograms, sums, requests, in_flight = {}, {}, {}, 0
+        for snapshot in snapshots:
+            for route, method, buckets, total in snapshot["histograms"]:
+                merged = histograms.setdefault((route, method), [0] * len(buckets))
+                for i, count in enumerate(buckets):
+                    merged[i] += count
+                sums[(route, method)] = sums.get((route, method), 0.0) + total
+            for route, method, status, count in snapshot["requests"]:
+                requests[(route, method, status)] = requests.get((route, method, status), 0) + count
+            in_flight += snapshot["in_flight"]
+        return histograms, sums, requests, in_flight
+
+    # --- exposition ---
+
+    def render(self):
+        histograms, sums, requests, in_flight = self._collect()
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route and method.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (route, method), buckets in sorted(histograms.items()):
+            labels = f'route="{_escape(route)}",method="{method}"'
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), buckets):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {sums[(route, method)]:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {cumulative}")
+
+        lines += [
+            "# HELP http_requests_total Requests by route, method and status code.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (route, method, status), count in sorted(requests.items()):
+            lines.append(f'http_requests_total{{route="{_escape(route)}",method="{method}",status="{status}"}} {count}')
+
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being served.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {in_flight}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def metrics_view(self):
+        return Response(self.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+metrics = Metrics()
@@ -0,0 +1,59 @@
+"""Add challenge join counters
+
+Revision ID: 0a8d3f6c2e71
+Revises: f7a2c5e81b39
+Create Date: 2026-10-18 13:52:19.664020
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a8d3f6c2e71'
+down_revision = 'f7a2c5e81b39'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('active_challenge_count', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('challenges', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('join_seq', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('challenge_participants', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('join_rank', sa.Integer(), nullable=True))
+
+    # Existing participants are ranked in the order they joined
+    op.execute("""
+        UPDATE challenge_participants SET join_rank = (
+            SELECT COUNT(*) FROM challenge_participants AS earlier
+            WHERE earlier.challenge_id = challenge_participants.challenge_id
+              AND earlier.id <= challenge_participants.id
+        )
+    """)
+    op.execute("""
+        UPDATE challenges SET join_seq = (
+            SELECT COUNT(*) FROM challenge_participants
+            WHERE challenge_participants.challenge_id = challenges.id
+        )
+    """)
+    op.execute("""
+        UPDATE users SET active_challenge_count = (
+            SELECT COUNT(*) FROM challenge_participants
+            WHERE challenge_participants.user_id = users.id
+        )
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('challenge_participants', schema=None) as batch_op:
+        batch_op.drop_column('join_rank')
+
+    with op.batch_alter_table('challenges', schema=None) as batch_op:
+        batch_op.drop_column('join_seq')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('active_challenge_count')
@@ -0,0 +1,40 @@
+"""Add participant and entry counts to challenges
+
+Revision ID: 2c7e9b4d1f08
+Revises: 0a8d3f6c2e71
+Create Date: 2026-10-18 14:27:51.310742
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c7e9b4d1f08'
+down_revision = '0a8d3f6c2e71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('challenges', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('participant_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('entry_count', sa.Integer(), server_default='0', nullable=False))
+
+    op.execute("""
+        UPDATE challenges SET
+            participant_count = (
+                SELECT COUNT(*) FROM challenge_participants
+                WHERE challenge_participants.challenge_id = challenges.id
+            ),
+            entry_count = (
+                SELECT COUNT(*) FROM challenge_entries
+                WHERE challenge_entries.challenge_id = challenges.id
+            )
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('challenges', schema=None) as batch_op:
+        batch_op.drop_column('entry_count')
+        batch_op.drop_column('participant_count')
@@ -0,0 +1,66 @@
+"""Add indexes for hot filter paths
+
+Revision ID: 5b2e9c7d41a0
+Revises: e3b740deb1fd
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b2e9c7d41a0'
+down_revision = 'e3b740deb1fd'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('habits', schema=None) as batch_op:
+        batch_op.create_index('ix_habits_user_id', ['user_id'], unique=False)
+
+    with op.batch_alter_table('habit_entries', schema=None) as batch_op:
+        batch_op.create_index('ix_habit_entries_user_id_date', ['user_id', 'date', 'id'], unique=False)
+        batch_op.create_index('ix_habit_entries_habit_id_date', ['habit_id', 'date', 'id'], unique=False)
+        batch_op.create_index('ix_habit_entries_date', ['date', 'id'], unique=False)
+
+    with op.batch_alter_table('challenges', schema=None) as batch_op:
+        batch_op.create_index('ix_challenges_created_by', ['created_by'], unique=False)
+
+    with op.batch_alter_table('challenge_participants', schema=None) as batch_op:
+        batch_op.create_index('ix_challenge_participants_challenge_id', ['challenge_id'], unique=False)
+
+    with op.batch_alter_table('challenge_entries', schema=None) as batch_op:
+        batch_op.create_index('ix_challenge_entries_user_id_date', ['user_id', 'date'], unique=False)
+        batch_op.create_index('ix_challenge_entries_challenge_id_date', ['challenge_id', 'date'], unique=False)
+
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.create_index('ix_messages_reply_to_id_timestamp', ['reply_to_id', 'timestamp'], unique=False)
+        batch_op.create_index('ix_messages_sender_id', ['sender_id'], unique=False)
+        batch_op.create_index('ix_messages_receiver_id', ['receiver_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_messages_receiver_id')
+        batch_op.drop_index('ix_messages_sender_id')
+        batch_op.drop_index('ix_messages_reply_to_id_timestamp')
+
+    with op.batch_alter_table('challenge_entries', schema=None) as batch_op:
+        batch_op.drop_index('ix_challenge_entries_challenge_id_date')
+        batch_op.drop_index('ix_challenge_entries_user_id_date')
+
+    with op.batch_alter_table('challenge_participants', schema=None) as batch_op:
+        batch_op.drop_index('ix_challenge_participants_challenge_id')
+
+    with op.batch_alter_table('challenges', schema=None) as batch_op:
+        batch_op.drop_index('ix_challenges_created_by')
+
+    with op.batch_alter_table('habit_entries', schema=None) as batch_op:
+        batch_op.drop_index('ix_habit_entries_date')
+        batch_op.drop_index('ix_habit_entries_habit_id_date')
+        batch_op.drop_index('ix_habit_entries_user_id_date')
+
+    with op.batch_alter_table('habits', schema=None) as batch_op:
+        batch_op.drop_index('ix_habits_user_id')
@@ -0,0 +1,28 @@
+"""Add challenge date indexes for discovery
+
+Revision ID: 5e1b8a3c9d26
+Revises: 2c7e9b4d1f08
+Create Date: 2026-10-18 15:03:12.587319
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e1b8a3c9d26'
+down_revision = '2c7e9b4d1f08'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('challenges', schema=None) as batch_op:
+        batch_op.create_index('ix_challenges_start_date', ['start_date', 'id'], unique=False)
+        batch_op.create_index('ix_challenges_end_date', ['end_date', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('challenges', schema=None) as batch_op:
+        batch_op.drop_index('ix_challenges_end_date')
+        batch_op.drop_index('ix_challenges_start_date')
@@ -0,0 +1,36 @@
+"""Add habit_streaks table
+
+Revision ID: 7c3f1a9e2d54
+Revises: 5b2e9c7d41a0
+Create Date: 2026-10-18 10:02:17.554310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3f1a9e2d54'
+down_revision = '5b2e9c7d41a0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('habit_streaks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('habit_id', sa.Integer(), nullable=False),
+    sa.Column('current_streak', sa.Integer(), nullable=False),
+    sa.Column('longest_streak', sa.Integer(), nullable=False),
+    sa.Column('last_completed_date', sa.Date(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['habit_id'], ['habits.id'], name=op.f('fk_habit_streaks_habit_id_habits')),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_habit_streaks_user_id_users')),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'habit_id', name='unique_habit_streak')
+    )
+
+
+def downgrade():
+    op.drop_table('habit_streaks')
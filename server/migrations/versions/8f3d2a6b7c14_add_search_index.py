@@ -0,0 +1,102 @@
+"""Add search_index FTS5 table and sync triggers
+
+Revision ID: 8f3d2a6b7c14
+Revises: 5e1b8a3c9d26
+Create Date: 2026-10-18 15:41:36.220418
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8f3d2a6b7c14'
+down_revision = '5e1b8a3c9d26'
+branch_labels = None
+depends_on = None
+
+# FTS5 is SQLite-only; on other databases /search answers 501 and this is a no-op
+STATEMENTS = [
+    """
+        CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+            kind UNINDEXED, ref_id UNINDEXED, sender_id UNINDEXED, receiver_id UNINDEXED,
+            title, body, tokenize = 'porter unicode61'
+        )
+    """,
+    """
+        INSERT INTO search_index(search_index, rank) VALUES ('rank', 'bm25(0, 0, 0, 0, 10.0, 1.0)')
+    """,
+    """
+        CREATE TRIGGER IF NOT EXISTS habits_search_insert AFTER INSERT ON habits BEGIN
+            INSERT INTO search_index(rowid, kind, ref_id, sender_id, receiver_id, title, body) VALUES (new.id * 4 + 1, 'habit', new.id, NULL, NULL, new.name, coalesce(new.description, ''));
+        END
+    """,
+    """
+        CREATE TRIGGER IF NOT EXISTS habits_search_update AFTER UPDATE OF name, description ON habits BEGIN
+            UPDATE search_index SET title = new.name, body = coalesce(new.description, '')
+            WHERE rowid = new.id * 4 + 1;
+        END
+    """,
+    """
+        CREATE TRIGGER IF NOT EXISTS habits_search_delete AFTER DELETE ON habits BEGIN
+            DELETE FROM search_index WHERE rowid = old.id * 4 + 1;
+        END
+    """,
+    """
+        CREATE TRIGGER IF NOT EXISTS challenges_search_insert AFTER INSERT ON challenges BEGIN
+            INSERT INTO search_index(rowid, kind, ref_id, sender_id, receiver_id, title, body) VALUES (new.id * 4 + 2, 'challenge', new.id, NULL, NULL, new.name, new.description);
+        END
+    """,
+    """
+        CREATE TRIGGER IF NOT EXISTS challenges_search_update AFTER UPDATE OF name, description ON challenges BEGIN
+            UPDATE search_index SET title = new.name, body = new.description
+            WHERE rowid = new.id * 4 + 2;
+        END
+    """,
+    """
+        CREATE TRIGGER IF NOT EXISTS challenges_search_delete AFTER DELETE ON challenges BEGIN
+            DELETE FROM search_index WHERE rowid = old.id * 4 + 2;
+        END
+    """,
+    """
+        CREATE TRIGGER IF NOT EXISTS messages_search_insert AFTER INSERT ON messages BEGIN
+            INSERT INTO search_index(rowid, kind, ref_id, sender_id, receiver_id, title, body) VALUES (new.id * 4 + 3, 'message', new.id, new.sender_id, new.receiver_id, '', new.content);
+        END
+    """,
+    """
+        CREATE TRIGGER IF NOT EXISTS messages_search_update AFTER UPDATE OF content ON messages BEGIN
+            UPDATE search_index SET title = '', body = new.content
+            WHERE rowid = new.id * 4 + 3;
+        END
+    """,
+    """
+        CREATE TRIGGER IF NOT EXISTS messages_search_delete AFTER DELETE ON messages BEGIN
+            DELETE FROM search_index WHERE rowid = old.id * 4 + 3;
+        END
+    """,
+]
+
+BACKFILL = [
+    "INSERT INTO search_index(rowid, kind, ref_id, sender_id, receiver_id, title, body) "
+    "SELECT id * 4 + 1, 'habit', id, NULL, NULL, name, coalesce(description, '') FROM habits",
+    "INSERT INTO search_index(rowid, kind, ref_id, sender_id, receiver_id, title, body) "
+    "SELECT id * 4 + 2, 'challenge', id, NULL, NULL, name, description FROM challenges",
+    "INSERT INTO search_index(rowid, kind, ref_id, sender_id, receiver_id, title, body) "
+    "SELECT id * 4 + 3, 'message', id, sender_id, receiver_id, '', content FROM messages",
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for statement in STATEMENTS + BACKFILL:
+        op.execute(statement)
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for table in ('messages', 'challenges', 'habits'):
+        for action in ('delete', 'update', 'insert'):
+            op.execute(f'DROP TRIGGER IF EXISTS {table}_search_{action}')
+    op.execute('DROP TABLE IF EXISTS search_index')
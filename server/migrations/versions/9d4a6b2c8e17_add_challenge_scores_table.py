@@ -0,0 +1,40 @@
+"""Add challenge_scores table
+
+Revision ID: 9d4a6b2c8e17
+Revises: 7c3f1a9e2d54
+Create Date: 2026-10-18 10:41:05.290731
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4a6b2c8e17'
+down_revision = '7c3f1a9e2d54'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('challenge_scores',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('challenge_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('score', sa.Integer(), nullable=False),
+    sa.Column('entry_count', sa.Integer(), nullable=False),
+    sa.Column('last_entry_date', sa.Date(), nullable=True),
+    sa.ForeignKeyConstraint(['challenge_id'], ['challenges.id'], name=op.f('fk_challenge_scores_challenge_id_challenges')),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_challenge_scores_user_id_users')),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('challenge_id', 'user_id', name='unique_challenge_score')
+    )
+    with op.batch_alter_table('challenge_scores', schema=None) as batch_op:
+        batch_op.create_index('ix_challenge_scores_challenge_id_score', ['challenge_id', 'score', 'user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('challenge_scores', schema=None) as batch_op:
+        batch_op.drop_index('ix_challenge_scores_challenge_id_score')
+
+    op.drop_table('challenge_scores')
@@ -0,0 +1,26 @@
+"""Add challenge participant_count index
+
+Revision ID: a8e3f6b2d930
+Revises: f2d9a7c4b106
+Create Date: 2026-10-18 21:37:20.604118
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a8e3f6b2d930'
+down_revision = 'f2d9a7c4b106'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('challenges', schema=None) as batch_op:
+        batch_op.create_index('ix_challenges_participant_count', ['participant_count', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('challenges', schema=None) as batch_op:
+        batch_op.drop_index('ix_challenges_participant_count')
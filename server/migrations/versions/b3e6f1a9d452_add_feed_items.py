@@ -0,0 +1,43 @@
+"""Add feed_items table
+
+Revision ID: b3e6f1a9d452
+Revises: 8f3d2a6b7c14
+Create Date: 2026-10-18 16:42:13.508261
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e6f1a9d452'
+down_revision = '8f3d2a6b7c14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('feed_items',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('actor_id', sa.Integer(), nullable=False),
+    sa.Column('challenge_id', sa.Integer(), nullable=False),
+    sa.Column('verb', sa.String(length=16), nullable=False),
+    sa.Column('ref_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['actor_id'], ['users.id'], name=op.f('fk_feed_items_actor_id_users')),
+    sa.ForeignKeyConstraint(['challenge_id'], ['challenges.id'], name=op.f('fk_feed_items_challenge_id_challenges')),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_feed_items_user_id_users')),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('feed_items', schema=None) as batch_op:
+        batch_op.create_index('ix_feed_items_challenge_id_id', ['challenge_id', 'id'], unique=False)
+        batch_op.create_index('ix_feed_items_user_id_id', ['user_id', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('feed_items', schema=None) as batch_op:
+        batch_op.drop_index('ix_feed_items_user_id_id')
+        batch_op.drop_index('ix_feed_items_challenge_id_id')
+
+    op.drop_table('feed_items')
@@ -0,0 +1,42 @@
+"""Add conversations table
+
+Revision ID: b81e5f3a0c92
+Revises: 9d4a6b2c8e17
+Create Date: 2026-10-18 11:20:48.673415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b81e5f3a0c92'
+down_revision = '9d4a6b2c8e17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('conversations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('peer_id', sa.Integer(), nullable=False),
+    sa.Column('last_message_id', sa.Integer(), nullable=True),
+    sa.Column('last_message_at', sa.DateTime(), nullable=False),
+    sa.Column('message_count', sa.Integer(), nullable=False),
+    sa.Column('unread_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['last_message_id'], ['messages.id'], name=op.f('fk_conversations_last_message_id_messages'), ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['peer_id'], ['users.id'], name=op.f('fk_conversations_peer_id_users')),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_conversations_user_id_users')),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'peer_id', name='unique_conversation')
+    )
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.create_index('ix_conversations_user_id_last_message_at', ['user_id', 'last_message_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('conversations', schema=None) as batch_op:
+        batch_op.drop_index('ix_conversations_user_id_last_message_at')
+
+    op.drop_table('conversations')
@@ -0,0 +1,37 @@
+"""Add owner to jobs
+
+Revision ID: c4f7a1d8e529
+Revises: a8e3f6b2d930
+Create Date: 2026-10-18 22:02:51.338904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4f7a1d8e529'
+down_revision = 'a8e3f6b2d930'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('owner_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(batch_op.f('fk_jobs_owner_id_users'), 'users', ['owner_id'], ['id'])
+        batch_op.create_index('ix_jobs_owner_id', ['owner_id'], unique=False)
+
+    # Exports were the only jobs queued for a user; hand existing ones to that user
+    op.execute(
+        "UPDATE jobs SET owner_id = CAST(json_extract(args, '$.user_id') AS INTEGER) WHERE name = 'export-user'"
+        if op.get_bind().dialect.name == 'sqlite' else
+        "UPDATE jobs SET owner_id = CAST(args::json->>'user_id' AS INTEGER) WHERE name = 'export-user'"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_jobs_owner_id')
+        batch_op.drop_constraint(batch_op.f('fk_jobs_owner_id_users'), type_='foreignkey')
+        batch_op.drop_column('owner_id')
@@ -0,0 +1,28 @@
+"""Add version columns for ETags
+
+Revision ID: c6a0d8e4f215
+Revises: b81e5f3a0c92
+Create Date: 2026-10-18 11:58:33.402187
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6a0d8e4f215'
+down_revision = 'b81e5f3a0c92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('users', 'habits', 'habit_entries', 'messages'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    for table in ('messages', 'habit_entries', 'habits', 'users'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('version')
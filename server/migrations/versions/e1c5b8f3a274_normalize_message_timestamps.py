@@ -0,0 +1,29 @@
+"""Normalize message timestamps
+
+Revision ID: e1c5b8f3a274
+Revises: d7a4c2e9b615
+Create Date: 2026-10-18 20:41:12.530917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1c5b8f3a274'
+down_revision = 'd7a4c2e9b615'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # SQLite's CURRENT_TIMESTAMP default stored 'YYYY-MM-DD HH:MM:SS' while
+    # SQLAlchemy binds '... HH:MM:SS.ffffff', so the two never compared as equal
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute(sa.text(
+            "UPDATE messages SET timestamp = timestamp || '.000000' WHERE length(timestamp) = 19"
+        ))
+
+
+def downgrade():
+    pass
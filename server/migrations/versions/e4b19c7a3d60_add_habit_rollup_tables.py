@@ -0,0 +1,45 @@
+"""Add habit rollup tables
+
+Revision ID: e4b19c7a3d60
+Revises: c6a0d8e4f215
+Create Date: 2026-10-18 12:41:07.218846
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b19c7a3d60'
+down_revision = 'c6a0d8e4f215'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ('habit_daily_rollups', 'habit_weekly_rollups'):
+        op.create_table(table,
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('habit_id', sa.Integer(), nullable=False),
+        sa.Column('period_start', sa.Date(), nullable=False),
+        sa.Column('completed', sa.Integer(), nullable=False),
+        sa.Column('partial', sa.Integer(), nullable=False),
+        sa.Column('skipped', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['habit_id'], ['habits.id'], name=op.f(f'fk_{table}_habit_id_habits')),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f(f'fk_{table}_user_id_users')),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'habit_id', 'period_start', name=f'unique_{table[:-1]}')
+        )
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(f'ix_{table}_habit_id_period_start', ['habit_id', 'period_start'], unique=False)
+            batch_op.create_index(f'ix_{table}_period_start', ['period_start'], unique=False)
+
+
+def downgrade():
+    for table in ('habit_weekly_rollups', 'habit_daily_rollups'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(f'ix_{table}_period_start')
+            batch_op.drop_index(f'ix_{table}_habit_id_period_start')
+
+        op.drop_table(table)
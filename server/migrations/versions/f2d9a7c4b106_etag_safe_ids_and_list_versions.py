@@ -0,0 +1,65 @@
+"""Never reuse ids on versioned tables, cover habit entry versions, add list_versions
+
+Revision ID: f2d9a7c4b106
+Revises: e1c5b8f3a274
+Create Date: 2026-10-18 21:06:48.117352
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2d9a7c4b106'
+down_revision = 'e1c5b8f3a274'
+branch_labels = None
+depends_on = None
+
+# ETags summarise rows by id and version, so a deleted row's id must not come back
+AUTOINCREMENT_TABLES = ('users', 'habits', 'habit_entries', 'challenges', 'messages')
+
+
+def _rebuild(table, autoincrement):
+    # Rebuilding drops the table's triggers (the search index sync), so put them back after
+    bind = op.get_bind()
+    triggers = bind.execute(
+        sa.text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = :table"), {'table': table}
+    ).scalars().all()
+    with op.batch_alter_table(table, schema=None, recreate='always',
+                              table_kwargs={'sqlite_autoincrement': autoincrement}):
+        pass
+    for statement in triggers:
+        op.execute(statement)
+
+
+def upgrade():
+    op.create_table('list_versions',
+    sa.Column('name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("INSERT INTO list_versions (name, version) VALUES ('messages', 0)")
+
+    with op.batch_alter_table('habit_entries', schema=None) as batch_op:
+        batch_op.drop_index('ix_habit_entries_user_id_date')
+        batch_op.drop_index('ix_habit_entries_habit_id_date')
+        batch_op.create_index('ix_habit_entries_user_id_date', ['user_id', 'date', 'id', 'version'], unique=False)
+        batch_op.create_index('ix_habit_entries_habit_id_date', ['habit_id', 'date', 'id', 'version'], unique=False)
+
+    if op.get_bind().dialect.name == 'sqlite':
+        for table in AUTOINCREMENT_TABLES:
+            _rebuild(table, True)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        for table in reversed(AUTOINCREMENT_TABLES):
+            _rebuild(table, False)
+
+    with op.batch_alter_table('habit_entries', schema=None) as batch_op:
+        batch_op.drop_index('ix_habit_entries_habit_id_date')
+        batch_op.drop_index('ix_habit_entries_user_id_date')
+        batch_op.create_index('ix_habit_entries_habit_id_date', ['habit_id', 'date', 'id'], unique=False)
+        batch_op.create_index('ix_habit_entries_user_id_date', ['user_id', 'date', 'id'], unique=False)
+
+    op.drop_table('list_versions')
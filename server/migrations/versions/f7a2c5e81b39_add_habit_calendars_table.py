@@ -0,0 +1,35 @@
+"""Add habit_calendars table
+
+Revision ID: f7a2c5e81b39
+Revises: e4b19c7a3d60
+Create Date: 2026-10-18 13:20:44.905132
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f7a2c5e81b39'
+down_revision = 'e4b19c7a3d60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('habit_calendars',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('habit_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('bits', sa.LargeBinary(length=92), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['habit_id'], ['habits.id'], name=op.f('fk_habit_calendars_habit_id_habits')),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], name=op.f('fk_habit_calendars_user_id_users')),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'habit_id', 'year', name='unique_habit_calendar')
+    )
+
+
+def downgrade():
+    op.drop_table('habit_calendars')
@@ -12,16 +12,33 @@ class User(db.Model, SerializerMixin):
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.String(128), nullable=False)
     avatar_url = db.Column(db.String(255), nullable=True)
+    active_challenge_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
 
     # Relationships
     habits = db.relationship("Habit", back_populates="user", cascade="all, delete-orphan")
     user_habits = db.relationship("UserHabit", back_populates="user", cascade="all, delete-orphan")
     habit_entries = db.relationship("HabitEntry", back_populates="user", cascade="all, delete-orphan")
+    habit_streaks = db.relationship("HabitStreak", back_populates="user", cascade="all, delete-orphan")
+    daily_rollups = db.relationship("HabitDailyRollup", back_populates="user", cascade="all, delete-orphan")
+    weekly_rollups = db.relationship("HabitWeeklyRollup", back_populates="user", cascade="all, delete-orphan")
+    habit_calendars = db.relationship("HabitCalendar", back_populates="user", cascade="all, delete-orphan")
     challenges_created = db.relationship("Challenge", back_populates="creator", cascade="all, delete-orphan")
     challenge_participations = db.relationship("ChallengeParticipant", back_populates="user", cascade="all, delete-orphan")
     challenge_entries = db.relationship("ChallengeEntry", back_populates="user", cascade="all, delete-orphan")
+    challenge_scores = db.relationship("ChallengeScore", back_populates="user", cascade="all, delete-orphan")
     sent_messages = db.relationship("Message", back_populates="sender", foreign_keys="Message.sender_id", cascade="all, delete-orphan")
     received_messages = db.relationship("Message", back_populates="receiver", foreign_keys="Message.receiver_id", cascade="all, delete-orphan")
+    conversations = db.relationship("Conversation", back_populates="user", foreign_keys="Conversation.user_id", cascade="all, delete-orphan")
+    peer_conversations = db.relationship("Conversation", back_populates="peer", foreign_keys="Conversation.peer_id", cascade="all, delete-orphan")
+    feed_items = db.relationship("FeedItem", back_populates="user", foreign_keys="FeedItem.user_id", cascade="all, delete-orphan")
+    feed_activity = db.relationship("FeedItem", back_populates="actor", foreign_keys="FeedItem.actor_id", cascade="all, delete-orphan")
+    jobs = db.relationship("Job", back_populates="owner", cascade="all, delete-orphan")
+
+    # Never reuse a deleted row's id, or its ETag could match the old row's
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    __mapper_args__ = {"version_id_col": version}
 
 
 
@@ -44,11 +61,23 @@ class Habit(db.Model, SerializerMixin):
     description = db.Column(db.Text)
     frequency = db.Column(db.String(50))
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
 
     # Relationships
     user = db.relationship("User", back_populates="habits")
     user_habits = db.relationship("UserHabit", back_populates="habit", cascade="all, delete-orphan")
     habit_entries = db.relationship("HabitEntry", back_populates="habit", cascade="all, delete-orphan")
+    streaks = db.relationship("HabitStreak", back_populates="habit", cascade="all, delete-orphan")
+    daily_rollups = db.relationship("HabitDailyRollup", back_populates="habit", cascade="all, delete-orphan")
+    weekly_rollups = db.relationship("HabitWeeklyRollup", back_populates="habit", cascade="all, delete-orphan")
+    calendars = db.relationship("HabitCalendar", back_populates="habit", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        db.Index("ix_habits_user_id", "user_id"),
+        {"sqlite_autoincrement": True},
+    )
+
+    __mapper_args__ = {"version_id_col": version}
 
     def __repr__(self):
         return f"<Habit {self.name}>"
@@ -86,6 +115,7 @@ class HabitEntry(db.Model, SerializerMixin):
     progress = db.Column(db.String(255), nullable=False)
     notes = db.Column(db.String(255))  # optional notes field
     date = db.Column(db.Date, default=date.today)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
 
     # Relationships
     user = db.relationship("User", back_populates="habit_entries")
@@ -93,8 +123,15 @@ class HabitEntry(db.Model, SerializerMixin):
 
     __table_args__ = (
         db.UniqueConstraint("user_id", "habit_id", "date", name="unique_habit_entry_per_day"),
+        # version rides along so scoped list ETags are summed from the index alone
+        db.Index("ix_habit_entries_user_id_date", "user_id", "date", "id", "version"),
+        db.Index("ix_habit_entries_habit_id_date", "habit_id", "date", "id", "version"),
+        db.Index("ix_habit_entries_date", "date", "id"),
+        {"sqlite_autoincrement": True},
     )
 
+    __mapper_args__ = {"version_id_col": version}
+
     @staticmethod
     def validate_progress(value):
         return value in ['completed', 'skipped', 'partial']
@@ -103,6 +140,108 @@ class HabitEntry(db.Model, SerializerMixin):
         return f"<HabitEntry user_id={self.user_id} habit_id={self.habit_id} date={self.date}>"
 
 
+### --- HabitStreak Model --- ###
+class HabitStreak(db.Model, SerializerMixin):
+    __tablename__ = "habit_streaks"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    habit_id = db.Column(db.Integer, db.ForeignKey("habits.id"), nullable=False)
+    current_streak = db.Column(db.Integer, default=0, nullable=False)
+    longest_streak = db.Column(db.Integer, default=0, nullable=False)
+    last_completed_date = db.Column(db.Date)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    # Relationships
+    user = db.relationship("User", back_populates="habit_streaks")
+    habit = db.relationship("Habit", back_populates="streaks")
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "habit_id", name="unique_habit_streak"),
+    )
+
+    def __repr__(self):
+        return f"<HabitStreak user_id={self.user_id} habit_id={self.habit_id} current={self.current_streak}>"
+
+
+### --- HabitDailyRollup Model --- ###
+class HabitDailyRollup(db.Model, SerializerMixin):
+    """Entry counts by progress for one user+habit on one day."""
+    __tablename__ = "habit_daily_rollups"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    habit_id = db.Column(db.Integer, db.ForeignKey("habits.id"), nullable=False)
+    period_start = db.Column(db.Date, nullable=False)
+    completed = db.Column(db.Integer, default=0, nullable=False)
+    partial = db.Column(db.Integer, default=0, nullable=False)
+    skipped = db.Column(db.Integer, default=0, nullable=False)
+
+    # Relationships
+    user = db.relationship("User", back_populates="daily_rollups")
+    habit = db.relationship("Habit", back_populates="daily_rollups")
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "habit_id", "period_start", name="unique_habit_daily_rollup"),
+        db.Index("ix_habit_daily_rollups_habit_id_period_start", "habit_id", "period_start"),
+        db.Index("ix_habit_daily_rollups_period_start", "period_start"),
+    )
+
+    def __repr__(self):
+        return f"<HabitDailyRollup user_id={self.user_id} habit_id={self.habit_id} day={self.period_start}>"
+
+
+### --- HabitWeeklyRollup Model --- ###
+class HabitWeeklyRollup(db.Model, SerializerMixin):
+    """Entry counts by progress for one user+habit in the ISO week starting on `period_start` (a Monday)."""
+    __tablename__ = "habit_weekly_rollups"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    habit_id = db.Column(db.Integer, db.ForeignKey("habits.id"), nullable=False)
+    period_start = db.Column(db.Date, nullable=False)
+    completed = db.Column(db.Integer, default=0, nullable=False)
+    partial = db.Column(db.Integer, default=0, nullable=False)
+    skipped = db.Column(db.Integer, default=0, nullable=False)
+
+    # Relationships
+    user = db.relationship("User", back_populates="weekly_rollups")
+    habit = db.relationship("Habit", back_populates="weekly_rollups")
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "habit_id", "period_start", name="unique_habit_weekly_rollup"),
+        db.Index("ix_habit_weekly_rollups_habit_id_period_start", "habit_id", "period_start"),
+        db.Index("ix_habit_weekly_rollups_period_start", "period_start"),
+    )
+
+    def __repr__(self):
+        return f"<HabitWeeklyRollup user_id={self.user_id} habit_id={self.habit_id} week={self.period_start}>"
+
+
+### --- HabitCalendar Model --- ###
+class HabitCalendar(db.Model, SerializerMixin):
+    """A year of one user's entries for a habit packed at two bits per day (see calendars.py)."""
+    __tablename__ = "habit_calendars"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    habit_id = db.Column(db.Integer, db.ForeignKey("habits.id"), nullable=False)
+    year = db.Column(db.Integer, nullable=False)
+    bits = db.Column(db.LargeBinary(92), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    # Relationships
+    user = db.relationship("User", back_populates="habit_calendars")
+    habit = db.relationship("Habit", back_populates="calendars")
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "habit_id", "year", name="unique_habit_calendar"),
+    )
+
+    def __repr__(self):
+        return f"<HabitCalendar user_id={self.user_id} habit_id={self.habit_id} year={self.year}>"
+
+
 ### --- Challenge Model --- ###
 class Challenge(db.Model, SerializerMixin):
     __tablename__ = "challenges"
@@ -113,6 +252,9 @@ class Challenge(db.Model, SerializerMixin):
     created_by = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     start_date = db.Column(db.Date, nullable=False)
     end_date = db.Column(db.Date, nullable=False)
+    join_seq = db.Column(db.Integer, nullable=False, default=0, server_default="0")  # last join rank handed out
+    participant_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    entry_count = db.Column(db.Integer, nullable=False, default=0, server_default="0")
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
 
@@ -120,11 +262,47 @@ class Challenge(db.Model, SerializerMixin):
     creator = db.relationship("User", back_populates="challenges_created")
     participants = db.relationship("ChallengeParticipant", back_populates="challenge", cascade="all, delete-orphan")
     entries = db.relationship("ChallengeEntry", back_populates="challenge", cascade="all, delete-orphan")
+    scores = db.relationship("ChallengeScore", back_populates="challenge", cascade="all, delete-orphan")
+    feed_items = db.relationship("FeedItem", back_populates="challenge", cascade="all, delete-orphan")
 
     __table_args__ = (
         db.CheckConstraint("start_date < end_date", name="check_start_date_before_end_date"),
+        db.Index("ix_challenges_created_by", "created_by"),
+        # Status is a date range test, so discovery walks these instead of the whole table
+        db.Index("ix_challenges_start_date", "start_date", "id"),
+        db.Index("ix_challenges_end_date", "end_date", "id"),
+        # Backs the "popular" discover sort and its keyset cursor
+        db.Index("ix_challenges_participant_count", "participant_count", "id"),
+        {"sqlite_autoincrement": True},
     )
 
+    STATUSES = ("upcoming", "active", "ended")
+
+    @staticmethod
+    def status_on(start_date, end_date, today=None):
+        today = today or date.today()
+        if start_date > today:
+            return "upcoming"
+        if end_date < today:
+            return "ended"
+        return "active"
+
+    @property
+    def status(self):
+        return self.status_on(self.start_date, self.end_date)
+
+    @classmethod
+    def status_clause(cls, status, today=None):
+        """SQL predicate for `status` as plain range tests on the indexed date columns."""
+        today = today or date.today()
+        if status == "upcoming":
+            return cls.start_date > today
+        if status == "ended":
+            return cls.end_date < today
+        if status == "active":
+            return db.and_(cls.end_date >= today, cls.start_date <= today)
+        raise ValueError(f"Unknown status: {status}")
+
     def __repr__(self):
         return f"<Challenge {self.name}>"
 
@@ -138,6 +316,7 @@ class ChallengeParticipant(db.Model, SerializerMixin):
     challenge_id = db.Column(db.Integer, db.ForeignKey("challenges.id"), nullable=False)
     joined_date = db.Column(db.Date, default=date.today)
     reason = db.Column(db.String(255))
+    join_rank = db.Column(db.Integer)
 
     # Relationships
     user = db.relationship("User", back_populates="challenge_participations")
@@ -145,6 +324,7 @@ class ChallengeParticipant(db.Model, SerializerMixin):
 
     __table_args__ = (
         db.UniqueConstraint("user_id", "challenge_id", name="unique_user_challenge"),
+        db.Index("ix_challenge_participants_challenge_id", "challenge_id"),
     )
 
     def __repr__(self):
@@ -167,12 +347,66 @@ class ChallengeEntry(db.Model, SerializerMixin):
 
     __table_args__ = (
         db.UniqueConstraint("user_id", "challenge_id", "date", name="unique_challenge_entry_per_day"),
+        db.Index("ix_challenge_entries_user_id_date", "user_id", "date"),
+        db.Index("ix_challenge_entries_challenge_id_date", "challenge_id", "date"),
     )
 
     def __repr__(self):
         return f"<ChallengeEntry user_id={self.user_id} challenge_id={self.challenge_id} date={self.date}>"
 
 
+### --- FeedItem Model --- ###
+class FeedItem(db.Model, SerializerMixin):
+    """One activity in a reader's timeline (see feed.py); user_id is NULL on a large challenge's shared timeline."""
+    __tablename__ = "feed_items"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True)
+    actor_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    challenge_id = db.Column(db.Integer, db.ForeignKey("challenges.id"), nullable=False)
+    verb = db.Column(db.String(16), nullable=False)
+    ref_id = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    user = db.relationship("User", foreign_keys=[user_id], back_populates="feed_items")
+    actor = db.relationship("User", foreign_keys=[actor_id], back_populates="feed_activity")
+    challenge = db.relationship("Challenge", back_populates="feed_items")
+
+    __table_args__ = (
+        db.Index("ix_feed_items_user_id_id", "user_id", "id"),
+        db.Index("ix_feed_items_challenge_id_id", "challenge_id", "id"),
+    )
+
+    def __repr__(self):
+        return f"<FeedItem user_id={self.user_id} actor_id={self.actor_id} verb={self.verb} ref_id={self.ref_id}>"
+
+
+### --- ChallengeScore Model --- ###
+class ChallengeScore(db.Model, SerializerMixin):
+    __tablename__ = "challenge_scores"
+
+    id = db.Column(db.Integer, primary_key=True)
+    challenge_id = db.Column(db.Integer, db.ForeignKey("challenges.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    score = db.Column(db.Integer, default=0, nullable=False)
+    entry_count = db.Column(db.Integer, default=0, nullable=False)
+    last_entry_date = db.Column(db.Date)
+
+    # Relationships
+    challenge = db.relationship("Challenge", back_populates="scores")
+    user = db.relationship("User", back_populates="challenge_scores")
+
+    __table_args__ = (
+        db.UniqueConstraint("challenge_id", "user_id", name="unique_challenge_score"),
+        # Serves top-N (descending scan) and rank (count of higher scores) per challenge
+        db.Index("ix_challenge_scores_challenge_id_score", "challenge_id", "score", "user_id"),
+    )
+
+    def __repr__(self):
+        return f"<ChallengeScore challenge_id={self.challenge_id} user_id={self.user_id} score={self.score}>"
+
+
 ### --- Message Model --- ###
 class Message(db.Model, SerializerMixin):
     __tablename__ = "messages"
@@ -182,7 +416,9 @@ class Message(db.Model, SerializerMixin):
     receiver_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     content = db.Column(db.String, nullable=False)
     reply_to_id = db.Column(db.Integer, db.ForeignKey('messages.id'), nullable=True)
-    timestamp = db.Column(db.DateTime, server_default=db.func.now())
+    # Set in Python so SQLite stores the same text format the thread-list cursor compares against
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, server_default=db.func.now())
+    version = db.Column(db.Integer, nullable=False, default=1, server_default="1")
 
     sender = db.relationship("User", foreign_keys=[sender_id], back_populates="sent_messages")
     receiver = db.relationship("User", foreign_keys=[receiver_id], back_populates="received_messages")
@@ -191,8 +427,85 @@ class Message(db.Model, SerializerMixin):
 
     serialize_rules = ("-sender.sent_messages", "-receiver.received_messages", "-replies.parent",)
 
+    __table_args__ = (
+        db.Index("ix_messages_reply_to_id_timestamp", "reply_to_id", "timestamp"),
+        db.Index("ix_messages_sender_id", "sender_id"),
+        db.Index("ix_messages_receiver_id", "receiver_id"),
+        {"sqlite_autoincrement": True},
+    )
+
+    __mapper_args__ = {"version_id_col": version}
+
     def __repr__(self):
         return f"<Message id={self.id} sender_id={self.sender_id} receiver_id={self.receiver_id}>"
 
 
+### --- Conversation Model --- ###
+class Conversation(db.Model, SerializerMixin):
+    """Inbox index: one row per (user, peer) pair, seen from the user's side."""
+    __tablename__ = "conversations"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    peer_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    last_message_id = db.Column(db.Integer, db.ForeignKey("messages.id", ondelete="SET NULL"), nullable=True)
+    last_message_at = db.Column(db.DateTime, nullable=False)
+    message_count = db.Column(db.Integer, default=0, nullable=False)
+    unread_count = db.Column(db.Integer, default=0, nullable=False)
+
+    user = db.relationship("User", foreign_keys=[user_id], back_populates="conversations")
+    peer = db.relationship("User", foreign_keys=[peer_id], back_populates="peer_conversations")
+    last_message = db.relationship("Message", foreign_keys=[last_message_id])
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "peer_id", name="unique_conversation"),
+        db.Index("ix_conversations_user_id_last_message_at", "user_id", "last_message_at", "id"),
+    )
+
+    def __repr__(self):
+        return f"<Conversation user_id={self.user_id} peer_id={self.peer_id} count={self.message_count}>"
+
+
+### --- Job Model --- ###
+class Job(db.Model, SerializerMixin):
+    """A unit of background work claimed and run by `flask run-jobs` workers (see jobs.py)."""
+    __tablename__ = "jobs"
 
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(64), nullable=False)
+    owner_id = db.Column(db.Integer, db.ForeignKey("users.id"))  # who may see it over the API; None for CLI jobs
+    args = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(db.String(16), nullable=False, default="queued")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    run_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)  # not before; pushed back on retry
+    locked_by = db.Column(db.String(64))
+    locked_at = db.Column(db.DateTime)
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)  # full traceback, for operators; the API only shows its last line
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = db.Column(db.DateTime)
+
+    owner = db.relationship("User", back_populates="jobs")
+
+    __table_args__ = (
+        db.Index("ix_jobs_status_run_at", "status", "run_at", "id"),
+        db.Index("ix_jobs_owner_id", "owner_id"),
+    )
+
+    STATUSES = ("queued", "running", "succeeded", "failed")
+
+    def __repr__(self):
+        return f"<Job id={self.id} name={self.name} status={self.status} attempts={self.attempts}>"
+
+
+### --- ListVersion Model --- ###
+class ListVersion(db.Model, SerializerMixin):
+    """Change counter for a list whose ETag would otherwise need a scan (see etags.track_list)."""
+    __tablename__ = "list_versions"
+
+    name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+
+    def __repr__(self):
+        return f"<ListVersion {self.name}={self.version}>"
@@ -0,0 +1,42 @@
+import base64
+import json
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def parse_limit(value, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+    """Clamp a ?limit= query arg to 1..maximum, falling back to default."""
+    if value is None:
+        return default
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
+
+
+def encode_cursor(*values):
+    """Pack the sort key of the last row on a page into an opaque token."""
+    raw = json.dumps([v.isoformat() if hasattr(v, "isoformat") else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, size):
+    """Unpack a token produced by encode_cursor into a list of `size` raw values."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError):
+        raise InvalidCursor(token)
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor(token)
+    return values
+
+
+def wants_count(args):
+    return args.get("include_count", "").lower() in ("1", "true", "yes")
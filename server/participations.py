@@ -0,0 +1,182 @@
+from datetime import date
+
+from sqlalchemy import bindparam, case, exists, func, literal, select
+from sqlalchemy.exc import IntegrityError
+
+from config import db
+from models import Challenge, ChallengeParticipant, User
+from etags import bump_list
+import feed
+
+MAX_ACTIVE_CHALLENGES = 3
+
+users = User.__table__
+challenges = Challenge.__table__
+participants = ChallengeParticipant.__table__
+
+
+class JoinError(Exception):
+    """A join was refused; `status` is the HTTP status the API answers with."""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def join(user_id, challenge_id, reason="", session=None, enforce_rules=True):
+    """Join a challenge in one transaction and return the participant's join rank.
+
+    Three conditional writes, no reads on the success path:
+      1. bump the user's active_challenge_count, only while it is under the limit
+      2. bump the challenge's join_seq and participant_count, only before it
+         starts (RETURNING the new join_seq)
+      3. insert-select the participant with that rank, only if not already joined
+    then fans a "joined" item out to the other participants' feeds. The first two lock the user and challenge rows, so concurrent joins queue
+    instead of overshooting the limit or sharing a rank. Any refusal rolls the
+    whole transaction back and raises JoinError. `enforce_rules=False` skips the
+    limit and start-date conditions (used when an organiser adds someone).
+    """
+    session = session or db.session
+    today = date.today()
+    try:
+        bump_user = users.update().where(users.c.id == user_id)
+        if enforce_rules:
+            bump_user = bump_user.where(users.c.active_challenge_count < MAX_ACTIVE_CHALLENGES)
+        bumped = session.execute(bump_user.values(active_challenge_count=users.c.active_challenge_count + 1))
+
+        bumped_challenge = inserted = None
+        if bumped.rowcount:
+            bump_challenge = challenges.update().where(challenges.c.id == challenge_id)
+            if enforce_rules:
+                bump_challenge = bump_challenge.where(challenges.c.start_date > today)
+            bumped_challenge = session.execute(
+                bump_challenge.values(
+                    join_seq=challenges.c.join_seq + 1,
+                    participant_count=challenges.c.participant_count + 1,
+                ).returning(challenges.c.join_seq, challenges.c.participant_count)
+            ).first()
+
+        if bumped_challenge is not None:
+            rank = bumped_challenge.join_seq
+            already_joined = exists().where(
+                participants.c.user_id == user_id, participants.c.challenge_id == challenge_id
+            )
+            inserted = session.execute(
+                participants.insert().from_select(
+                    ["user_id", "challenge_id", "reason", "joined_date", "join_rank"],
+                    select(literal(user_id), literal(challenge_id), literal(reason), literal(today), literal(rank))
+                    .where(~already_joined),
+                )
+            )
+    except IntegrityError:
+        # A racing join for the same pair won at the unique constraint
+        inserted = None
+
+    if inserted is not None and inserted.rowcount == 1:
+        feed.publish(user_id, challenge_id, "joined", rank, bumped_challenge.participant_count, session=session)
+        bump_list("challenges", session.connection())
+        session.commit()
+        return rank
+
+    session.rollback()
+    raise _refusal(session, user_id, challenge_id, today, enforce_rules)
+
+
+def _refusal(session, user_id, challenge_id, today, enforce_rules):
+    """Work out why a join was refused; only runs on the failure path."""
+    challenge = session.execute(
+        select(challenges.c.start_date).where(challenges.c.id == challenge_id)
+    ).first()
+    if challenge is None:
+        return JoinError("Challenge not found", 404)
+    if session.execute(select(participants.c.id).where(
+        participants.c.user_id == user_id, participants.c.challenge_id == challenge_id
+    )).first():
+        return JoinError("Already joined this challenge", 409)
+    if session.execute(select(users.c.id).where(users.c.id == user_id)).first() is None:
+        return JoinError("User not found", 404)
+    if enforce_rules and challenge.start_date <= today:
+        return JoinError("Challenge already started", 403)
+    return JoinError(f"Limit reached: {MAX_ACTIVE_CHALLENGES} challenges max", 403)
+
+
+def leave(user_id, challenge_id, session=None):
+    """Delete a participation, release the user's slot and decrement the challenge's
+    participant_count; returns False if there was no participation."""
+    session = session or db.session
+    deleted = session.execute(participants.delete().where(
+        participants.c.user_id == user_id, participants.c.challenge_id == challenge_id
+    ))
+    if not deleted.rowcount:
+        session.rollback()
+        return False
+    session.execute(
+        users.update().where(users.c.id == user_id)
+        .values(active_challenge_count=users.c.active_challenge_count - 1)
+    )
+    session.execute(
+        challenges.update().where(challenges.c.id == challenge_id)
+        .values(participant_count=challenges.c.participant_count - 1)
+    )
+    bump_list("challenges", session.connection())
+    session.commit()
+    return True
+
+
+def challenge_deleted(challenge_id):
+    """Release every participant's slot before a challenge (and its participants) is deleted."""
+    db.session.execute(
+        users.update()
+        .where(users.c.id.in_(select(participants.c.user_id).where(participants.c.challenge_id == challenge_id)))
+        .values(active_challenge_count=users.c.active_challenge_count - 1)
+    )
+
+
+def rebuild_all():
+    """Recompute active_challenge_count for every user and catch join_seq up with the ranks.
+
+    Participants added without a join rank (seeds, imports) are numbered after
+    the existing ranks of their challenge, in id order.
+    """
+    unranked = db.session.execute(
+        select(participants.c.id, participants.c.challenge_id)
+        .where(participants.c.join_rank.is_(None))
+        .order_by(participants.c.challenge_id, participants.c.id)
+    ).all()
+    if unranked:
+        last = dict(db.session.execute(
+            select(participants.c.challenge_id, func.max(participants.c.join_rank))
+            .group_by(participants.c.challenge_id)
+        ).all())
+        ranks = []
+        for participant_id, challenge_id in unranked:
+            last[challenge_id] = (last.get(challenge_id) or 0) + 1
+            ranks.append({"participant_id": participant_id, "rank": last[challenge_id]})
+        db.session.execute(
+            participants.update()
+            .where(participants.c.id == bindparam("participant_id"))
+            .values(join_rank=bindparam("rank")),
+            ranks,
+        )
+
+    count = (
+        select(func.count(participants.c.id))
+        .where(participants.c.user_id == users.c.id)
+        .scalar_subquery()
+    )
+    db.session.execute(users.update().values(active_challenge_count=count))
+    last_rank = (
+        select(func.coalesce(func.max(participants.c.join_rank), 0))
+        .where(participants.c.challenge_id == challenges.c.id)
+        .scalar_subquery()
+    )
+    # Never move a sequence backwards: ranks of participants who left stay retired
+    db.session.execute(challenges.update().values(
+        join_seq=case((last_rank > challenges.c.join_seq, last_rank), else_=challenges.c.join_seq)
+    ))
+    db.session.commit()
+    return (
+        db.session.query(func.count(User.id)).scalar(),
+        db.session.query(func.count(Challenge.id)).scalar(),
+    )
@@ -0,0 +1,312 @@
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+DEFAULT_QUEUE_SIZE = 100
+DEFAULT_MAX_SUBSCRIBERS = 1000
+DEFAULT_POLL_INTERVAL = 0.25
+DEFAULT_RETENTION = 300  # seconds an event stays in the shared log
+PRUNE_EVERY = 500  # publishes between prunes of the shared log
+
+
+def format_event(event_id, event, payload):
+    """A complete Server-Sent Events frame; built once per event and shared by every subscriber."""
+    return f"id: {event_id}\nevent: {event}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    """One client's bounded mailbox of ready-to-send frames.
+
+    Publishing never blocks on a slow client: once `max_queue` frames are
+    waiting, the mailbox is emptied and marked overflowed, and the stream
+    tells the client to resync instead of buffering without limit.
+    """
+
+    def __init__(self, topics, max_queue):
+        self.topics = frozenset(topics)
+        self.max_queue = max_queue
+        self.overflowed = False
+        self._frames = deque()
+        self._ready = threading.Condition()
+
+    def offer(self, frame):
+        """Queue a frame; returns False if this subscriber just overflowed or already had."""
+        with self._ready:
+            if self.overflowed:
+                return False
+            if len(self._frames) >= self.max_queue:
+                self.overflowed = True
+                self._frames.clear()
+                self._ready.notify()
+                return False
+            self._frames.append(frame)
+            self._ready.notify()
+            return True
+
+    def next(self, timeout):
+        """The next queued frame, or None after `timeout` seconds or on overflow."""
+        with self._ready:
+            if not self._frames and not self.overflowed:
+                self._ready.wait(timeout)
+            if self.overflowed or not self._frames:
+                return None
+            return self._frames.popleft()
+
+
+class MemoryBackend:
+    """Delivers straight to this process's subscribers; each gunicorn worker is its own island."""
+
+    name = "memory"
+
+    def __init__(self, deliver):
+        self._deliver = deliver
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def publish(self, topic, event, payload):
+        with self._lock:
+            event_id = next(self._ids)
+        self._deliver(event_id, topic, event, payload)
+
+    def start(self):
+        pass
+
+    def report_counts(self, counts):
+        pass
+
+    def subscriber_counts(self, local):
+        return dict(local)
+
+
+class SQLiteBackend:
+    """Shared event log that every worker process on the host tails.
+
+    Stands in for a network broker such as Redis pub/sub: publishers append
+    to a SQLite file and one listener thread per process polls it and hands
+    new events to that process's subscribers. Events older than `retention`
+    seconds are pruned by publishers. Each process also records its
+    per-topic subscriber counts so stats can sum every live worker.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path, deliver, poll_interval=DEFAULT_POLL_INTERVAL, retention=DEFAULT_RETENTION):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._deliver = deliver
+        self._local = threading.local()
+        self._listener = None
+        self._listener_lock = threading.Lock()
+        self._publishes = 0
+        with self._connect() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS stream_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, topic TEXT NOT NULL, event TEXT NOT NULL,
+                    data TEXT NOT NULL, created_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_stream_events_created_at ON stream_events (created_at);
+                CREATE TABLE IF NOT EXISTS stream_subscribers (
+                    pid INTEGER NOT NULL, topic TEXT NOT NULL, count INTEGER NOT NULL, PRIMARY KEY (pid, topic)
+                );
+            """)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def publish(self, topic, event, payload):
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            "INSERT INTO stream_events (topic, event, data, created_at) VALUES (?, ?, ?, ?)",
+            (topic, event, payload, now),
+        )
+        self._publishes += 1
+        if self._publishes % PRUNE_EVERY == 0:
+            conn.execute("DELETE FROM stream_events WHERE created_at < ?", (now - self.retention,))
+
+    def start(self):
+        """Start this process's listener on first subscribe; it resumes from the log's current end."""
+        with self._listener_lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(target=self._listen, name="stream-listener", daemon=True)
+            self._listener.start()
+
+    def _listen(self):
+        conn = self._connect()
+        last_id = conn.execute("SELECT coalesce(max(id), 0) FROM stream_events").fetchone()[0]
+        while True:
+            rows = conn.execute(
+                "SELECT id, topic, event, data FROM stream_events WHERE id > ? ORDER BY id LIMIT 1000", (last_id,)
+            ).fetchall()
+            for event_id, topic, event, payload in rows:
+                self._deliver(event_id, topic, event, payload)
+                last_id = event_id
+            if len(rows) < 1000:
+                time.sleep(self.poll_interval)
+
+    def report_counts(self, counts):
+        conn = self._connect()
+        pid = os.getpid()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM stream_subscribers WHERE pid = ?", (pid,))
+            conn.executemany(
+                "INSERT INTO stream_subscribers (pid, topic, count) VALUES (?, ?, ?)",
+                [(pid, topic, count) for topic, count in counts.items()],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def subscriber_counts(self, local):
+        """This process's counts plus those every other live worker reported; exited workers' rows are dropped."""
+        conn = self._connect()
+        totals = dict(local)
+        for pid, topic, count in conn.execute(
+            "SELECT pid, topic, count FROM stream_subscribers WHERE pid != ?", (os.getpid(),)
+        ).fetchall():
+            if not _alive(pid):
+                conn.execute("DELETE FROM stream_subscribers WHERE pid = ?", (pid,))
+                continue
+            totals[topic] = totals.get(topic, 0) + count
+        return totals
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Broker:
+    """Topic publish/subscribe feeding the GET /stream Server-Sent Events endpoint.
+
+    Writers publish after their transaction commits; the payload is encoded
+    once and each subscriber gets the same frame in its bounded mailbox.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.queue_size = DEFAULT_QUEUE_SIZE
+        self.max_subscribers = DEFAULT_MAX_SUBSCRIBERS
+        self._topics = {}  # topic -> set of Subscription
+        self._subscriptions = 0
+        self._counters = {"published": 0, "delivered": 0, "overflows": 0, "rejected": 0}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("STREAM_BACKEND", os.environ.get("STREAM_BACKEND", "memory"))
+        app.config.setdefault("STREAM_PATH", os.environ.get("STREAM_PATH"))
+        app.config.setdefault("STREAM_QUEUE_SIZE", int(os.environ.get("STREAM_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)))
+        app.config.setdefault("STREAM_MAX_SUBSCRIBERS", int(os.environ.get("STREAM_MAX_SUBSCRIBERS", DEFAULT_MAX_SUBSCRIBERS)))
+        app.config.setdefault("STREAM_POLL_INTERVAL", float(os.environ.get("STREAM_POLL_INTERVAL", DEFAULT_POLL_INTERVAL)))
+
+        self.queue_size = app.config["STREAM_QUEUE_SIZE"]
+        self.max_subscribers = app.config["STREAM_MAX_SUBSCRIBERS"]
+        backend = app.config["STREAM_BACKEND"]
+        if backend == "memory":
+            self.backend = MemoryBackend(self._deliver)
+        elif backend == "sqlite":
+            path = app.config["STREAM_PATH"] or os.path.join(app.instance_path, "stream_events.db")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.backend = SQLiteBackend(path, self._deliver, app.config["STREAM_POLL_INTERVAL"])
+        else:
+            raise ValueError(f"Unknown STREAM_BACKEND: {backend}")
+
+    def _count(self, counter, amount=1):
+        if amount:
+            with self._lock:
+                self._counters[counter] += amount
+
+    def publish(self, topic, event, data):
+        """Send `data` (JSON-serializable) as `event` to everyone subscribed to `topic`."""
+        if self.backend is None:
+            return
+        self._count("published")
+        self.backend.publish(topic, event, json.dumps(data, separators=(",", ":"), default=str))
+
+    def _deliver(self, event_id, topic, event, payload):
+        with self._lock:
+            subscribers = list(self._topics.get(topic, ()))
+        if not subscribers:
+            return
+        frame = format_event(event_id, event, payload)
+        delivered = overflowed = 0
+        for subscription in subscribers:
+            if subscription.offer(frame):
+                delivered += 1
+            else:
+                overflowed += 1
+                self.unsubscribe(subscription)
+        self._count("delivered", delivered)
+        self._count("overflows", overflowed)
+
+    def subscribe(self, topics):
+        """Register a mailbox for `topics`, or return None when this process is at max_subscribers."""
+        subscription = Subscription(topics, self.queue_size)
+        with self._lock:
+            if self._subscriptions >= self.max_subscribers:
+                self._counters["rejected"] += 1
+                return None
+            self._subscriptions += 1
+            for topic in subscription.topics:
+                self._topics.setdefault(topic, set()).add(subscription)
+            counts = self._local_counts()
+        self.backend.start()
+        self.backend.report_counts(counts)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            removed = False
+            for topic in subscription.topics:
+                subscribers = self._topics.get(topic)
+                if subscribers is not None and subscription in subscribers:
+                    removed = True
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._topics[topic]
+            if not removed:
+                return
+            self._subscriptions -= 1
+            counts = self._local_counts()
+        self.backend.report_counts(counts)
+
+    def _local_counts(self):
+        return {topic: len(subscribers) for topic, subscribers in self._topics.items()}
+
+    def subscriber_counts(self):
+        """Subscribers per topic; with the sqlite backend, summed over every worker on the host."""
+        with self._lock:
+            local = self._local_counts()
+        return self.backend.subscriber_counts(local) if self.backend else local
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["connections"] = self._subscriptions
+        stats["backend"] = self.backend.name if self.backend else "none"
+        stats["topics"] = self.subscriber_counts()
+        return stats
+
+
+broker = Broker()
@@ -0,0 +1,160 @@
+from datetime import timedelta
+
+from sqlalchemy import case, cast, func, select
+
+from config import db
+from models import HabitEntry, HabitDailyRollup, HabitWeeklyRollup
+from upsert import dialect_insert
+
+PROGRESS_COLUMNS = ("completed", "partial", "skipped")
+GRANULARITIES = ("day", "week", "month", "total")
+GROUPINGS = {
+    "user_habit": ("user_id", "habit_id"),
+    "user": ("user_id",),
+    "habit": ("habit_id",),
+}
+
+daily = HabitDailyRollup.__table__
+weekly = HabitWeeklyRollup.__table__
+
+
+def week_start(day):
+    """Monday of the ISO week containing `day`."""
+    return day - timedelta(days=day.weekday())
+
+
+def _week_start_sql(column):
+    if db.session.get_bind().dialect.name == "sqlite":
+        # 'weekday 0' moves forward to Sunday (or stays), so six days back is that week's Monday
+        return func.date(column, "weekday 0", "-6 days", type_=db.Date)
+    return cast(func.date_trunc("week", column), db.Date)
+
+
+def _month_start_sql(column):
+    if db.session.get_bind().dialect.name == "sqlite":
+        return func.date(column, "start of month", type_=db.Date)
+    return cast(func.date_trunc("month", column), db.Date)
+
+
+def record(added=(), removed=()):
+    """Apply entry changes to the daily and weekly rollups in the current transaction.
+
+    `added` and `removed` are (user_id, habit_id, date, progress) tuples; an update
+    is the old values removed plus the new ones added, and pairs that cancel out
+    never reach the database.
+    """
+    deltas = {}
+    for sign, entries in ((1, added), (-1, removed)):
+        for user_id, habit_id, day, progress in entries:
+            if progress in PROGRESS_COLUMNS:
+                key = (user_id, habit_id, day, progress)
+                deltas[key] = deltas.get(key, 0) + sign
+
+    for table, period in ((daily, lambda day: day), (weekly, week_start)):
+        rows = {}
+        for (user_id, habit_id, day, progress), delta in deltas.items():
+            if not delta:
+                continue
+            key = (user_id, habit_id, period(day))
+            row = rows.setdefault(key, {
+                "user_id": user_id, "habit_id": habit_id, "period_start": key[2],
+                "completed": 0, "partial": 0, "skipped": 0,
+            })
+            row[progress] += delta
+        if not rows:
+            continue
+
+        stmt = dialect_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "habit_id", "period_start"],
+            set_={column: table.c[column] + stmt.excluded[column] for column in PROGRESS_COLUMNS},
+        )
+        db.session.execute(stmt, list(rows.values()))
+
+
+def _values(entry):
+    return (entry.user_id, entry.habit_id, entry.date, entry.progress)
+
+
+def entry_saved(entry, previous=None):
+    """Update rollups after a create (previous=None) or update of `entry`.
+
+    `previous` is the (date, progress) pair the entry had before an update.
+    """
+    removed = [(entry.user_id, entry.habit_id, *previous)] if previous is not None else []
+    record(added=[_values(entry)], removed=removed)
+
+
+def entry_deleted(entry):
+    record(removed=[_values(entry)])
+
+
+def summarize(granularity="week", group_by="user_habit", user_id=None, habit_id=None, start=None, end=None):
+    """Aggregate rollup rows into periods of `granularity` per `group_by` key.
+
+    Whole-week ranges (or weekly totals) read the weekly table directly; anything
+    else is a GROUP BY over the daily table. Raw entries are never touched.
+    """
+    aligned = (start is None or start.weekday() == 0) and (end is None or end.weekday() == 6)
+    source = weekly if granularity in ("week", "total") and aligned else daily
+
+    if granularity == "day" or (granularity == "week" and source is weekly):
+        period = source.c.period_start
+    elif granularity == "week":
+        period = _week_start_sql(source.c.period_start)
+    elif granularity == "month":
+        period = _month_start_sql(source.c.period_start)
+    else:
+        period = None
+
+    keys = [source.c[column] for column in GROUPINGS[group_by]]
+    if period is not None:
+        keys.append(period.label("period_start"))
+    sums = [func.sum(source.c[column]).label(column) for column in PROGRESS_COLUMNS]
+
+    stmt = select(*keys, *sums)
+    if user_id is not None:
+        stmt = stmt.where(source.c.user_id == user_id)
+    if habit_id is not None:
+        stmt = stmt.where(source.c.habit_id == habit_id)
+    if start is not None:
+        stmt = stmt.where(source.c.period_start >= start)
+    if end is not None:
+        stmt = stmt.where(source.c.period_start <= end)
+    stmt = stmt.group_by(*keys).order_by(*keys)
+
+    results = []
+    for row in db.session.execute(stmt).mappings():
+        result = {column: row[column] for column in GROUPINGS[group_by]}
+        if period is not None:
+            result["period_start"] = row["period_start"].isoformat()
+        counts = {column: int(row[column] or 0) for column in PROGRESS_COLUMNS}
+        total = sum(counts.values())
+        result.update(counts)
+        result["total"] = total
+        result["completion_rate"] = round(counts["completed"] / total, 4) if total else None
+        results.append(result)
+    return results
+
+
+def rebuild_all():
+    """Recompute both rollup tables from habit_entries with one GROUP BY each."""
+    entries = HabitEntry.__table__
+    counts = [
+        func.sum(case((entries.c.progress == column, 1), else_=0)).label(column)
+        for column in PROGRESS_COLUMNS
+    ]
+    totals = {}
+    for table, period in ((daily, entries.c.date), (weekly, _week_start_sql(entries.c.date))):
+        db.session.execute(table.delete())
+        grouped = (
+            select(entries.c.user_id, entries.c.habit_id, period.label("period_start"), *counts)
+            .where(entries.c.progress.in_(PROGRESS_COLUMNS), entries.c.date.is_not(None))
+            .group_by(entries.c.user_id, entries.c.habit_id, period)
+        )
+        result = db.session.execute(
+            table.insert().from_select(["user_id", "habit_id", "period_start", *PROGRESS_COLUMNS], grouped)
+        )
+        totals[table.name] = result.rowcount
+    db.session.commit()
+    return totals
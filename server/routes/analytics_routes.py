@@ -0,0 +1,44 @@
+from flask_restful import Resource
+from flask import request
+from datetime import date, timedelta
+import rollups
+
+DEFAULT_WINDOW_WEEKS = 12
+
+class HabitAnalyticsResource(Resource):
+    def get(self):  # GET /analytics/habits
+        granularity = request.args.get('granularity', 'week')
+        if granularity not in rollups.GRANULARITIES:
+            return {'error': f'granularity must be one of: {", ".join(rollups.GRANULARITIES)}'}, 400
+
+        group_by = request.args.get('group_by', 'user_habit')
+        if group_by not in rollups.GROUPINGS:
+            return {'error': f'group_by must be one of: {", ".join(rollups.GROUPINGS)}'}, 400
+
+        try:
+            start = date.fromisoformat(request.args['start_date']) if 'start_date' in request.args else None
+            end = date.fromisoformat(request.args['end_date']) if 'end_date' in request.args else None
+        except ValueError:
+            return {'error': 'Invalid date format (use YYYY-MM-DD)'}, 400
+        if start and end and start > end:
+            return {'error': 'start_date must not be after end_date'}, 400
+
+        # Time series default to the last few whole weeks; totals default to all time
+        if start is None and granularity != 'total':
+            start = rollups.week_start(end or date.today()) - timedelta(weeks=DEFAULT_WINDOW_WEEKS - 1)
+
+        results = rollups.summarize(
+            granularity=granularity,
+            group_by=group_by,
+            user_id=request.args.get('user_id', type=int),
+            habit_id=request.args.get('habit_id', type=int),
+            start=start,
+            end=end,
+        )
+        return {
+            'granularity': granularity,
+            'group_by': group_by,
+            'start_date': start.isoformat() if start else None,
+            'end_date': end.isoformat() if end else None,
+            'results': results
+        }, 200
@@ -0,0 +1,91 @@
+from flask_restful import Resource
+from flask import current_app, request
+from urllib.parse import urlsplit
+from werkzeug.test import EnvironBuilder
+
+MAX_BATCH_REQUESTS = 20
+BATCH_METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+# Batching these would recurse or never finish
+UNBATCHABLE_PATHS = ("/batch", "/stream")
+# Credentials every sub-request carries from the batch request itself
+FORWARDED_HEADERS = ("Authorization", "Cookie", "Accept-Language")
+RETURNED_HEADERS = ("ETag", "Location", "Retry-After", "Server-Timing")
+
+def _invalid(message):
+    return {"status": 400, "headers": {}, "body": {"error": message}}
+
+def dispatch(sub):
+    """Run one sub-request through the app's own routing, hooks and error handlers.
+
+    It gets fresh app and request contexts (so its own `g` and DB session),
+    but never leaves the worker: no HTTP, CORS or connection setup per call.
+    Cookies a sub-request sets are dropped, so log in outside a batch.
+    """
+    if not isinstance(sub, dict):
+        return _invalid("Each request must be an object")
+    method = str(sub.get("method", "GET")).upper()
+    path = sub.get("path")
+    if method not in BATCH_METHODS:
+        return _invalid(f"method must be one of: {', '.join(BATCH_METHODS)}")
+    if not isinstance(path, str) or not path.startswith("/"):
+        return _invalid("path must be an absolute path like /habits")
+    url = urlsplit(path)
+    if url.path.rstrip("/") in UNBATCHABLE_PATHS:
+        return _invalid(f"{url.path} cannot be batched")
+    extra_headers = sub.get("headers") or {}
+    if not isinstance(extra_headers, dict):
+        return _invalid("headers must be an object")
+
+    headers = {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+    headers.update({str(name): str(value) for name, value in extra_headers.items()})
+    builder = EnvironBuilder(
+        path=url.path,
+        query_string=url.query,
+        method=method,
+        headers=headers,
+        json=sub.get("body"),
+        base_url=request.host_url,
+        environ_base={"REMOTE_ADDR": request.remote_addr},
+    )
+    app = current_app._get_current_object()
+    try:
+        with app.app_context(), app.request_context(builder.get_environ()):
+            response = None
+            try:
+                response = app.full_dispatch_request()
+                # File responses (send_from_directory) only allow the server to iterate them
+                response.direct_passthrough = False
+                # Read the body before the contexts go, so streamed responses still render
+                body = response.get_json(silent=True) if response.is_json else response.get_data(as_text=True)
+            except Exception as e:
+                current_app.logger.exception("Batched %s %s failed", method, path)
+                if response is not None:
+                    response.close()
+                response = app.make_response(({"error": f"Internal server error: {e}"}, 500))
+                body = response.get_json()
+            result = {
+                "status": response.status_code,
+                "headers": {name: response.headers[name] for name in RETURNED_HEADERS if name in response.headers},
+                "body": body,
+            }
+            response.close()
+    finally:
+        builder.close()
+    return result
+
+class BatchResource(Resource):
+    def post(self):  # POST /batch
+        data = request.get_json(silent=True)
+        subrequests = data.get("requests") if isinstance(data, dict) else None
+        if not isinstance(subrequests, list) or not subrequests:
+            return {"error": "requests must be a non-empty list"}, 400
+        if len(subrequests) > MAX_BATCH_REQUESTS:
+            return {"error": f"At most {MAX_BATCH_REQUESTS} requests per batch"}, 413
+
+        responses = []
+        for sub in subrequests:
+            result = dispatch(sub)
+            if isinstance(sub, dict) and "id" in sub:
+                result = {"id": sub["id"], **result}
+            responses.append(result)
+        return {"responses": responses}, 200
@@ -1,7 +1,13 @@
-from flask import request, session, Blueprint
+from flask import current_app, request, session, Blueprint
 from flask_restful import Resource
 from models import db, ChallengeEntry, ChallengeParticipant, Challenge
 from datetime import date
+import leaderboard
+import challenge_counts
+import feed
+from cache import response_cache
+from pubsub import broker
+from routes.stream_routes import challenge_topic
 
 
 class ChallengeEntryRoutes(Resource):
@@ -41,7 +47,7 @@ class ChallengeEntryRoutes(Resource):
             return {"error": "Challenge not found"}, 404
 
         # Check challenge is active
-        if getattr(challenge, "status", "active") != "active":
+        if challenge.status != "active":
             return {"error": "Challenge is not currently active"}, 403
 
         # Check user is a participant
@@ -71,16 +77,32 @@ class ChallengeEntryRoutes(Resource):
         )
 
         db.session.add(entry)
+        leaderboard.record_entry(entry)
+        challenge_counts.entry_added(challenge_id)
+        feed.entry_added(entry, challenge.participant_count)
         db.session.commit()
+        response_cache.invalidate("challenges", f"challenge:{challenge_id}")
+
+        entry_data = {
+            "id": entry.id,
+            "challenge_id": entry.challenge_id,
+            "progress": entry.progress,
+            "date": str(entry.date)
+        }
+        topic = challenge_topic(challenge_id)
+        # Live updates are best effort: the entry is already saved, so never fail (or retry) the request over them
+        try:
+            if broker.subscriber_counts().get(topic):
+                broker.publish(topic, "entry", {
+                    "entry": {**entry_data, "user_id": user_id},
+                    "standing": leaderboard.rank_for(challenge_id, user_id),
+                })
+        except Exception:
+            current_app.logger.warning("Could not publish entry %s to %s", entry.id, topic, exc_info=True)
 
         return {
             "message": "Entry submitted",
-            "entry": {
-                "id": entry.id,
-                "challenge_id": entry.challenge_id,
-                "progress": entry.progress,
-                "date": str(entry.date)
-            }
+            "entry": entry_data
         }, 201
 
 
@@ -1,7 +1,9 @@
 from flask import request, session, Blueprint, jsonify
 from flask_restful import Resource
 from models import db, ChallengeParticipant, Challenge
-from datetime import date
+from sqlalchemy.orm import joinedload
+import participations
+from cache import response_cache
 
 
 # ----- RESTful Resource Classes -----
@@ -12,7 +14,11 @@ class ChallengeParticipantRoutes(Resource):
         if not user_id:
             return {"error": "Unauthorized"}, 401
 
-        participations = ChallengeParticipant.query.filter_by(user_id=user_id).all()
+        joined = (
+            ChallengeParticipant.query.filter_by(user_id=user_id)
+            .options(joinedload(ChallengeParticipant.challenge))
+            .all()
+        )
 
         return [
             {
@@ -24,7 +30,7 @@ class ChallengeParticipantRoutes(Resource):
                 "joined_date": str(p.joined_date),
                 "reason": p.reason
             }
-            for p in participations
+            for p in joined
         ], 200
 
     def post(self):
@@ -39,32 +45,11 @@ class ChallengeParticipantRoutes(Resource):
         if not challenge_id:
             return {"error": "Missing challenge_id"}, 400
 
-        challenge = Challenge.query.get(challenge_id)
-        if not challenge:
-            return {"error": "Challenge not found"}, 404
-
-        already_joined = ChallengeParticipant.query.filter_by(
-            user_id=user_id, challenge_id=challenge_id
-        ).first()
-        if already_joined:
-            return {"error": "Already joined this challenge"}, 409
-
-        if challenge.start_date and challenge.start_date <= date.today():
-            return {"error": "Challenge already started"}, 403
-
-        if ChallengeParticipant.query.filter_by(user_id=user_id).count() >= 3:
-            return {"error": "Limit reached: 3 challenges max"}, 403
-
-        participation = ChallengeParticipant(
-            user_id=user_id,
-            challenge_id=challenge_id,
-            reason=reason,
-            joined_date=date.today()
-        )
-        db.session.add(participation)
-        db.session.commit()
-
-        rank = ChallengeParticipant.query.filter_by(challenge_id=challenge_id).count()
+        try:
+            rank = participations.join(user_id, challenge_id, reason)
+        except participations.JoinError as e:
+            return {"error": e.message}, e.status
+        response_cache.invalidate("challenges", f"challenge:{challenge_id}")
 
         return {
             "message": "Joined successfully",
@@ -80,14 +65,9 @@ class ChallengeParticipantRoutes(Resource):
         data = request.get_json()
         challenge_id = data.get("challenge_id")
 
-        participation = ChallengeParticipant.query.filter_by(
-            user_id=user_id, challenge_id=challenge_id
-        ).first()
-        if not participation:
+        if not participations.leave(user_id, challenge_id):
             return {"error": "Not participating"}, 404
-
-        db.session.delete(participation)
-        db.session.commit()
+        response_cache.invalidate("challenges", f"challenge:{challenge_id}")
 
         return {"message": "Left the challenge"}, 200
 
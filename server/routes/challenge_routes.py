@@ -1,16 +1,32 @@
 from flask_restful import Resource
-from flask import request, jsonify
+from flask import request, jsonify, session
 from models import Challenge, ChallengeParticipant, ChallengeEntry, User, db
 from schemas import ChallengeSchema
-from datetime import datetime
+from streaming import wants_stream, stream_query
+from serializers import challenge_serializer, user_serializer
+from pagination import parse_limit, encode_cursor, decode_cursor, wants_count, InvalidCursor
+import leaderboard
+import participations
+from cache import response_cache
+from etags import conditional, row_version, list_version, track_list
+from datetime import date, datetime
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import joinedload
 
 challenge_schema = ChallengeSchema()
-challenges_schema = ChallengeSchema(many=True)
+
+# Counter columns also move through core UPDATEs, which call bump_list("challenges") themselves
+track_list("challenges", Challenge)
 
 class ChallengeListResource(Resource):
+    @conditional(lambda: list_version("challenges"))
+    @response_cache.cached("challenges")
     def get(self):  # GET /challenges
-        challenges = Challenge.query.all()
-        return challenges_schema.dump(challenges), 200
+        fields = challenge_serializer.requested()
+        query = challenge_serializer.columns(Challenge.query.order_by(Challenge.id), fields)
+        if wants_stream():
+            return stream_query(query, challenge_serializer.row_dumper(fields))
+        return challenge_serializer.dump_rows(query.all(), fields), 200
 
     def post(self):  # POST /challenges
         data = request.get_json()
@@ -38,12 +54,81 @@ class ChallengeListResource(Resource):
 
         db.session.add(new_challenge)
         db.session.commit()
+        response_cache.invalidate("challenges")
         return challenge_schema.dump(new_challenge), 201
 
+# sort name -> (column, descending); ties break on id in the same direction
+DISCOVER_SORTS = {
+    "start_date": ("start_date", False),
+    "-start_date": ("start_date", True),
+    "end_date": ("end_date", False),
+    "-end_date": ("end_date", True),
+    "popular": ("participant_count", True),
+    "newest": ("id", True),
+}
+# Soonest to start, soonest to finish, most recently finished
+DEFAULT_DISCOVER_SORT = {"upcoming": "start_date", "active": "end_date", "ended": "-end_date", None: "newest"}
+
+class ChallengeDiscoverResource(Resource):
+    @response_cache.cached("challenges")
+    def get(self):  # GET /challenges/discover
+        status = request.args.get("status")
+        if status is not None and status not in Challenge.STATUSES:
+            return {"error": f"status must be one of: {', '.join(Challenge.STATUSES)}"}, 400
+
+        sort = request.args.get("sort", DEFAULT_DISCOVER_SORT[status])
+        if sort not in DISCOVER_SORTS:
+            return {"error": f"sort must be one of: {', '.join(DISCOVER_SORTS)}"}, 400
+        sort_column, descending = DISCOVER_SORTS[sort]
+        keys = ("id",) if sort_column == "id" else (sort_column, "id")
+
+        today = date.today()
+        query = Challenge.query
+        if status:
+            query = query.filter(Challenge.status_clause(status, today))
+        if (created_by := request.args.get("created_by", type=int)) is not None:
+            query = query.filter(Challenge.created_by == created_by)
+
+        fields = challenge_serializer.requested()
+        limit = parse_limit(request.args.get("limit"), default=20, maximum=100)
+        response = {}
+        if wants_count(request.args):
+            response["count"] = query.with_entities(func.count(Challenge.id)).scalar()
+
+        key_columns = [getattr(Challenge, key) for key in keys]
+        if cursor := request.args.get("cursor"):
+            try:
+                values = decode_cursor(cursor, len(keys))
+                # Every key is a date or an integer; anything else must not reach the keyset comparison
+                values = [date.fromisoformat(value) if key in ("start_date", "end_date") else int(value)
+                          for key, value in zip(keys, values)]
+            except (InvalidCursor, TypeError, ValueError):
+                return {"error": "Invalid cursor"}, 400
+            after = tuple_(*key_columns) < tuple(values) if descending else tuple_(*key_columns) > tuple(values)
+            query = query.filter(after)
+
+        query = query.order_by(*(c.desc() if descending else c for c in key_columns)).limit(limit + 1)
+        rows = challenge_serializer.columns(query, fields, extra=("start_date", "end_date") + keys).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        # Trailing columns: start_date, end_date, then the sort key
+        n = len(fields)
+        challenges = challenge_serializer.dump_rows(rows, fields)
+        for row, challenge in zip(rows, challenges):
+            challenge["status"] = Challenge.status_on(row[n], row[n + 1], today)
+
+        response["challenges"] = challenges
+        response["next_cursor"] = encode_cursor(*rows[-1][n + 2:]) if has_more else None
+        return response, 200
+
 class ChallengeResource(Resource):
+    @conditional(lambda id: row_version(Challenge.updated_at, Challenge.id, id))
+    @response_cache.cached("challenge:{id}")
     def get(self, id):  # GET /challenges/<id>
-        challenge = Challenge.query.get_or_404(id)
-        return challenge_schema.dump(challenge), 200
+        fields = challenge_serializer.requested()
+        challenge = Challenge.query.options(challenge_serializer.load_only(fields)).filter_by(id=id).first_or_404()
+        return challenge_serializer.dump(challenge, fields), 200
 
     def patch(self, id):  # PATCH /challenges/<id>
         challenge = Challenge.query.get_or_404(id)
@@ -69,20 +154,28 @@ class ChallengeResource(Resource):
             challenge.created_by = data["created_by"]
 
         db.session.commit()
+        response_cache.invalidate("challenges", f"challenge:{id}")
         return challenge_schema.dump(challenge), 200
 
     def delete(self, id):  # DELETE /challenges/<id>
         challenge = Challenge.query.get_or_404(id)
+        participations.challenge_deleted(id)
         db.session.delete(challenge)
         db.session.commit()
+        response_cache.invalidate("challenges", f"challenge:{id}")
         return {"message": "Challenge deleted"}, 200
 
 # New: GET /challenges/<id>/participants
 class ChallengeParticipantsResource(Resource):
     def get(self, id):
-        challenge = Challenge.query.get_or_404(id)
-        participants = [cp.user for cp in challenge.participants]
-        return [p.to_dict() for p in participants], 200
+        Challenge.query.get_or_404(id)
+        fields = user_serializer.requested()
+        query = (
+            User.query.join(ChallengeParticipant, ChallengeParticipant.user_id == User.id)
+            .filter(ChallengeParticipant.challenge_id == id)
+            .order_by(ChallengeParticipant.id)
+        )
+        return user_serializer.dump_rows(user_serializer.columns(query, fields).all(), fields), 200
 
     def post(self, id):
         data = request.get_json()
@@ -94,26 +187,46 @@ class ChallengeParticipantsResource(Resource):
         if not user:
             return {"error": "User not found"}, 404
 
-        existing = ChallengeParticipant.query.filter_by(user_id=user.id, challenge_id=id).first()
-        if existing:
-            return {"message": "User already joined"}, 200
-
-        new_participant = ChallengeParticipant(user_id=user.id, challenge_id=id)
-        db.session.add(new_participant)
-        db.session.commit()
-        return user.to_dict(), 201
+        try:
+            participations.join(user.id, id, enforce_rules=False)
+        except participations.JoinError as e:
+            if e.status == 409:
+                return {"message": "User already joined"}, 200
+            return {"error": e.message}, e.status
+        response_cache.invalidate("challenges", f"challenge:{id}")
+        return user_serializer.dump(user, user_serializer.requested()), 201
 
 # New: GET /challenges/<id>/entries
 class ChallengeEntriesResource(Resource):
     def get(self, id):
-        challenge = Challenge.query.get_or_404(id)
-        entries = challenge.entries
+        Challenge.query.get_or_404(id)
+        entries = (
+            db.session.query(ChallengeEntry.id, User.username, ChallengeEntry.progress, ChallengeEntry.date)
+            .join(User, User.id == ChallengeEntry.user_id)
+            .filter(ChallengeEntry.challenge_id == id)
+            .order_by(ChallengeEntry.id)
+            .all()
+        )
         return [
             {
                 "id": e.id,
-                "username": e.user.username,
+                "username": e.username,
                 "content": e.progress,
                 "createdAt": e.date.isoformat(),
             }
             for e in entries
         ], 200
+
+# New: GET /challenges/<id>/leaderboard
+class ChallengeLeaderboardResource(Resource):
+    def get(self, id):
+        if not db.session.query(Challenge.id).filter_by(id=id).first():
+            return {"error": "Challenge not found"}, 404
+
+        limit = parse_limit(request.args.get("limit"), default=10, maximum=100)
+        response = {"challenge_id": id, "leaderboard": leaderboard.top_scores(id, limit)}
+
+        user_id = request.args.get("user_id", type=int) or session.get("user_id")
+        if user_id:
+            response["me"] = leaderboard.rank_for(id, user_id)
+        return response, 200
@@ -0,0 +1,40 @@
+from flask_restful import Resource
+from flask import request, session
+from datetime import datetime
+from models import db, User
+from pagination import parse_limit, encode_cursor, decode_cursor, InvalidCursor
+import conversations
+
+class UserConversationsResource(Resource):
+    def get(self, user_id):  # GET /users/<id>/conversations
+        if session.get("user_id") != user_id:
+            return {"error": "Unauthorized"}, 401
+        if not db.session.query(User.id).filter_by(id=user_id).first():
+            return {"error": "User not found"}, 404
+
+        limit = parse_limit(request.args.get("limit"), default=20, maximum=100)
+
+        cursor = None
+        if token := request.args.get("cursor"):
+            try:
+                last_message_at, conversation_id = decode_cursor(token, 2)
+                cursor = (datetime.fromisoformat(last_message_at), int(conversation_id))
+            except (InvalidCursor, TypeError, ValueError):
+                return {"error": "Invalid cursor"}, 400
+
+        page, has_more = conversations.list_conversations(user_id, limit, cursor)
+        last = page[-1] if page else None
+        return {
+            "user_id": user_id,
+            "conversations": page,
+            "next_cursor": encode_cursor(last["last_message_at"], last["id"]) if has_more else None
+        }, 200
+
+class ConversationReadResource(Resource):
+    def post(self, user_id, peer_id):  # POST /users/<id>/conversations/<peer_id>/read
+        if session.get("user_id") != user_id:
+            return {"error": "Unauthorized"}, 401
+        if not conversations.mark_read(user_id, peer_id):
+            return {"error": "Conversation not found"}, 404
+        db.session.commit()
+        return {"message": "Conversation marked as read"}, 200
@@ -0,0 +1,26 @@
+from flask_restful import Resource
+from flask import request, session
+from pagination import parse_limit, encode_cursor, decode_cursor, InvalidCursor
+import feed
+
+class FeedResource(Resource):
+    def get(self):  # GET /feed?limit=&cursor=
+        user_id = session.get("user_id")
+        if not user_id:
+            return {"error": "Unauthorized"}, 401
+
+        limit = parse_limit(request.args.get("limit"), default=20, maximum=100)
+
+        before_id = None
+        if token := request.args.get("cursor"):
+            try:
+                (before_id,) = decode_cursor(token, 1)
+                before_id = int(before_id)
+            except (InvalidCursor, TypeError, ValueError):
+                return {"error": "Invalid cursor"}, 400
+
+        items, has_more = feed.timeline(user_id, limit, before_id)
+        return {
+            "items": items,
+            "next_cursor": encode_cursor(items[-1]["id"]) if has_more else None
+        }, 200
@@ -0,0 +1,48 @@
+from flask_restful import Resource
+from flask import request
+from datetime import date
+import base64
+from models import db, User, Habit
+import calendars
+
+class HabitCalendarResource(Resource):
+    def get(self, user_id, habit_id):  # GET /users/<id>/habits/<habit_id>/calendar?year=
+        today = date.today()
+        year = request.args.get('year', today.year, type=int)
+        if not 1 <= year <= 9999:
+            return {'error': 'Invalid year'}, 400
+
+        if not db.session.query(User.id).filter_by(id=user_id).first():
+            return {'error': 'User not found'}, 404
+        if not db.session.query(Habit.id).filter_by(id=habit_id).first():
+            return {'error': 'Habit not found'}, 404
+
+        bits = calendars.get_calendar(user_id, habit_id, year)
+        response = {
+            'user_id': user_id,
+            'habit_id': habit_id,
+            'year': year,
+            'days': calendars.days_in_year(year),
+            # Day n of the year is bits (2n-2, 2n-1) of the little-endian blob
+            'encoding': '2bit-le',
+            'states': list(calendars.STATES),
+            'bits': base64.b64encode(bits).decode('ascii'),
+            **calendars.summarize(bits, calendars.day_index(today) if year == today.year else None),
+        }
+
+        start_date, end_date = request.args.get('start_date'), request.args.get('end_date')
+        if start_date or end_date:
+            try:
+                start = date.fromisoformat(start_date) if start_date else date(year, 1, 1)
+                end = date.fromisoformat(end_date) if end_date else date(year, 12, 31)
+            except ValueError:
+                return {'error': 'Invalid date format (use YYYY-MM-DD)'}, 400
+            if start.year != year or end.year != year or start > end:
+                return {'error': f'start_date and end_date must fall within {year}, in order'}, 400
+            response['range'] = {
+                'start_date': start.isoformat(),
+                'end_date': end.isoformat(),
+                'counts': calendars.range_counts(bits, calendars.day_index(start), calendars.day_index(end)),
+            }
+
+        return response, 200
@@ -1,39 +1,83 @@
 from flask_restful import Resource
 from flask import request
 from datetime import date
-from models import HabitEntry, db
+from sqlalchemy import func, tuple_
+from models import Habit, HabitEntry, UserHabit, db
 from schemas import HabitEntrySchema
+from pagination import parse_limit, encode_cursor, decode_cursor, wants_count, InvalidCursor
+from upsert import dialect_insert
+import streaks
+import rollups
+import calendars
+from serializers import habit_entry_serializer
+from etags import conditional, row_version, aggregate_version
 
 habit_entry_schema = HabitEntrySchema()
-habit_entries_schema = HabitEntrySchema(many=True)
+
+MAX_BULK_ENTRIES = 1000
+
+def filtered_entries():
+    """HabitEntry query narrowed by the list filters in the request args."""
+    query = HabitEntry.query
+
+    filters = {
+        'user_id': request.args.get('user_id', type=int),
+        'habit_id': request.args.get('habit_id', type=int),
+        'progress': request.args.get('progress')
+    }
+
+    for key, value in filters.items():
+        if value is not None:
+            query = query.filter(getattr(HabitEntry, key) == value)
+
+    if start_date := request.args.get('start_date'):
+        start_date = date.fromisoformat(start_date)
+        query = query.filter(HabitEntry.date >= start_date)
+
+    if end_date := request.args.get('end_date'):
+        end_date = date.fromisoformat(end_date)
+        query = query.filter(HabitEntry.date <= end_date)
+
+    return query
+
+def entry_list_version():
+    """ETag token for a user- or habit-scoped list; unscoped lists skip ETags
+    because summarising them would read the whole table on every request."""
+    if request.args.get('user_id') is None and request.args.get('habit_id') is None:
+        return None
+    return aggregate_version(filtered_entries(), HabitEntry, HabitEntry.version)
 
 class HabitEntryListResource(Resource):
+    @conditional(entry_list_version)
     def get(self):  # GET /habit-entries
-        query = HabitEntry.query
+        fields = habit_entry_serializer.requested()
+        query = filtered_entries()
 
-        filters = {
-            'user_id': request.args.get('user_id', type=int),
-            'habit_id': request.args.get('habit_id', type=int),
-            'progress': request.args.get('progress')
-        }
+        limit = parse_limit(request.args.get('limit'))
+        response = {}
 
-        for key, value in filters.items():
-            if value is not None:
-                query = query.filter(getattr(HabitEntry, key) == value)
+        if wants_count(request.args):
+            response['count'] = query.with_entities(func.count(HabitEntry.id)).scalar()
 
-        if start_date := request.args.get('start_date'):
-            start_date = date.fromisoformat(start_date)
-            query = query.filter(HabitEntry.date >= start_date)
+        if cursor := request.args.get('cursor'):
+            try:
+                cursor_date, cursor_id = decode_cursor(cursor, 2)
+                cursor_date, cursor_id = date.fromisoformat(cursor_date), int(cursor_id)
+            except (InvalidCursor, TypeError, ValueError):
+                return {'error': 'Invalid cursor'}, 400
+            query = query.filter(tuple_(HabitEntry.date, HabitEntry.id) < (cursor_date, cursor_id))
 
-        if end_date := request.args.get('end_date'):
-            end_date = date.fromisoformat(end_date)
-            query = query.filter(HabitEntry.date <= end_date)
+        # Fetch one extra row to know whether another page exists
+        query = query.order_by(HabitEntry.date.desc(), HabitEntry.id.desc()).limit(limit + 1)
+        entries = habit_entry_serializer.columns(query, fields, extra=('date', 'id')).all()
+        has_more = len(entries) > limit
+        entries = entries[:limit]
 
-        entries = query.order_by(HabitEntry.date.desc()).all()
-        return {
-            'count': len(entries),
-            'entries': habit_entries_schema.dump(entries)
-        }, 200
+        # The trailing (date, id) columns are the keyset for the next page
+        last = entries[-1][-2:] if entries else None
+        response['entries'] = habit_entry_serializer.dump_rows(entries, fields)
+        response['next_cursor'] = encode_cursor(*last) if has_more else None
+        return response, 200
 
     def post(self):  # POST /habit-entries
         data = request.get_json()
@@ -55,6 +99,9 @@ class HabitEntryListResource(Resource):
         )
         try:
             db.session.add(new_entry)
+            streaks.entry_saved(new_entry)
+            rollups.entry_saved(new_entry)
+            calendars.entry_saved(new_entry)
             db.session.commit()
             return {
                 'message': 'Habit entry created successfully',
@@ -64,10 +111,125 @@ class HabitEntryListResource(Resource):
             db.session.rollback()
             return {'error': str(e)}, 500
 
+def as_id(value):
+    """Coerce a JSON id (int or digit string) to int; raises TypeError/ValueError otherwise."""
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise TypeError(value)
+    value = int(value)
+    if value < 1:
+        raise ValueError(value)
+    return value
+
+class HabitEntryBulkResource(Resource):
+    def post(self):  # POST /habit-entries/bulk
+        data = request.get_json()
+        items = data.get('entries') if isinstance(data, dict) else data
+        if not isinstance(items, list) or not items:
+            return {'error': 'Expected a non-empty array of entries'}, 400
+        if len(items) > MAX_BULK_ENTRIES:
+            return {'error': f'At most {MAX_BULK_ENTRIES} entries per request'}, 400
+
+        results = [None] * len(items)
+        rows = {}  # (user_id, habit_id, date) -> (index, row); the last entry for a day wins
+        for index, item in enumerate(items):
+            error = None
+            if not isinstance(item, dict) or not all(item.get(f) for f in ('user_id', 'habit_id', 'progress')):
+                error = 'Missing required fields: user_id, habit_id, progress'
+            elif not HabitEntry.validate_progress(item['progress']):
+                error = 'Invalid progress. Must be one of: completed, skipped, partial'
+            else:
+                try:
+                    # JSON may carry "1" or 1; both name the same row
+                    user_id, habit_id = as_id(item['user_id']), as_id(item['habit_id'])
+                except (TypeError, ValueError):
+                    error = 'user_id and habit_id must be integers'
+                else:
+                    try:
+                        entry_date = date.fromisoformat(item['date']) if 'date' in item else date.today()
+                    except (TypeError, ValueError):
+                        error = 'Invalid date format (use YYYY-MM-DD)'
+
+            if error:
+                results[index] = {'index': index, 'status': 'invalid', 'error': error}
+                continue
+
+            key = (user_id, habit_id, entry_date)
+            if key in rows:
+                superseded = rows[key][0]
+                results[superseded] = {'index': superseded, 'status': 'duplicate', 'error': 'Superseded by a later entry for the same day'}
+            rows[key] = (index, {
+                'user_id': user_id,
+                'habit_id': habit_id,
+                'date': entry_date,
+                'progress': item['progress'],
+                'notes': item.get('notes'),
+            })
+
+        if rows:
+            # One lookup for every distinct pair: a habit counts for its owner and for users tracking it
+            habit_ids = {habit_id for _, habit_id, _ in rows}
+            known = db.session.query(Habit.id, Habit.user_id, UserHabit.user_id).outerjoin(
+                UserHabit, UserHabit.habit_id == Habit.id
+            ).filter(Habit.id.in_(habit_ids)).all()
+            found = {habit_id for habit_id, _, _ in known}
+            allowed = {(owner_id, habit_id) for habit_id, owner_id, _ in known}
+            allowed |= {(tracker_id, habit_id) for habit_id, _, tracker_id in known if tracker_id is not None}
+            for key in [key for key in rows if key[:2] not in allowed]:
+                index, _ = rows.pop(key)
+                error = 'Unknown habit_id' if key[1] not in found else 'habit_id does not belong to user_id'
+                results[index] = {'index': index, 'status': 'invalid', 'error': error}
+
+        if rows:
+            # Previous progress of entries about to be overwritten, for the rollup deltas
+            existing = {
+                (user_id, habit_id, day): progress
+                for user_id, habit_id, day, progress in
+                db.session.query(HabitEntry.user_id, HabitEntry.habit_id, HabitEntry.date, HabitEntry.progress)
+                .filter(tuple_(HabitEntry.user_id, HabitEntry.habit_id, HabitEntry.date).in_(list(rows)))
+            }
+
+            table = HabitEntry.__table__
+            stmt = dialect_insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['user_id', 'habit_id', 'date'],
+                set_={
+                    'progress': stmt.excluded.progress,
+                    'notes': func.coalesce(stmt.excluded.notes, table.c.notes),
+                    'version': table.c.version + 1,
+                },
+            )
+            try:
+                db.session.execute(stmt, [row for _, row in rows.values()])
+                for user_id, habit_id in {key[:2] for key in rows}:
+                    streaks.refresh_streak(user_id, habit_id)
+                rollups.record(
+                    added=[(*key, row['progress']) for key, (_, row) in rows.items()],
+                    removed=[(*key, progress) for key, progress in existing.items()],
+                )
+                calendars.record([(*key, row['progress']) for key, (_, row) in rows.items()])
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                return {'error': str(e)}, 500
+
+            for key, (index, row) in rows.items():
+                results[index] = {
+                    'index': index,
+                    'status': 'updated' if key in existing else 'created',
+                    'date': row['date'].isoformat(),
+                }
+
+        summary = {status: sum(1 for r in results if r['status'] == status)
+                   for status in ('created', 'updated', 'duplicate', 'invalid')}
+        status_code = 200 if summary['created'] + summary['updated'] else 400
+        return {'summary': summary, 'results': results}, status_code
+
 class HabitEntryResource(Resource):
+    @conditional(lambda entry_id: row_version(HabitEntry.version, HabitEntry.id, entry_id))
     def get(self, entry_id):  # GET /habit-entries/<id>
-        entry = HabitEntry.query.get_or_404(entry_id)
-        return habit_entry_schema.dump(entry), 200
+        fields = habit_entry_serializer.requested()
+        entry = HabitEntry.query.options(habit_entry_serializer.load_only(fields)).filter_by(id=entry_id).first_or_404()
+        return habit_entry_serializer.dump(entry, fields), 200
 
     def put(self, entry_id):  # PUT /habit-entries/<id>
         entry = HabitEntry.query.get_or_404(entry_id)
@@ -76,6 +238,8 @@ class HabitEntryResource(Resource):
         if 'progress' in data and not HabitEntry.validate_progress(data['progress']):
             return {'error': 'Invalid progress'}, 400
 
+        previous = (entry.date, entry.progress)
+
         if 'date' in data:
             try:
                 entry.date = date.fromisoformat(data['date'])
@@ -84,11 +248,17 @@ class HabitEntryResource(Resource):
 
         entry.progress = data.get('progress', entry.progress)
         entry.notes = data.get('notes', entry.notes)
+        streaks.entry_saved(entry, previous)
+        rollups.entry_saved(entry, previous)
+        calendars.entry_saved(entry, previous)
         db.session.commit()
         return habit_entry_schema.dump(entry), 200
 
     def delete(self, entry_id):  # DELETE /habit-entries/<id>
         entry = HabitEntry.query.get_or_404(entry_id)
         db.session.delete(entry)
+        streaks.entry_deleted(entry)
+        rollups.entry_deleted(entry)
+        calendars.entry_deleted(entry)
         db.session.commit()
         return {'message': 'Habit entry deleted successfully'}, 200
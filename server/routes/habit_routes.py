@@ -2,14 +2,24 @@ from flask_restful import Resource
 from flask import request
 from models import db, Habit
 from schemas import HabitSchema
+from streaming import wants_stream, stream_query
+from serializers import habit_serializer
+from cache import response_cache
+from etags import conditional, row_version, list_version, track_list
 
 habit_schema = HabitSchema()
-habits_schema = HabitSchema(many=True)
+
+track_list("habits", Habit)
 
 class HabitListResource(Resource):
+    @conditional(lambda: list_version("habits"))
+    @response_cache.cached("habits")
     def get(self):  # GET /habits
-        habits = Habit.query.all()
-        return habits_schema.dump(habits), 200
+        fields = habit_serializer.requested()
+        query = habit_serializer.columns(Habit.query.order_by(Habit.id), fields)
+        if wants_stream():
+            return stream_query(query, habit_serializer.row_dumper(fields))
+        return habit_serializer.dump_rows(query.all(), fields), 200
 
     def post(self):  # POST /habits
         data = request.get_json()
@@ -30,13 +40,16 @@ class HabitListResource(Resource):
         )
         db.session.add(new_habit)
         db.session.commit()
+        response_cache.invalidate("habits")
         return habit_schema.dump(new_habit), 201
 
 class HabitResource(Resource):
+    @conditional(lambda habit_id: row_version(Habit.version, Habit.id, habit_id))
     def get(self, habit_id):  # GET /habits/<id>
-        habit = Habit.query.get(habit_id)
+        fields = habit_serializer.requested()
+        habit = Habit.query.options(habit_serializer.load_only(fields)).filter_by(id=habit_id).first()
         if habit:
-            return habit_schema.dump(habit), 200
+            return habit_serializer.dump(habit, fields), 200
         return {"error": "Habit not found"}, 404
 
     def patch(self, habit_id):  # PATCH /habits/<id>
@@ -50,6 +63,7 @@ class HabitResource(Resource):
         habit.description = data.get('description', habit.description)
         habit.frequency = data.get('frequency', habit.frequency)
         db.session.commit()
+        response_cache.invalidate("habits")
         return habit_schema.dump(habit), 200
 
     def delete(self, habit_id):  # DELETE /habits/<id>
@@ -58,4 +72,5 @@ class HabitResource(Resource):
             return {"error": "Habit not found"}, 404
         db.session.delete(habit)
         db.session.commit()
+        response_cache.invalidate("habits")
         return {"message": "Habit deleted"}, 200
@@ -0,0 +1,30 @@
+from flask_restful import Resource
+from datetime import date, timedelta
+from sqlalchemy import case
+from sqlalchemy.orm import joinedload
+from models import User, HabitStreak
+from schemas import HabitStreakSchema
+
+habit_streaks_schema = HabitStreakSchema(many=True)
+
+class UserStreaksResource(Resource):
+    def get(self, user_id):  # GET /users/<id>/streaks
+        if not User.query.get(user_id):
+            return {"error": "User not found"}, 404
+
+        # A run is only current if it was extended today or yesterday
+        yesterday = date.today() - timedelta(days=1)
+        live_streak = case((HabitStreak.last_completed_date >= yesterday, HabitStreak.current_streak), else_=0)
+        streaks = (
+            HabitStreak.query.filter_by(user_id=user_id)
+            .options(joinedload(HabitStreak.habit))
+            .order_by(live_streak.desc(), HabitStreak.habit_id)
+            .all()
+        )
+        results = habit_streaks_schema.dump(streaks)
+
+        for streak, result in zip(streaks, results):
+            if not streak.last_completed_date or streak.last_completed_date < yesterday:
+                result["current_streak"] = 0
+
+        return {"user_id": user_id, "streaks": results}, 200
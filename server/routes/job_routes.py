@@ -0,0 +1,45 @@
+from flask_restful import Resource
+from flask import session, send_from_directory
+from models import db, Job, User
+import os
+import jobs
+
+class JobResource(Resource):
+    def get(self, job_id):  # GET /jobs/<id>
+        user_id = session.get("user_id")
+        if not user_id:
+            return {"error": "Unauthorized"}, 401
+        record = db.session.get(Job, job_id)
+        # Someone else's job looks the same as a missing one
+        if record is None or record.owner_id != user_id:
+            return {"error": "Job not found"}, 404
+        return jobs.describe(record), 200
+
+class UserExportListResource(Resource):
+    def post(self, user_id):  # POST /users/<id>/exports
+        if session.get("user_id") != user_id:
+            return {"error": "Unauthorized"}, 401
+        if not db.session.query(User.id).filter_by(id=user_id).first():
+            return {"error": "User not found"}, 404
+
+        record = jobs.enqueue("export-user", {"user_id": user_id}, owner_id=user_id)
+        db.session.commit()
+        return {
+            "job_id": record.id,
+            "status": record.status,
+            "status_url": f"/jobs/{record.id}",
+            "download_url": f"/users/{user_id}/exports/{record.id}"
+        }, 202, {"Location": f"/jobs/{record.id}"}
+
+class UserExportResource(Resource):
+    def get(self, user_id, job_id):  # GET /users/<id>/exports/<job_id>
+        if session.get("user_id") != user_id:
+            return {"error": "Unauthorized"}, 401
+        record = db.session.get(Job, job_id)
+        if record is None or record.name != "export-user" or record.args.get("user_id") != user_id:
+            return {"error": "Export not found"}, 404
+        if record.status != "succeeded":
+            return {"error": f"Export is {record.status}", "status_url": f"/jobs/{record.id}"}, 409
+        if not os.path.exists(os.path.join(jobs.exports_dir(), record.result["file"])):
+            return {"error": "Export has expired; request a new one"}, 410
+        return send_from_directory(jobs.exports_dir(), record.result["file"], as_attachment=True)
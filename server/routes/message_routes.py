@@ -1,14 +1,39 @@
 from flask_restful import Resource
-from flask import request
-from models import db, Message
+from flask import current_app, request
+from datetime import datetime
+from sqlalchemy.orm import joinedload
+from models import db, Message, User
 from schemas import MessageSchema
+from streaming import wants_stream, stream_query
+from pagination import parse_limit, encode_cursor, decode_cursor, InvalidCursor
+import threads
+import conversations
+from etags import conditional, list_version, track_list
+from pubsub import broker
+from routes.stream_routes import message_topic
 
 message_schema = MessageSchema()
 messages_schema = MessageSchema(many=True)
 
+# Rows embed the sender's username and avatar, so user edits count too
+track_list("messages", Message, lambda message: message.reply_to_id is None)
+track_list("messages", User)
+
+def message_list_version():
+    return list_version("messages")
+
 class MessageListResource(Resource):
+    @conditional(message_list_version)
     def get(self):  # GET /messages
-        messages = Message.query.filter_by(reply_to_id=None).order_by(Message.timestamp.desc()).all()
+        query = (
+            Message.query.filter_by(reply_to_id=None)
+            # The schema embeds each sender's username and avatar
+            .options(joinedload(Message.sender))
+            .order_by(Message.timestamp.desc())
+        )
+        if wants_stream():
+            return stream_query(query, message_schema.dump)
+        messages = query.all()
         return messages_schema.dump(messages), 200
 
     def post(self):  # POST /messages
@@ -28,5 +53,45 @@ class MessageListResource(Resource):
             reply_to_id=reply_to_id
         )
         db.session.add(message)
+        db.session.flush()
+        conversations.record_message(message)
         db.session.commit()
-        return message_schema.dump(message), 201
\ No newline at end of file
+        payload = message_schema.dump(message)
+        # Live updates are best effort: the message is already saved, so never fail (or retry) the request over them
+        try:
+            listening = broker.subscriber_counts()
+            for user_id in {message.sender_id, message.receiver_id}:
+                if listening.get(message_topic(user_id)):
+                    broker.publish(message_topic(user_id), "message", payload)
+        except Exception:
+            current_app.logger.warning("Could not publish message %s", message.id, exc_info=True)
+        return payload, 201
+
+class MessageThreadListResource(Resource):
+    def get(self):  # GET /messages/threads
+        limit = parse_limit(request.args.get('limit'), default=20, maximum=100)
+
+        cursor = None
+        if token := request.args.get('cursor'):
+            try:
+                timestamp, message_id = decode_cursor(token, 2)
+                cursor = (datetime.fromisoformat(timestamp), int(message_id))
+            except (InvalidCursor, TypeError, ValueError):
+                return {'error': 'Invalid cursor'}, 400
+
+        page, has_more = threads.list_threads(limit, cursor)
+        last = page[-1] if page else None
+        return {
+            'threads': page,
+            'next_cursor': encode_cursor(last['timestamp'], last['id']) if has_more else None
+        }, 200
+
+class MessageThreadResource(Resource):
+    def get(self, root_id):  # GET /messages/threads/<root_id>
+        max_depth = parse_limit(request.args.get('max_depth'), default=threads.DEFAULT_MAX_DEPTH, maximum=50)
+        max_replies = parse_limit(request.args.get('max_replies'), default=threads.DEFAULT_MAX_REPLIES, maximum=1000)
+
+        root, truncated = threads.load_thread(root_id, max_depth, max_replies)
+        if root is None:
+            return {'error': 'Message not found'}, 404
+        return {'thread': root, 'truncated': truncated}, 200
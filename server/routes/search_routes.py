@@ -0,0 +1,42 @@
+from flask_restful import Resource
+from flask import request, session
+from pagination import parse_limit, encode_cursor, decode_cursor, InvalidCursor
+import search
+
+MAX_SEARCH_OFFSET = 1000
+
+class SearchResource(Resource):
+    def get(self):  # GET /search?q=
+        query = request.args.get("q", "").strip()
+        if not query:
+            return {"error": "q is required"}, 400
+        if not search.available():
+            return {"error": "Search requires the SQLite FTS5 index"}, 501
+
+        kinds = None
+        if types := request.args.get("types"):
+            kinds = [t.strip() for t in types.split(",")]
+            unknown = [t for t in kinds if t not in search.KINDS]
+            if unknown:
+                return {"error": f"Unknown types: {', '.join(unknown)}"}, 400
+
+        limit = parse_limit(request.args.get("limit"), default=20, maximum=50)
+        offset = 0
+        if cursor := request.args.get("cursor"):
+            try:
+                offset, = decode_cursor(cursor, 1)
+                offset = int(offset)
+            except (InvalidCursor, TypeError, ValueError):
+                return {"error": "Invalid cursor"}, 400
+        if not 0 <= offset <= MAX_SEARCH_OFFSET:
+            return {"error": "Invalid cursor"}, 400
+
+        # Messages are only searchable by the people in them
+        hits, has_more, truncated = search.search(query, kinds, session.get("user_id"), limit, offset)
+        return {
+            "query": query,
+            "results": hits,
+            # Only the newest search.MAX_RANKED_CANDIDATES matches were ranked
+            "truncated": truncated,
+            "next_cursor": encode_cursor(offset + limit) if has_more and offset + limit <= MAX_SEARCH_OFFSET else None
+        }, 200
@@ -0,0 +1,63 @@
+from flask_restful import Resource
+from flask import Response, request, session
+from models import db, Challenge
+from pubsub import broker
+
+MAX_STREAM_TOPICS = 10
+HEARTBEAT_INTERVAL = 15  # seconds; also how soon a vanished client is noticed
+RETRY_MS = 3000
+
+def message_topic(user_id):
+    return f"user:{user_id}"
+
+def challenge_topic(challenge_id):
+    return f"challenge:{challenge_id}"
+
+class StreamResource(Resource):
+    def get(self):  # GET /stream?topics=messages,challenge:<id>
+        names = [t.strip() for t in request.args.get("topics", "").split(",") if t.strip()]
+        if not names:
+            return {"error": "topics is required (messages, challenge:<id>)"}, 400
+        if len(names) > MAX_STREAM_TOPICS:
+            return {"error": f"At most {MAX_STREAM_TOPICS} topics per stream"}, 400
+
+        topics, challenge_ids = set(), set()
+        for name in names:
+            if name == "messages":
+                # Only your own inbox
+                user_id = session.get("user_id")
+                if not user_id:
+                    return {"error": "Unauthorized"}, 401
+                topics.add(message_topic(user_id))
+            elif name.startswith("challenge:") and name[len("challenge:"):].isdigit():
+                challenge_ids.add(int(name[len("challenge:"):]))
+                topics.add(name)
+            else:
+                return {"error": f"Unknown topic: {name}"}, 400
+
+        if challenge_ids:
+            found = {id for (id,) in db.session.query(Challenge.id).filter(Challenge.id.in_(challenge_ids))}
+            if missing := challenge_ids - found:
+                return {"error": f"Challenge not found: {min(missing)}"}, 404
+
+        subscription = broker.subscribe(topics)
+        if subscription is None:
+            return {"error": "Too many open streams, retry later"}, 503, {"Retry-After": str(RETRY_MS // 1000)}
+
+        def events():
+            try:
+                yield f"retry: {RETRY_MS}\n\n"
+                while True:
+                    frame = subscription.next(HEARTBEAT_INTERVAL)
+                    if subscription.overflowed:
+                        # Fell too far behind: the client should refetch, then reconnect
+                        yield "event: overflow\ndata: {}\n\n"
+                        return
+                    yield frame if frame is not None else ": keepalive\n\n"
+            finally:
+                broker.unsubscribe(subscription)
+
+        return Response(events(), mimetype="text/event-stream", headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        })
@@ -1,18 +1,15 @@
 from flask_restful import Resource
 from flask import request
 from models import db, User, Habit
-from schemas import HabitSchema
-
-habit_schema = HabitSchema()
-habits_schema = HabitSchema(many=True)
+from serializers import habit_serializer
 
 class UserHabitsResource(Resource):
     def get(self, user_id):  # GET /user-habits/<user_id>
-        user = User.query.get(user_id)
-        if not user:
+        if not db.session.query(User.id).filter_by(id=user_id).first():
             return {"error": "User not found"}, 404
-        habits = user.habits
-        return {"user_id": user_id, "habits": habits_schema.dump(habits)}, 200
+        fields = habit_serializer.requested()
+        habits = habit_serializer.columns(Habit.query.filter_by(user_id=user_id), fields).all()
+        return {"user_id": user_id, "habits": habit_serializer.dump_rows(habits, fields)}, 200
 
 class AssignHabitResource(Resource):
     def post(self):  # POST /user-habits/assign
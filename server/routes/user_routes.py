@@ -3,14 +3,25 @@ from flask import request
 from werkzeug.security import generate_password_hash
 from models import User, db
 from schemas import UserSchema
+from streaming import wants_stream, stream_query
+from serializers import user_serializer
+from cache import response_cache
+from etags import conditional, row_version, list_version, track_list
+import participations
+import challenge_counts
 
 user_schema = UserSchema()
-users_schema = UserSchema(many=True)
+
+track_list("users", User)
 
 class UserListResource(Resource):
+    @conditional(lambda: list_version("users"))
     def get(self):
-        users = User.query.all()
-        return users_schema.dump(users), 200
+        fields = user_serializer.requested()
+        query = user_serializer.columns(User.query.order_by(User.id), fields)
+        if wants_stream():
+            return stream_query(query, user_serializer.row_dumper(fields))
+        return user_serializer.dump_rows(query.all(), fields), 200
 
     def post(self):
         data = request.get_json()
@@ -39,11 +50,14 @@ class UserListResource(Resource):
             return {"error": f"Failed to register user: {e}"}, 500
 
 class UserResource(Resource):
+    @conditional(lambda user_id: row_version(User.version, User.id, user_id))
+    @response_cache.cached("user:{user_id}")
     def get(self, user_id):
-        user = User.query.get(user_id)
+        fields = user_serializer.requested()
+        user = User.query.options(user_serializer.load_only(fields)).filter_by(id=user_id).first()
         if not user:
             return {"error": "User not found"}, 404
-        return user_schema.dump(user), 200
+        return user_serializer.dump(user, fields), 200
 
     def put(self, user_id):
         user = User.query.get(user_id)
@@ -73,6 +87,7 @@ class UserResource(Resource):
 
         try:
             db.session.commit()
+            response_cache.invalidate(f"user:{user_id}")
             return user_schema.dump(user), 200
         except Exception as e:
             db.session.rollback()
@@ -84,8 +99,14 @@ class UserResource(Resource):
             return {"error": "User not found"}, 404
 
         try:
+            # The cascade deletes the user's challenges too, so free their other participants' slots first
+            for challenge in user.challenges_created:
+                participations.challenge_deleted(challenge.id)
+            challenge_counts.user_deleted(user_id)
             db.session.delete(user)
             db.session.commit()
+            # Deleting a user cascades to the habits and challenges they created
+            response_cache.invalidate(f"user:{user_id}", "habits", "challenges")
             return {"message": "User deleted successfully"}, 200
         except Exception as e:
             db.session.rollback()
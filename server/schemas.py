@@ -1,5 +1,5 @@
 from flask_marshmallow import Marshmallow
-from models import User, Habit, HabitEntry, Challenge, ChallengeEntry, ChallengeParticipant, Message
+from models import User, Habit, HabitEntry, HabitStreak, Challenge, ChallengeEntry, ChallengeParticipant, Message
 
 ma = Marshmallow()
 
@@ -8,6 +8,8 @@ class UserSchema(ma.SQLAlchemyAutoSchema):
         model = User
         load_instance = True
         include_fk = True
+        # Credentials and bookkeeping columns; the same fields user_serializer leaves out
+        exclude = ("password_hash", "active_challenge_count", "version")
 
     # Explicitly declare avatar_url so it shows up in output if needed
     avatar_url = ma.String()
@@ -22,10 +24,25 @@ class HabitEntrySchema(ma.SQLAlchemyAutoSchema):
         model = HabitEntry
         load_instance = True
 
+class HabitStreakSchema(ma.SQLAlchemyAutoSchema):
+    habit_name = ma.Function(lambda obj: obj.habit.name if obj.habit else None)
+
+    class Meta:
+        model = HabitStreak
+        load_instance = True
+        include_fk = True
+
 class ChallengeSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
         model = Challenge
         load_instance = True
+        # Internal rank sequence; challenge_serializer never returns it either
+        exclude = ("join_seq",)
+
+    # Counters maintained by the join, leave and entry paths; never accepted as input
+    participant_count = ma.Integer(dump_only=True)
+    entry_count = ma.Integer(dump_only=True)
+    status = ma.String(dump_only=True)
 
 class ChallengeEntrySchema(ma.SQLAlchemyAutoSchema):
     class Meta:
@@ -38,8 +55,8 @@ class ChallengeParticipantSchema(ma.SQLAlchemyAutoSchema):
         load_instance = True
 
 class MessageSchema(ma.SQLAlchemyAutoSchema):
-    username = ma.Function(lambda obj: obj.user.username if obj.user else None)
-    avatar_url = ma.Function(lambda obj: obj.user.avatar_url if obj.user else None)
+    username = ma.Function(lambda obj: obj.sender.username if obj.sender else None)
+    avatar_url = ma.Function(lambda obj: obj.sender.avatar_url if obj.sender else None)
     
     class Meta:
         model = Message
@@ -0,0 +1,165 @@
+import re
+
+from sqlalchemy import DDL, event, text
+
+from config import db
+
+# Each document's rowid is ref_id * KIND_STRIDE + its kind code, so triggers
+# update and delete by rowid instead of scanning the unindexed columns
+KIND_STRIDE = 4
+KINDS = {"habit": 1, "challenge": 2, "message": 3}
+TITLE_WEIGHT = 10.0
+BODY_WEIGHT = 1.0
+# bm25 has to score every match before ORDER BY rank can return, so a very common
+# term would cost time proportional to the corpus; rank only the newest matches
+# and report the search as truncated when there were more
+MAX_RANKED_CANDIDATES = 5000
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        kind UNINDEXED, ref_id UNINDEXED, sender_id UNINDEXED, receiver_id UNINDEXED,
+        title, body, tokenize = 'porter unicode61'
+    )
+    """,
+    # ORDER BY rank then uses these weights and lets FTS5 sort inside the index
+    f"INSERT INTO search_index(search_index, rank) VALUES ('rank', 'bm25(0, 0, 0, 0, {TITLE_WEIGHT}, {BODY_WEIGHT})')",
+]
+
+_SOURCES = [
+    # table, kind, sender, receiver, title, body, indexed columns
+    ("habits", "habit", "NULL", "NULL", "{row}.name", "coalesce({row}.description, '')", "name, description"),
+    ("challenges", "challenge", "NULL", "NULL", "{row}.name", "{row}.description", "name, description"),
+    ("messages", "message", "{row}.sender_id", "{row}.receiver_id", "''", "{row}.content", "content"),
+]
+
+for table, kind, sender, receiver, title, body, columns in _SOURCES:
+    rowid = f"{{row}}.id * {KIND_STRIDE} + {KINDS[kind]}"
+    values = ", ".join([rowid, f"'{kind}'", "{row}.id", sender, receiver, title, body]).format(row="new")
+    SCHEMA += [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO search_index(rowid, kind, ref_id, sender_id, receiver_id, title, body) VALUES ({values});
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE OF {columns} ON {table} BEGIN
+            UPDATE search_index SET title = {title.format(row="new")}, body = {body.format(row="new")}
+            WHERE rowid = {rowid.format(row="new")};
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN
+            DELETE FROM search_index WHERE rowid = {rowid.format(row="old")};
+        END
+        """,
+    ]
+
+# Keep db.create_all() databases (dev, tests, benchmarks) searchable too
+for statement in SCHEMA:
+    event.listen(db.metadata, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+
+def available():
+    return db.session.get_bind().dialect.name == "sqlite"
+
+
+def to_match(query):
+    """Turn free text into a safe FTS5 query: every word must match, the last as a prefix.
+
+    Quoting each token keeps FTS5 operators and punctuation in user input from
+    being parsed as query syntax.
+    """
+    tokens = _TOKEN.findall(query)
+    if not tokens:
+        return None
+    quoted = [f'"{token}"' for token in tokens]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def search(query, kinds=None, user_id=None, limit=20, offset=0, session=None):
+    """BM25-ranked hits with highlighted titles and body snippets.
+
+    Ranking covers only the newest MAX_RANKED_CANDIDATES matches the caller
+    could see (requested kinds, their own messages); FTS5 walks
+    its doclists in rowid order, so finding that floor costs far less than
+    scoring. `truncated` is set when older matches were left unranked, so the
+    hits are the best of the newest matches rather than of all of them.
+    Messages are only searched for `user_id`, and only those they sent or received.
+    Returns (hits, has_more, truncated).
+    """
+    match = to_match(query)
+    if match is None:
+        return [], False, False
+
+    kinds = [k for k in (kinds or KINDS) if k in KINDS]
+    if user_id is None and "message" in kinds:
+        kinds.remove("message")
+    if not kinds:
+        return [], False, False
+
+    session = session or db.session
+    kind_params = {f"kind_{i}": KINDS[kind] for i, kind in enumerate(kinds)}
+    # Only what this caller may see competes for the candidate budget. The kind
+    # is the rowid's remainder, and the sender and receiver are read only for messages.
+    visible = f"""
+        search_index MATCH :match
+        AND rowid % {KIND_STRIDE} IN ({", ".join(":" + name for name in kind_params)})
+        AND (rowid % {KIND_STRIDE} != {KINDS["message"]} OR sender_id = :user_id OR receiver_id = :user_id)
+    """
+    params = {"match": match, "user_id": user_id, **kind_params}
+
+    # The oldest candidate's rowid, plus whether anything older exists
+    floor = session.execute(text(f"""
+        SELECT rowid FROM search_index WHERE {visible}
+        ORDER BY rowid DESC LIMIT 2 OFFSET :floor_offset
+    """), {**params, "floor_offset": MAX_RANKED_CANDIDATES - 1}).scalars().all()
+    truncated = len(floor) > 1
+
+    params.update({"limit": limit + 1, "offset": offset, "floor": floor[0] if floor else 0})
+    rows = session.execute(text(f"""
+        SELECT kind, ref_id, rank,
+               highlight(search_index, 4, '<mark>', '</mark>') AS title,
+               snippet(search_index, 5, '<mark>', '</mark>', '…', 16) AS snippet
+        FROM search_index
+        WHERE {visible} AND rowid >= :floor
+        ORDER BY rank
+        LIMIT :limit OFFSET :offset
+    """), params).all()
+
+    hits = [
+        {
+            "type": row.kind,
+            "id": row.ref_id,
+            "title": row.title or None,
+            "snippet": row.snippet,
+            # bm25() is lower-is-better; flip it so clients can sort descending
+            "score": round(-row.rank, 6),
+        }
+        for row in rows[:limit]
+    ]
+    return hits, len(rows) > limit, truncated
+
+
+def rebuild_all():
+    """Recreate any missing index objects and repopulate it (SQLite only).
+
+    SQLite batch migrations rebuild a table by copying it, which drops its
+    triggers; run this after any batch migration on habits, challenges or messages.
+    """
+    for statement in SCHEMA:
+        db.session.execute(text(statement))
+    db.session.execute(text("DELETE FROM search_index"))
+    for table, kind, sender, receiver, title, body, _ in _SOURCES:
+        columns = ", ".join(c.format(row=table) for c in (sender, receiver, title, body))
+        db.session.execute(text(f"""
+            INSERT INTO search_index(rowid, kind, ref_id, sender_id, receiver_id, title, body)
+            SELECT id * {KIND_STRIDE} + {KINDS[kind]}, '{kind}', id, {columns}
+            FROM {table}
+        """))
+    db.session.execute(text("INSERT INTO search_index(search_index) VALUES ('optimize')"))
+    db.session.commit()
+    return db.session.execute(text("SELECT count(*) FROM search_index")).scalar()
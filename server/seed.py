@@ -2,6 +2,7 @@ from app import app
 from models import db, User, Habit, UserHabit, HabitEntry, Challenge, ChallengeParticipant, ChallengeEntry, Message
 from datetime import date, timedelta, datetime
 from faker import Faker
+import participations
 import random
 
 fake = Faker()
@@ -105,13 +106,8 @@ with app.app_context():
     for challenge in challenges:
         participants = random.sample(users, k=random.randint(5, 15))
         for user in participants:
-            cp = ChallengeParticipant(
-                challenge_id=challenge.id,
-                user_id=user.id,
-                reason=fake.sentence()
-            )
-            db.session.add(cp)
-    db.session.commit()
+            # Goes through join so slots, ranks and counts match; seeded challenges have already started
+            participations.join(user.id, challenge.id, fake.sentence(), enforce_rules=False)
     print("✅ Seeded challenge participants.")
 
     print("📆 Seeding challenge entries...")
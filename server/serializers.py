@@ -0,0 +1,101 @@
+from datetime import date, datetime
+
+from flask import request
+from sqlalchemy import Date, DateTime, inspect
+from sqlalchemy.orm import load_only
+
+from models import User, Habit, HabitEntry, Challenge
+
+
+class ModelSerializer:
+    """Flat serializer over an explicit column set; never follows relationships.
+
+    `fields` is everything a client may ask for with ?fields=a,b,c and
+    `default` is what is returned when it doesn't ask.
+    """
+
+    def __init__(self, model, fields, default=None):
+        self.model = model
+        self.fields = tuple(fields)
+        self.default = tuple(default or fields)
+        self._row_dumpers = {}
+
+    def requested(self):
+        """Fields selected by ?fields=, in declaration order; unknown names are ignored."""
+        raw = request.args.get("fields")
+        if not raw:
+            return self.default
+        wanted = {name.strip() for name in raw.split(",")}
+        return tuple(f for f in self.fields if f in wanted) or self.default
+
+    def load_only(self, fields):
+        """Loader option so the SELECT fetches only the columns being returned."""
+        return load_only(*(getattr(self.model, f) for f in fields))
+
+    def dump(self, obj, fields=None):
+        return {f: _plain(getattr(obj, f)) for f in fields or self.default}
+
+    def dump_many(self, objs, fields=None):
+        fields = fields or self.default
+        return [self.dump(obj, fields) for obj in objs]
+
+    def columns(self, query, fields, extra=()):
+        """Narrow a query to plain column tuples, skipping ORM instances and the identity map.
+
+        `extra` columns (e.g. a pagination key) are fetched after `fields` and
+        ignored by the row dumper.
+        """
+        return query.with_entities(*(getattr(self.model, f) for f in fields + tuple(extra)))
+
+    def row_dumper(self, fields):
+        """Row -> dict function for `fields`, compiled once per field set."""
+        dumper = self._row_dumpers.get(fields)
+        if dumper is None:
+            columns = inspect(self.model).columns
+            dumper = self._row_dumpers[fields] = _compile_row_dumper(fields, [columns[f].type for f in fields])
+        return dumper
+
+    def dump_rows(self, rows, fields=None):
+        dumper = self.row_dumper(fields or self.default)
+        return [dumper(row) for row in rows]
+
+
+def _plain(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _compile_row_dumper(fields, types):
+    # Column types are known up front, so only date/datetime positions need work per row
+    temporal = [i for i, column_type in enumerate(types) if isinstance(column_type, (Date, DateTime))]
+    if not temporal:
+        return lambda row: dict(zip(fields, row))
+
+    def dump(row):
+        values = list(row)
+        for i in temporal:
+            if values[i] is not None:
+                values[i] = values[i].isoformat()
+        return dict(zip(fields, values))
+    return dump
+
+
+user_serializer = ModelSerializer(User, ("id", "username", "email", "avatar_url"))
+habit_serializer = ModelSerializer(
+    Habit,
+    ("id", "name", "description", "frequency", "user_id"),
+    default=("id", "name", "description", "frequency"),
+)
+habit_entry_serializer = ModelSerializer(
+    HabitEntry,
+    ("id", "user_id", "habit_id", "progress", "notes", "date"),
+    default=("id", "progress", "notes", "date"),
+)
+challenge_serializer = ModelSerializer(
+    Challenge,
+    ("id", "name", "description", "created_by", "start_date", "end_date", "participant_count", "entry_count",
+     "created_at", "updated_at"),
+    default=("id", "name", "description", "start_date", "end_date", "participant_count", "entry_count",
+             "created_at", "updated_at"),
+)
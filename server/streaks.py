@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+
+from config import db
+from models import HabitEntry, HabitStreak
+
+COMPLETED = "completed"
+
+
+def compute_streak(dates):
+    """Return (current, longest, last) for an ascending list of completed dates.
+
+    `current` is the run ending on the most recent completed date; callers decide
+    whether that run is still alive relative to today.
+    """
+    current = longest = 0
+    last = None
+    for day in dates:
+        if last is not None and day == last + timedelta(days=1):
+            current += 1
+        elif day != last:
+            current = 1
+        longest = max(longest, current)
+        last = day
+    return current, longest, last
+
+
+def _get_or_create(user_id, habit_id):
+    streak = HabitStreak.query.filter_by(user_id=user_id, habit_id=habit_id).first()
+    if streak is None:
+        streak = HabitStreak(user_id=user_id, habit_id=habit_id, current_streak=0, longest_streak=0)
+        db.session.add(streak)
+    return streak
+
+
+def refresh_streak(user_id, habit_id):
+    """Recompute one user+habit streak from its completed entry dates."""
+    dates = [
+        d for (d,) in db.session.query(HabitEntry.date)
+        .filter_by(user_id=user_id, habit_id=habit_id, progress=COMPLETED)
+        .order_by(HabitEntry.date)
+    ]
+    current, longest, last = compute_streak(dates)
+    streak = _get_or_create(user_id, habit_id)
+    streak.current_streak = current
+    streak.longest_streak = longest
+    streak.last_completed_date = last
+    return streak
+
+
+def _extend_streak(user_id, habit_id, day):
+    """Fast path for a completion logged after the latest one: O(1), no entry scan.
+
+    Returns False when the day falls on or before the last completed date, in
+    which case the run structure may change and a refresh is needed.
+    """
+    streak = _get_or_create(user_id, habit_id)
+    last = streak.last_completed_date
+    if last is not None and day <= last:
+        return False
+    if last is not None and day == last + timedelta(days=1):
+        streak.current_streak += 1
+    else:
+        streak.current_streak = 1
+    streak.longest_streak = max(streak.longest_streak or 0, streak.current_streak)
+    streak.last_completed_date = day
+    return True
+
+
+def entry_saved(entry, previous=None):
+    """Update streaks after a create (previous=None) or update of `entry`.
+
+    `previous` is the (date, progress) pair the entry had before an update.
+    Must be called before the session is committed so both land together.
+    """
+    now_completed = entry.progress == COMPLETED
+    if previous is None:
+        if now_completed and not _extend_streak(entry.user_id, entry.habit_id, entry.date):
+            refresh_streak(entry.user_id, entry.habit_id)
+        return
+
+    was_completed = previous[1] == COMPLETED
+    if previous == (entry.date, entry.progress) or not (was_completed or now_completed):
+        return
+    if now_completed and not was_completed and _extend_streak(entry.user_id, entry.habit_id, entry.date):
+        return
+    refresh_streak(entry.user_id, entry.habit_id)
+
+
+def entry_deleted(entry):
+    """Update streaks after `entry` has been deleted from the session."""
+    if entry.progress == COMPLETED:
+        refresh_streak(entry.user_id, entry.habit_id)
+
+
+def rebuild_all(batch_size=1000):
+    """Drop and recompute every streak from habit_entries in a single ordered pass."""
+    HabitStreak.query.delete()
+
+    rows = (
+        db.session.query(HabitEntry.user_id, HabitEntry.habit_id, HabitEntry.date)
+        .filter(HabitEntry.progress == COMPLETED)
+        .order_by(HabitEntry.user_id, HabitEntry.habit_id, HabitEntry.date)
+        .yield_per(batch_size)
+    )
+
+    pending = []
+    key, dates = None, []
+    for user_id, habit_id, day in rows:
+        if (user_id, habit_id) != key:
+            if key is not None:
+                pending.append(_streak_row(key, dates))
+            key, dates = (user_id, habit_id), []
+        dates.append(day)
+    if key is not None:
+        pending.append(_streak_row(key, dates))
+
+    if pending:
+        db.session.execute(HabitStreak.__table__.insert(), pending)
+    db.session.commit()
+    return len(pending)
+
+
+def _streak_row(key, dates):
+    current, longest, last = compute_streak(dates)
+    return {
+        "user_id": key[0],
+        "habit_id": key[1],
+        "current_streak": current,
+        "longest_streak": longest,
+        "last_completed_date": last,
+        "updated_at": datetime.utcnow(),
+    }
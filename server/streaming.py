@@ -0,0 +1,55 @@
+from flask import Response, current_app, request, stream_with_context
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+YIELD_PER = 500
+
+
+def wants_stream():
+    """A list resource streams when asked with ?stream=1 or an NDJSON Accept header."""
+    if request.args.get("stream", "").lower() in ("1", "true", "yes"):
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def _rows(query, dump_row, yield_per):
+    for row in query.yield_per(yield_per):
+        yield current_app.json.dumps(dump_row(row))
+
+
+def _json_array(rows, yield_per):
+    yield "["
+    buffer = []
+    first = True
+    for encoded in rows:
+        buffer.append(encoded if first else "," + encoded)
+        first = False
+        if len(buffer) >= yield_per:
+            yield "".join(buffer)
+            buffer = []
+    buffer.append("]")
+    yield "".join(buffer)
+
+
+def _ndjson(rows, yield_per):
+    buffer = []
+    for encoded in rows:
+        buffer.append(encoded + "\n")
+        if len(buffer) >= yield_per:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def stream_query(query, dump_row, yield_per=YIELD_PER):
+    """Stream a query as a chunked JSON array, or NDJSON if the client accepts it.
+
+    Rows are pulled from the database `yield_per` at a time and written out as
+    they are serialized, so memory stays flat regardless of table size.
+    """
+    rows = _rows(query, dump_row, yield_per)
+    if request.accept_mimetypes.best == NDJSON_MIMETYPE:
+        body, mimetype = _ndjson(rows, yield_per), NDJSON_MIMETYPE
+    else:
+        body, mimetype = _json_array(rows, yield_per), "application/json"
+    return Response(stream_with_context(body), mimetype=mimetype)
@@ -0,0 +1,61 @@
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event, text
+
+# Point the app at a throwaway database before app.py reads its config
+_fd, DB_PATH = tempfile.mkstemp(suffix=".db")
+os.close(_fd)
+os.environ["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{DB_PATH}"
+os.environ["RESPONSE_CACHE_BACKEND"] = "none"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app as flask_app  # noqa: E402
+from config import db  # noqa: E402
+
+
+@pytest.fixture
+def app():
+    flask_app.config.update(TESTING=True, SECRET_KEY="test")
+    with flask_app.app_context():
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+        # The FTS5 index is created outside the models, so drop_all leaves it behind
+        with db.engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS search_index"))
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def login(client):
+    def login(user_id):
+        with client.session_transaction() as session:
+            session["user_id"] = user_id
+    return login
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager yielding a list that collects every statement run inside it."""
+    @contextmanager
+    def counter():
+        statements = []
+
+        def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, "after_cursor_execute", after_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, "after_cursor_execute", after_cursor_execute)
+    return counter
@@ -0,0 +1,25 @@
+from datetime import date, timedelta
+
+from config import db
+from models import Challenge, User
+
+
+def make_users(count, prefix="user"):
+    users = [User(username=f"{prefix}{i}", email=f"{prefix}{i}@example.com", password_hash="x") for i in range(count)]
+    db.session.add_all(users)
+    db.session.commit()
+    return users
+
+
+def make_challenge(creator, name="Challenge", start=None, end=None):
+    today = date.today()
+    challenge = Challenge(
+        name=name,
+        description="Test challenge",
+        created_by=creator.id,
+        start_date=start or today - timedelta(days=5),
+        end_date=end or today + timedelta(days=5),
+    )
+    db.session.add(challenge)
+    db.session.commit()
+    return challenge
@@ -0,0 +1,19 @@
+import jobs
+from tests.factories import make_users
+
+
+def test_batched_export_download_does_not_fail_the_batch(app, client, login, tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "exports_dir", lambda: str(tmp_path))
+    user_id = make_users(1)[0].id
+    login(user_id)
+    queued = client.post(f"/users/{user_id}/exports").get_json()
+    jobs.run_one("test-worker")
+
+    response = client.post("/batch", json={"requests": [
+        {"id": "file", "path": queued["download_url"]},
+        {"id": "job", "path": queued["status_url"]},
+    ]})
+    assert response.status_code == 200
+    file, job = response.get_json()["responses"]
+    assert file["status"] == 200 and file["body"]["user"]["id"] == user_id
+    assert job["status"] == 200 and job["body"]["status"] == "succeeded"
@@ -0,0 +1,27 @@
+import pytest
+
+from pagination import encode_cursor
+from tests.factories import make_challenge, make_users
+
+
+@pytest.mark.parametrize("sort, values", [
+    ("newest", ([1],)),
+    ("popular", ({"a": 1}, 2)),
+    ("start_date", ("2024-01-01", [3])),
+    ("popular", (None, 2)),
+])
+def test_malformed_cursor_is_rejected(client, sort, values):
+    response = client.get("/challenges/discover", query_string={"sort": sort, "cursor": encode_cursor(*values)})
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "Invalid cursor"}
+
+
+def test_popular_pages_follow_the_cursor(client):
+    user, = make_users(1)
+    for i in range(3):
+        make_challenge(user, f"challenge {i}")
+    first = client.get("/challenges/discover", query_string={"sort": "popular", "limit": 2}).get_json()
+    rest = client.get("/challenges/discover",
+                      query_string={"sort": "popular", "limit": 2, "cursor": first["next_cursor"]}).get_json()
+    ids = [c["id"] for c in first["challenges"] + rest["challenges"]]
+    assert sorted(ids) == [1, 2, 3] and rest["next_cursor"] is None
@@ -0,0 +1,23 @@
+from pagination import encode_cursor
+from tests.factories import make_users
+
+
+def test_inbox_is_private_and_rejects_tampered_cursors(client, login):
+    owner, peer = make_users(2)
+    client.post("/messages", json={"sender_id": peer.id, "receiver_id": owner.id, "content": "hi"})
+    inbox = f"/users/{owner.id}/conversations"
+    mark_read = f"{inbox}/{peer.id}/read"
+
+    assert client.get(inbox).status_code == 401
+    login(peer.id)
+    assert client.get(inbox).status_code == 401
+    assert client.post(mark_read).status_code == 401
+
+    login(owner.id)
+    page = client.get(inbox).get_json()
+    assert [c["peer_id"] for c in page["conversations"]] == [peer.id]
+    assert client.post(mark_read).status_code == 200
+    for cursor in (encode_cursor("2026-01-01T00:00:00", [1]), encode_cursor("2026-01-01T00:00:00", {"a": 1}), "not base64!"):
+        response = client.get(inbox, query_string={"cursor": cursor})
+        assert response.status_code == 400
+        assert response.get_json() == {"error": "Invalid cursor"}
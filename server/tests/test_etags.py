@@ -0,0 +1,80 @@
+from datetime import date, timedelta
+
+import participations
+from cache import MemoryBackend, response_cache
+from config import db
+from models import Habit, Message
+from tests.factories import make_challenge, make_users
+
+
+def etag(client, path):
+    response = client.get(path)
+    assert response.status_code == 200
+    return response.headers["ETag"]
+
+
+def test_replacing_the_newest_row_changes_the_etag(client):
+    user, = make_users(1)
+    habits = [Habit(name=f"habit {i}", user_id=user.id) for i in range(3)]
+    db.session.add_all(habits)
+    db.session.commit()
+    newest_id = habits[-1].id
+    list_etag, row_etag = etag(client, "/habits"), etag(client, f"/habits/{newest_id}")
+
+    db.session.delete(habits[-1])
+    db.session.commit()
+    replacement = Habit(name="replacement", user_id=user.id)
+    db.session.add(replacement)
+    db.session.commit()
+
+    assert replacement.id != newest_id
+    assert client.get(f"/habits/{newest_id}").status_code == 404
+    assert etag(client, "/habits") != list_etag
+    assert etag(client, f"/habits/{replacement.id}") != row_etag
+
+
+def test_message_list_etag_follows_top_level_messages_and_senders(client):
+    sender, receiver = make_users(2)
+    message = Message(sender_id=sender.id, receiver_id=receiver.id, content="hello")
+    db.session.add(message)
+    db.session.commit()
+    first = etag(client, "/messages")
+
+    db.session.add(Message(sender_id=receiver.id, receiver_id=sender.id, content="reply", reply_to_id=message.id))
+    db.session.commit()
+    assert etag(client, "/messages") == first
+
+    sender.avatar_url = "https://example.com/new.png"
+    db.session.commit()
+    second = etag(client, "/messages")
+    assert second != first
+
+    db.session.add(Message(sender_id=receiver.id, receiver_id=sender.id, content="new thread"))
+    db.session.commit()
+    assert etag(client, "/messages") != second
+
+
+def test_cached_body_never_outlives_its_etag(client, monkeypatch):
+    # A write on another worker updates the database but not this worker's memory cache
+    monkeypatch.setattr(response_cache, "backend", MemoryBackend())
+    user, = make_users(1)
+    challenge = make_challenge(user, "Before")
+    first = client.get("/challenges")
+
+    challenge.name = "After"
+    db.session.commit()
+    second = client.get("/challenges")
+
+    assert second.headers["ETag"] != first.headers["ETag"]
+    assert [c["name"] for c in second.get_json()] == ["After"]
+    assert client.get("/challenges", headers={"If-None-Match": second.headers["ETag"]}).status_code == 304
+
+
+def test_challenge_list_etag_follows_counter_updates(client):
+    creator, member = make_users(2)
+    challenge = make_challenge(creator, start=date.today() + timedelta(days=1), end=date.today() + timedelta(days=9))
+    before = etag(client, "/challenges")
+
+    participations.join(member.id, challenge.id)
+
+    assert etag(client, "/challenges") != before
@@ -0,0 +1,28 @@
+from config import db
+from models import Habit, HabitEntry, HabitStreak, UserHabit
+from tests.factories import make_users
+
+
+def test_bulk_rejects_unknown_and_mismatched_ids_per_row(client):
+    owner, other, tracker = make_users(3)
+    habit = Habit(name="Stretch", user_id=owner.id)
+    db.session.add(habit)
+    db.session.commit()
+    db.session.add(UserHabit(user_id=tracker.id, habit_id=habit.id))
+    db.session.commit()
+
+    response = client.post("/habit-entries/bulk", json={"entries": [
+        {"user_id": owner.id, "habit_id": habit.id, "progress": "completed", "date": "2026-01-01"},
+        {"user_id": owner.id, "habit_id": 99, "progress": "completed", "date": "2026-01-01"},
+        {"user_id": other.id, "habit_id": habit.id, "progress": "completed", "date": "2026-01-01"},
+        {"user_id": tracker.id, "habit_id": str(habit.id), "progress": "partial", "date": "2026-01-01"},
+    ]})
+
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [r["status"] for r in results] == ["created", "invalid", "invalid", "created"]
+    assert results[1]["error"] == "Unknown habit_id"
+    assert results[2]["error"] == "habit_id does not belong to user_id"
+    assert HabitEntry.query.filter_by(habit_id=99).count() == 0
+    assert HabitStreak.query.filter_by(habit_id=99).count() == 0
+    assert HabitEntry.query.count() == 2
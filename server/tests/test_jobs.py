@@ -0,0 +1,55 @@
+import os
+import time
+
+import jobs
+from config import db
+from tests.factories import make_users
+
+
+@jobs.job("test-explode", max_attempts=1)
+def explode():
+    raise RuntimeError("boom")
+
+
+def test_job_status_is_only_visible_to_its_owner(client, login):
+    owner, other = make_users(2)
+    record = jobs.enqueue("test-explode", owner_id=owner.id)
+    db.session.commit()
+    job_id = record.id
+    assert jobs.run_one("test-worker") == "failed"
+
+    assert client.get(f"/jobs/{job_id}").status_code == 401
+    login(other.id)
+    assert client.get(f"/jobs/{job_id}").status_code == 404
+
+    login(owner.id)
+    response = client.get(f"/jobs/{job_id}")
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "failed"
+    assert response.get_json()["error"] == "RuntimeError: boom"
+
+
+def test_purge_exports_removes_only_expired_files(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "exports_dir", lambda: str(tmp_path))
+    expired, fresh = tmp_path / "user-1-old.json", tmp_path / "user-1-new.json"
+    expired.write_text("{}")
+    fresh.write_text("{}")
+    past = time.time() - jobs.EXPORT_RETENTION - 60
+    os.utime(expired, (past, past))
+
+    assert jobs.purge_exports() == 1
+    assert sorted(os.listdir(tmp_path)) == ["user-1-new.json"]
+
+
+def test_export_round_trip(app, client, login, tmp_path, monkeypatch):
+    monkeypatch.setattr(jobs, "exports_dir", lambda: str(tmp_path))
+    user, = make_users(1)
+    login(user.id)
+
+    queued = client.post(f"/users/{user.id}/exports").get_json()
+    assert jobs.run_one("test-worker") == "succeeded"
+    assert client.get(queued["status_url"]).get_json()["status"] == "succeeded"
+    assert client.get(queued["download_url"]).status_code == 200
+
+    os.remove(tmp_path / os.listdir(tmp_path)[0])
+    assert client.get(queued["download_url"]).status_code == 410
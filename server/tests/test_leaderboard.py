@@ -0,0 +1,22 @@
+from datetime import date
+
+import leaderboard
+from config import db
+from models import ChallengeEntry, ChallengeScore
+from tests.factories import make_challenge, make_users
+
+
+def test_score_keeps_last_entry_date_when_one_side_is_null(app):
+    user, = make_users(1)
+    challenge = make_challenge(user)
+    db.session.add(ChallengeScore(challenge_id=challenge.id, user_id=user.id, score=1, entry_count=1))
+    db.session.commit()
+
+    leaderboard.record_entry(ChallengeEntry(challenge_id=challenge.id, user_id=user.id, progress="completed",
+                                            date=date(2026, 1, 2)))
+    leaderboard.record_entry(ChallengeEntry(challenge_id=challenge.id, user_id=user.id, progress="completed",
+                                            date=None))
+    db.session.commit()
+
+    score = ChallengeScore.query.one()
+    assert (score.entry_count, score.last_entry_date) == (3, date(2026, 1, 2))
@@ -0,0 +1,33 @@
+from datetime import datetime, timedelta
+
+from config import db
+from models import Message
+from tests.factories import make_users
+
+
+def test_thread_pages_cover_every_thread_once(client):
+    sender, receiver = make_users(2)
+    whole_second = datetime.utcnow().replace(microsecond=0)
+    messages = [Message(sender_id=sender.id, receiver_id=receiver.id, content=f"tied {i}", timestamp=whole_second)
+                for i in range(5)]
+    messages += [Message(sender_id=sender.id, receiver_id=receiver.id, content=f"message {i}",
+                         timestamp=whole_second - timedelta(seconds=i, microseconds=250))
+                 for i in range(5)]
+    messages.append(Message(sender_id=receiver.id, receiver_id=sender.id, content="now"))
+    db.session.add_all(messages)
+    db.session.commit()
+    db.session.add(Message(sender_id=receiver.id, receiver_id=sender.id, content="reply", reply_to_id=messages[0].id))
+    db.session.commit()
+
+    seen, cursor = [], None
+    for _ in range(len(messages)):
+        response = client.get("/messages/threads", query_string={"limit": 3, **({"cursor": cursor} if cursor else {})})
+        assert response.status_code == 200
+        data = response.get_json()
+        seen += [thread["id"] for thread in data["threads"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert cursor is None
+    assert sorted(seen) == sorted(message.id for message in messages)
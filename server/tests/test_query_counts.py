@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+
+import pytest
+
+from config import db
+from models import ChallengeEntry, ChallengeParticipant, Message
+from tests.factories import make_challenge, make_users
+
+N = 5
+
+
+def query_count(client, count_queries, path):
+    with count_queries() as statements:
+        response = client.get(path)
+        response.get_data()  # streamed bodies run their queries as they are read
+    assert response.status_code == 200
+    return len(statements)
+
+
+def populate(challenge, users):
+    for i, user in enumerate(users):
+        db.session.add(ChallengeParticipant(user_id=user.id, challenge_id=challenge.id))
+        db.session.add(ChallengeEntry(user_id=user.id, challenge_id=challenge.id, progress="done",
+                                      date=date.today() - timedelta(days=i % 3)))
+    db.session.commit()
+
+
+@pytest.mark.parametrize("path", ["/challenges/{id}/entries", "/challenges/{id}/participants"])
+def test_challenge_listings_take_constant_queries(client, count_queries, path):
+    users = make_users(11 * N)
+    small, large = make_challenge(users[0], "small"), make_challenge(users[0], "large")
+    populate(small, users[:N])
+    populate(large, users[N:11 * N])
+
+    small_count = query_count(client, count_queries, path.format(id=small.id))
+    large_count = query_count(client, count_queries, path.format(id=large.id))
+    assert len(client.get(path.format(id=large.id)).get_json()) == 10 * N
+    assert small_count == large_count
+
+
+def test_own_participations_take_constant_queries(client, login, count_queries):
+    few, many = make_users(2)
+    for i in range(10 * N):
+        challenge = make_challenge(many, f"challenge {i}")
+        db.session.add(ChallengeParticipant(user_id=many.id, challenge_id=challenge.id))
+        if i < N:
+            db.session.add(ChallengeParticipant(user_id=few.id, challenge_id=challenge.id))
+    db.session.commit()
+
+    login(few.id)
+    few_count = query_count(client, count_queries, "/challenge-participants")
+    login(many.id)
+    many_count = query_count(client, count_queries, "/challenge-participants")
+    assert len(client.get("/challenge-participants").get_json()) == 10 * N
+    assert few_count == many_count
+
+
+@pytest.mark.parametrize("query_string", ["", "?stream=1"])
+def test_message_list_takes_constant_queries(client, count_queries, query_string):
+    receiver_id, *sender_ids = [user.id for user in make_users(10 * N + 1)]
+
+    def post_from(sender_ids):
+        db.session.add_all(Message(sender_id=sender_id, receiver_id=receiver_id, content="hi") for sender_id in sender_ids)
+        db.session.commit()
+        # Fresh identity map, as in a real request
+        db.session.expunge_all()
+        return query_count(client, count_queries, "/messages" + query_string)
+
+    few_count = post_from(sender_ids[:N])
+    many_count = post_from(sender_ids[N:])
+    body = client.get("/messages" + query_string).get_data(as_text=True)
+    assert body.count('"username"') == 10 * N
+    assert few_count == many_count
@@ -0,0 +1,11 @@
+def test_user_and_challenge_writes_hide_internal_columns(client):
+    user = client.post("/users", json={"username": "ada", "email": "ada@example.com", "password": "secret"}).get_json()
+    assert {"password_hash", "active_challenge_count", "version"}.isdisjoint(user)
+    assert user["username"] == "ada"
+
+    challenge = client.post("/challenges", json={
+        "name": "Walk", "description": "Daily walk", "created_by": user["id"],
+        "start_date": "2030-01-01", "end_date": "2030-02-01",
+    }).get_json()
+    assert "join_seq" not in challenge
+    assert challenge["participant_count"] == 0
@@ -0,0 +1,43 @@
+from datetime import date
+
+import search
+from config import db
+from models import Challenge, Habit, Message
+from tests.factories import make_users
+
+
+def test_search_reports_when_only_the_newest_matches_were_ranked(client, monkeypatch):
+    user, = make_users(1)
+    db.session.add_all(Habit(name=f"Running {i}", description="morning run", user_id=user.id) for i in range(5))
+    db.session.add(Habit(name="Reading", description="one chapter", user_id=user.id))
+    db.session.commit()
+    monkeypatch.setattr(search, "MAX_RANKED_CANDIDATES", 3)
+
+    common = client.get("/search", query_string={"q": "running"}).get_json()
+    assert common["truncated"] is True
+    assert len(common["results"]) == 3
+
+    rare = client.get("/search", query_string={"q": "reading"}).get_json()
+    assert rare["truncated"] is False
+    assert [hit["title"] for hit in rare["results"]] == ["<mark>Reading</mark>"]
+
+
+def test_candidate_budget_counts_only_visible_matches(client, login, monkeypatch):
+    me, stranger, friend = make_users(3)
+    db.session.add_all(Habit(name=f"Garden {i}", user_id=me.id) for i in range(2))
+    db.session.add(Message(sender_id=friend.id, receiver_id=me.id, content="garden party"))
+    db.session.commit()
+    # Newer matches the caller either didn't ask for or may not see
+    for i in range(5):
+        db.session.add(Challenge(name=f"Garden {i}", description="grow", created_by=me.id,
+                                 start_date=date(2030, 1, 1), end_date=date(2030, 2, 1)))
+        db.session.add(Message(sender_id=stranger.id, receiver_id=friend.id, content="garden secrets"))
+    db.session.commit()
+    monkeypatch.setattr(search, "MAX_RANKED_CANDIDATES", 3)
+    login(me.id)
+
+    habits = client.get("/search", query_string={"q": "garden", "types": "habit"}).get_json()
+    assert (len(habits["results"]), habits["truncated"]) == (2, False)
+
+    mine = client.get("/search", query_string={"q": "garden", "types": "habit,message"}).get_json()
+    assert (len(mine["results"]), mine["truncated"]) == (3, False)
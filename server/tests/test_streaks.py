@@ -0,0 +1,22 @@
+from datetime import date, timedelta
+
+from config import db
+from models import Habit, HabitStreak
+from tests.factories import make_users
+
+
+def test_lapsed_streaks_sort_below_live_ones(client):
+    user, = make_users(1)
+    lapsed, live = Habit(name="Lapsed", user_id=user.id), Habit(name="Live", user_id=user.id)
+    db.session.add_all([lapsed, live])
+    db.session.commit()
+    db.session.add_all([
+        HabitStreak(user_id=user.id, habit_id=lapsed.id, current_streak=30, longest_streak=30,
+                    last_completed_date=date.today() - timedelta(days=40)),
+        HabitStreak(user_id=user.id, habit_id=live.id, current_streak=2, longest_streak=2,
+                    last_completed_date=date.today()),
+    ])
+    db.session.commit()
+
+    streaks = client.get(f"/users/{user.id}/streaks").get_json()["streaks"]
+    assert [(s["habit_id"], s["current_streak"]) for s in streaks] == [(live.id, 2), (lapsed.id, 0)]
@@ -0,0 +1,30 @@
+import leaderboard
+import participations
+from pubsub import broker
+from routes.stream_routes import challenge_topic, message_topic
+from tests.factories import make_challenge, make_users
+
+
+def test_saved_writes_survive_a_failed_publish(client, login, monkeypatch):
+    sender, receiver = make_users(2)
+    quiet, watched = make_challenge(sender, "Quiet"), make_challenge(sender, "Watched")
+    for challenge in (quiet, watched):
+        participations.join(sender.id, challenge.id, enforce_rules=False)
+    ranked = []
+    monkeypatch.setattr(leaderboard, "rank_for", lambda *args: ranked.append(args))
+    login(sender.id)
+
+    response = client.post("/challenge-entries", json={"challenge_id": quiet.id, "progress": "completed"})
+    assert response.status_code == 201
+    assert ranked == []
+
+    def fail(*args):
+        raise OSError("stream log is locked")
+    listening = {challenge_topic(watched.id): 1, message_topic(receiver.id): 1}
+    monkeypatch.setattr(broker, "subscriber_counts", lambda: listening)
+    monkeypatch.setattr(broker, "publish", fail)
+    message = client.post("/messages", json={"sender_id": sender.id, "receiver_id": receiver.id, "content": "hi"})
+    assert message.status_code == 201
+    response = client.post("/challenge-entries", json={"challenge_id": watched.id, "progress": "completed"})
+    assert response.status_code == 201
+    assert ranked == [(watched.id, sender.id)]
@@ -0,0 +1,44 @@
+from datetime import date, timedelta
+
+import participations
+from config import db
+from models import Challenge, ChallengeEntry, User
+from tests.factories import make_challenge, make_users
+
+
+def upcoming(creator, name):
+    return make_challenge(creator, name, start=date.today() + timedelta(days=1), end=date.today() + timedelta(days=10))
+
+
+def test_deleting_a_creator_frees_participants_slots(client):
+    creator, member = make_users(2)
+    owned = [upcoming(creator, f"owned {i}") for i in range(participations.MAX_ACTIVE_CHALLENGES)]
+    for challenge in owned:
+        participations.join(member.id, challenge.id)
+    member_id = member.id
+    assert db.session.get(User, member_id).active_challenge_count == participations.MAX_ACTIVE_CHALLENGES
+
+    assert client.delete(f"/users/{creator.id}").status_code == 200
+
+    assert Challenge.query.count() == 0
+    assert db.session.get(User, member_id).active_challenge_count == 0
+
+
+def test_deleting_a_member_updates_other_challenges_counts(client):
+    creator, member, other = make_users(3)
+    challenge = upcoming(creator, "shared")
+    for user in (member, other):
+        participations.join(user.id, challenge.id)
+    db.session.add_all(
+        ChallengeEntry(user_id=user.id, challenge_id=challenge.id, progress="done", date=date.today() - timedelta(days=i))
+        for user, i in ((member, 0), (member, 1), (other, 0))
+    )
+    db.session.commit()
+    db.session.execute(db.update(Challenge).where(Challenge.id == challenge.id).values(entry_count=3))
+    db.session.commit()
+    challenge_id = challenge.id
+
+    assert client.delete(f"/users/{member.id}").status_code == 200
+
+    challenge = db.session.get(Challenge, challenge_id)
+    assert (challenge.participant_count, challenge.entry_count) == (1, 1)
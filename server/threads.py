@@ -0,0 +1,103 @@
+from sqlalchemy import func, literal, select, tuple_
+
+from config import db
+from models import Message, User
+
+DEFAULT_MAX_DEPTH = 10
+DEFAULT_MAX_REPLIES = 200
+
+messages = Message.__table__
+users = User.__table__
+
+
+def _node(row):
+    return {
+        "id": row.id,
+        "sender_id": row.sender_id,
+        "receiver_id": row.receiver_id,
+        "reply_to_id": row.reply_to_id,
+        "content": row.content,
+        "timestamp": row.timestamp.isoformat() if row.timestamp else None,
+        "username": row.username,
+        "avatar_url": row.avatar_url,
+        "depth": row.depth,
+        "replies": [],
+    }
+
+
+def load_thread(root_id, max_depth=DEFAULT_MAX_DEPTH, max_replies=DEFAULT_MAX_REPLIES):
+    """Load a message and its reply tree with one recursive CTE on reply_to_id.
+
+    Returns (root, truncated) where root is the nested dict tree, or (None, False)
+    if the message does not exist. `truncated` is set when max_replies cut the tree.
+    """
+    tree = (
+        select(messages.c.id, literal(0).label("depth"))
+        .where(messages.c.id == root_id)
+        .cte("thread", recursive=True)
+    )
+    tree = tree.union_all(
+        select(messages.c.id, (tree.c.depth + 1).label("depth"))
+        .where(messages.c.reply_to_id == tree.c.id, tree.c.depth < max_depth)
+    )
+
+    stmt = (
+        select(
+            messages.c.id, messages.c.sender_id, messages.c.receiver_id, messages.c.reply_to_id,
+            messages.c.content, messages.c.timestamp, tree.c.depth,
+            users.c.username, users.c.avatar_url,
+        )
+        .join(tree, tree.c.id == messages.c.id)
+        .outerjoin(users, users.c.id == messages.c.sender_id)
+        # Breadth-first, so every parent is seen before its replies
+        .order_by(tree.c.depth, messages.c.timestamp, messages.c.id)
+        .limit(max_replies + 2)
+    )
+    rows = db.session.execute(stmt).all()
+    if not rows:
+        return None, False
+
+    truncated = len(rows) > max_replies + 1
+    nodes = {}
+    for row in rows[:max_replies + 1]:
+        node = nodes[row.id] = _node(row)
+        parent = nodes.get(row.reply_to_id) if row.depth else None
+        if parent is not None:
+            parent["replies"].append(node)
+    return nodes[root_id], truncated
+
+
+def list_threads(limit, cursor=None):
+    """One page of top-level messages, newest first, with direct reply counts.
+
+    `cursor` is the (timestamp, id) of the last thread on the previous page.
+    Returns (threads, has_more).
+    """
+    stmt = (
+        select(
+            messages.c.id, messages.c.sender_id, messages.c.receiver_id, messages.c.reply_to_id,
+            messages.c.content, messages.c.timestamp, literal(0).label("depth"),
+            users.c.username, users.c.avatar_url,
+        )
+        .outerjoin(users, users.c.id == messages.c.sender_id)
+        .where(messages.c.reply_to_id.is_(None))
+        .order_by(messages.c.timestamp.desc(), messages.c.id.desc())
+        .limit(limit + 1)
+    )
+    if cursor is not None:
+        stmt = stmt.where(tuple_(messages.c.timestamp, messages.c.id) < cursor)
+
+    rows = db.session.execute(stmt).all()
+    has_more = len(rows) > limit
+    threads = [_node(row) for row in rows[:limit]]
+
+    if threads:
+        counts = dict(db.session.execute(
+            select(messages.c.reply_to_id, func.count(messages.c.id))
+            .where(messages.c.reply_to_id.in_([t["id"] for t in threads]))
+            .group_by(messages.c.reply_to_id)
+        ).all())
+        for thread in threads:
+            del thread["replies"]
+            thread["reply_count"] = counts.get(thread["id"], 0)
+    return threads, has_more